@@ -5,12 +5,17 @@ A python wrapper for the gene prediction program AUGUSTUS.
 from pkg_resources import resource_filename
 from pygustus.options import aug_options
 import pygustus.util as util
+import pygustus.compression as compression
+import pygustus.executors as executors
 import pygustus.fasta_methods as fm
-import gzip
+import pygustus.twobit as twobit
+import asyncio
+import contextlib
+import functools
 import os
 import textwrap
 
-__all__ = ['predict', 'config_get_bin',
+__all__ = ['predict', 'predict_async', 'plan_prediction', 'config_get_bin',
            'config_set_bin', 'config_set_default_bin', 'show_fasta_info',
            'show_aug_help', 'show_aug_paramlist', 'show_species_info', 'help']
 
@@ -35,8 +40,127 @@ def predict(*args, options=None, **kwargs):
         **kwargs (dict): Arguments for AUGUSTUS or Pygustus as dict: lists with
             possible parameters can be obtained from the help methods or 
             the Pygustus README (only Pygustus parameters).
+
+    Returns:
+        ExecutionResult: The result of the prediction with the exit status
+        (returncode) and the resource usage (resources) of AUGUSTUS. For
+        jobs > 1, run_stats contains the statistics of each job.
+    """
+
+    augustus_command, aug_options, pygustus_options = init_prediction(
+        *args, options=options, **kwargs)
+
+    jobs = pygustus_options.get_value_or_none('jobs')
+
+    if jobs and jobs > 1:
+        # the split reads a compressed input file directly
+        result = util.execute_bin_parallel(
+            augustus_command, aug_options, get_parallel_options(pygustus_options))
+    else:
+        with convert_input_file(aug_options, pygustus_options):
+            print(f'Execute AUGUSTUS with given options.')
+
+            result = util.execute_bin(augustus_command, aug_options.get_options())
+
+        outfile = aug_options.get_value_or_none('outfile')
+        if outfile:
+            print(f'Output written to: {outfile}')
+
+    return result
+
+
+async def predict_async(*args, options=None, semaphore=None, **kwargs):
+    """Executes the binary of AUGUSTUS without blocking the event loop.
+
+    Coroutine version of predict(). AUGUSTUS is executed as asyncio
+    subprocess, the remaining blocking steps (e.g. the split of the input
+    file) are executed in the default executor of the running event loop.
+
+    Args:
+        *args (tuple): Exactly one argument should be passed here, see
+            predict().
+        options (AugustusOptions): Optional; see predict().
+        semaphore (asyncio.Semaphore): Optional; A semaphore that can be
+            shared by several predictions to limit the total number of
+            concurrently running AUGUSTUS processes (the default is None).
+        **kwargs (dict): Arguments for AUGUSTUS or Pygustus, see predict().
+
+    Returns:
+        ExecutionResult: The result of the prediction with the path to the
+        output file (outfile) and the exit status (returncode) of AUGUSTUS.
     """
 
+    loop = asyncio.get_running_loop()
+    augustus_command, aug_options, pygustus_options = await loop.run_in_executor(
+        None, functools.partial(init_prediction, *args, options=options, **kwargs))
+
+    jobs = pygustus_options.get_value_or_none('jobs')
+
+    if jobs and jobs > 1:
+        result = await util.execute_bin_parallel_async(
+            augustus_command, aug_options, get_parallel_options(pygustus_options),
+            semaphore=semaphore)
+    else:
+        converted_input = convert_input_file(aug_options, pygustus_options)
+        await loop.run_in_executor(None, converted_input.__enter__)
+        try:
+            print(f'Execute AUGUSTUS with given options.')
+
+            result = await util.execute_bin_async(
+                augustus_command, aug_options.get_options(), semaphore=semaphore)
+        finally:
+            await loop.run_in_executor(
+                None, converted_input.__exit__, None, None, None)
+
+        if result.outfile:
+            print(f'Output written to: {result.outfile}')
+
+    return result
+
+
+def plan_prediction(*args, options=None, **kwargs):
+    """Plans the runs of a parallel prediction without executing AUGUSTUS.
+
+    The runs are planned by their estimated cost like by a prediction with
+    balanceRuns=True and the number of jobs given by jobs.
+
+    Args:
+        *args (tuple): The input file, see predict().
+        options (AugustusOptions): Optional; see predict().
+        **kwargs (dict): Arguments for AUGUSTUS or Pygustus, see predict().
+
+    Returns:
+        RunPlan: The planned runs with their estimated cost, the chosen
+        chunk size and overlap and the expected balance of the jobs.
+    """
+    util.set_tmp_config_path(options, **kwargs)
+    pygustus_options = util.get_options(
+        *args, options=options, path_to_params=PARAMETER_FILE, program='pygustus', **kwargs)
+    aug_options = util.get_options(
+        *args, options=options, path_to_params=PARAMETER_FILE, program='augustus', **kwargs)
+
+    is_set, input_file = aug_options.get_input_filename()
+    if not is_set or not input_file:
+        raise ValueError(f'Input file not specified.')
+    util.check_file(input_file)
+
+    parallel_options = get_parallel_options(pygustus_options)
+    plan = util.create_run_plan(
+        input_file, aug_options.get_value_or_none('hintsfile'),
+        parallel_options.jobs, parallel_options.overlap,
+        parallel_options.partition_sequences, parallel_options.max_seq_size,
+        parallel_options.min_gap_length, parallel_options.max_n_fraction)
+    plan.print_summary()
+    return plan
+
+
+def init_prediction(*args, options=None, **kwargs):
+    """Checks the AUGUSTUS executable and creates the options of a prediction.
+
+    Returns:
+        tuple: The AUGUSTUS executable, the AUGUSTUS options and the
+        Pygustus options.
+    """
     util.set_tmp_config_path(options, **kwargs)
 
     pygustus_options = util.get_options(
@@ -53,18 +177,7 @@ def predict(*args, options=None, **kwargs):
     aug_options = util.get_options(
         *args, options=options, path_to_params=PARAMETER_FILE, program='augustus', **kwargs)
 
-    jobs = pygustus_options.get_value_or_none('jobs')
-    chunksize = pygustus_options.get_value_or_none('chunksize')
-    overlap = pygustus_options.get_value_or_none('overlap')
-    partition_hints = pygustus_options.get_value_or_none('partitionHints')
-    minsize = pygustus_options.get_value_or_none('minSplitSize')
-    partition_sequences = pygustus_options.get_value_or_none(
-        'partitionLargeSequences')
-    debug_dir = pygustus_options.get_value_or_none('debugOutputDir')
-    max_seq_size = pygustus_options.get_value_or_none('maxSeqSize')
-
     # check input file
-    zip = False
     is_set, input_file = aug_options.get_input_filename()
     if is_set:
         if input_file:
@@ -72,31 +185,84 @@ def predict(*args, options=None, **kwargs):
         else:
             raise ValueError(f'Input file not specified.')
 
-        # unzip if gz file is given
-        f_name, f_ext = os.path.splitext(input_file)
-        if f_ext == '.gz':
-            nf = open(f_name, 'wb')
-            with gzip.open(input_file) as f:
-                bindata = f.read()
-                nf.write(bindata)
-            nf.close()
-            aug_options.set_input_filename(f_name)
-            zip = True
+    return augustus_command, aug_options, pygustus_options
 
-    if jobs and jobs > 1:
-        util.execute_bin_parallel(
-            augustus_command, aug_options, jobs, chunksize, overlap, partition_sequences, partition_hints, minsize, max_seq_size, debug_dir)
-    else:
-        print(f'Execute AUGUSTUS with given options.')
 
-        util.execute_bin(augustus_command, aug_options.get_options())
-        
-        outfile = aug_options.get_value_or_none('outfile')
-        if outfile:
-            print(f'Output written to: {outfile}')
+@contextlib.contextmanager
+def convert_input_file(aug_options, pygustus_options):
+    """Converts the input file into an uncompressed FASTA file if a gz file
+    or a .2bit file is given.
 
-    if zip:
-        os.remove(f_name)
+    The input file is decompressed in blocks or converted sequence by
+    sequence into the work directory (workDir) or a temporary directory,
+    which is removed after the prediction, and the input file of
+    aug_options is replaced while the context is active.
+    """
+    is_set, input_file = aug_options.get_input_filename()
+    if not is_set:
+        yield None
+        return
+    is_compressed = input_file.endswith(compression.GZIP_EXTENSION)
+    if not is_compressed and not (os.path.isfile(input_file)
+                                  and twobit.is_twobit(input_file)):
+        yield None
+        return
+
+    work_dir = pygustus_options.get_value_or_none('workDir')
+    with util.open_work_dir(work_dir) as tmpdir:
+        if is_compressed:
+            converted_file = os.path.join(
+                tmpdir, compression.strip_gzip_extension(os.path.basename(input_file)))
+            compression.decompress(
+                input_file, converted_file, pygustus_options.get_value_or_none('jobs'))
+        else:
+            converted_file = os.path.join(
+                tmpdir, f'{os.path.splitext(os.path.basename(input_file))[0]}.fa')
+            twobit.write_fasta(input_file, converted_file)
+        aug_options.set_input_filename(converted_file)
+        try:
+            yield converted_file
+        finally:
+            aug_options.set_input_filename(input_file)
+            if work_dir:
+                os.remove(converted_file)
+
+
+def get_parallel_options(pygustus_options):
+    """Returns the Pygustus options of a parallel execution as
+    util.ParallelOptions for util.execute_bin_parallel."""
+    return util.ParallelOptions(**{
+        'jobs': pygustus_options.get_value_or_none('jobs'),
+        'chunksize': pygustus_options.get_value_or_none('chunksize'),
+        'overlap': pygustus_options.get_value_or_none('overlap'),
+        'partition_sequences': pygustus_options.get_value_or_none(
+            'partitionLargeSequences'),
+        'part_hints': pygustus_options.get_value_or_none('partitionHints'),
+        'minsize': pygustus_options.get_value_or_none('minSplitSize'),
+        'max_seq_size': pygustus_options.get_value_or_none('maxSeqSize'),
+        'min_gap_length': pygustus_options.get_value_or_none('minGapLength'),
+        'max_n_fraction': pygustus_options.get_value_or_none('maxNFraction'),
+        'write_windows': pygustus_options.get_value_or_none('writeChunkWindows'),
+        'balance_runs': pygustus_options.get_value_or_none('balanceRuns'),
+        'renumber_genes': pygustus_options.get_value_or_none('renumberGenes'),
+        'debug_dir': pygustus_options.get_value_or_none('debugOutputDir'),
+        'pipe_output': pygustus_options.get_value_or_none('pipeOutput'),
+        'cache_dir': pygustus_options.get_value_or_none('cacheDir'),
+        'cache_max_size': pygustus_options.get_value_or_none('cacheMaxSize'),
+        'work_dir': pygustus_options.get_value_or_none('workDir'),
+        'resume': pygustus_options.get_value_or_none('resume'),
+        'timeout': pygustus_options.get_value_or_none('jobTimeout'),
+        'retries': pygustus_options.get_value_or_none('jobRetries'),
+        'retry_delay': pygustus_options.get_value_or_none('jobRetryDelay'),
+        'allow_partial': pygustus_options.get_value_or_none('allowPartialResults'),
+        'run_report': pygustus_options.get_value_or_none('runReport'),
+        'max_memory': pygustus_options.get_value_or_none('maxMemory'),
+        'executor': executors.create_executor(
+            pygustus_options.get_value_or_none('executor'),
+            pygustus_options.get_value_or_none('executorTemplate'),
+            pygustus_options.get_value_or_none('executorPollInterval'),
+            pygustus_options.get_value_or_none('executorMaxWait'))
+    })
 
 
 def config_get_bin():
@@ -130,7 +296,7 @@ def config_set_default_bin():
     util.set_config_item('augustus_bin', 'augustus')
 
 
-def show_fasta_info(inputfile):
+def show_fasta_info(inputfile, jobs=1):
     """Outputs information about a fasta file.
     
     This method outputs information about the contents of the passed file
@@ -138,8 +304,14 @@ def show_fasta_info(inputfile):
 
     Args:
         inputfile (string): Path to the file in fasta format as string.
+        jobs (int): Optional; The number of processes counting the bases
+            of the sequences (the default is 1).
+
+    Returns:
+        dict: The base counts and soft-masked bases of each sequence and
+        in total, see fasta_methods.summarize_acgt_content().
     """
-    fm.summarize_acgt_content(inputfile)
+    return fm.summarize_acgt_content(inputfile, jobs)
 
 
 def show_aug_help():
@@ -0,0 +1,182 @@
+import bisect
+import os
+import struct
+import zlib
+
+
+"""
+Random access to BGZF files, e.g. FASTA files compressed with bgzip. A
+BGZF file is a series of gzip members (blocks) of at most 64 KB of
+uncompressed data. The .gzi index written by bgzip -i or samtools faidx
+maps the uncompressed offset of each block to its compressed offset, so
+that a range of the uncompressed data can be read by decompressing only
+the blocks containing it.
+"""
+
+GZIP_MAGIC = b'\x1f\x8b\x08'
+# gzip header up to XLEN, the FEXTRA flag is set in BGZF blocks
+HEADER_SIZE = 12
+FEXTRA = 4
+
+
+def is_bgzf(filename):
+    """Checks if the given file starts with a BGZF block."""
+    with open(filename, 'rb') as file:
+        return read_block_size(file) is not None
+
+
+def read_block_size(file):
+    """Reads the header of the block at the current position of file.
+
+    Returns:
+        int: The size of the compressed block including the header or
+        None, if there is no BGZF block at this position.
+    """
+    header = file.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or not header.startswith(GZIP_MAGIC) \
+            or not header[3] & FEXTRA:
+        return None
+    xlen = struct.unpack('<H', header[10:12])[0]
+    extra = file.read(xlen)
+    pos = 0
+    while pos + 4 <= len(extra):
+        slen = struct.unpack('<H', extra[pos + 2:pos + 4])[0]
+        if extra[pos:pos + 2] == b'BC' and slen == 2:
+            return struct.unpack('<H', extra[pos + 4:pos + 6])[0] + 1
+        pos += 4 + slen
+    return None
+
+
+class BgzfIndex:
+    def __init__(self, bgzf_file, index_file=None, write=False) -> None:
+        """Loads the .gzi index of the given BGZF file or builds it, if it
+        does not exist or is older than the BGZF file.
+
+        Args:
+            bgzf_file (string): The BGZF file.
+            index_file (string): Optional; The path to the index (the
+                default is None, i.e. bgzf_file + '.gzi').
+            write (bool): Optional; If True, a built index is written to
+                index_file, if the directory is writable (the default is
+                False, i.e. the index is only kept in memory and no file
+                is created next to the input).
+
+        Raises:
+            ValueError: If the file is not a BGZF file.
+        """
+        self.bgzf_file = bgzf_file
+        self.index_file = index_file if index_file else f'{bgzf_file}.gzi'
+        # compressed and uncompressed offset of each block
+        self.coffsets = [0]
+        self.uoffsets = [0]
+
+        if os.path.isfile(self.index_file) and \
+                os.path.getmtime(self.index_file) >= os.path.getmtime(bgzf_file):
+            self.load()
+        else:
+            self.build()
+            if write:
+                try:
+                    self.save()
+                except OSError:
+                    pass
+
+    def find_block(self, offset):
+        """Returns the compressed and uncompressed offset of the block
+        containing the given uncompressed offset."""
+        i = bisect.bisect_right(self.uoffsets, offset) - 1
+        return self.coffsets[i], self.uoffsets[i]
+
+    def load(self):
+        with open(self.index_file, 'rb') as file:
+            count = struct.unpack('<Q', file.read(8))[0]
+            values = struct.unpack(f'<{2 * count}Q', file.read(16 * count))
+        # the first block is not contained in the index
+        self.coffsets = [0] + list(values[0::2])
+        self.uoffsets = [0] + list(values[1::2])
+
+    def save(self):
+        with open(self.index_file, 'wb') as file:
+            file.write(struct.pack('<Q', len(self.coffsets) - 1))
+            for coffset, uoffset in zip(self.coffsets[1:], self.uoffsets[1:]):
+                file.write(struct.pack('<QQ', coffset, uoffset))
+
+    def build(self):
+        """Builds the index by reading only the headers and the sizes of
+        the uncompressed data of all blocks."""
+        self.coffsets = [0]
+        self.uoffsets = [0]
+        with open(self.bgzf_file, 'rb') as file:
+            coffset = 0
+            uoffset = 0
+            while True:
+                file.seek(coffset)
+                block_size = read_block_size(file)
+                if block_size is None:
+                    if coffset == 0 or file.read(1):
+                        raise ValueError(
+                            f'{self.bgzf_file} is not a BGZF file.')
+                    break
+                file.seek(coffset + block_size - 4)
+                uoffset += struct.unpack('<I', file.read(4))[0]
+                coffset += block_size
+                file.seek(coffset)
+                if not file.read(1):
+                    break
+                self.coffsets.append(coffset)
+                self.uoffsets.append(uoffset)
+
+
+class BgzfReader:
+    """Reads a BGZF file like an uncompressed binary file, seek() and
+    read() use uncompressed offsets."""
+
+    def __init__(self, bgzf_file, index=None) -> None:
+        self.index = index if index else BgzfIndex(bgzf_file)
+        self._file = open(bgzf_file, 'rb')
+        self._position = 0
+        # the last decompressed block as uncompressed offset and data
+        self._block = (None, b'')
+
+    def seek(self, offset):
+        self._position = offset
+        return offset
+
+    def tell(self):
+        return self._position
+
+    def read(self, size):
+        parts = list()
+        while size > 0:
+            block_start, data = self._read_block(self._position)
+            start = self._position - block_start
+            part = data[start:start + size]
+            if not part:
+                break
+            parts.append(part)
+            self._position += len(part)
+            size -= len(part)
+        return b''.join(parts)
+
+    def _read_block(self, offset):
+        coffset, uoffset = self.index.find_block(offset)
+        if self._block[0] != uoffset:
+            self._file.seek(coffset)
+            block_size = read_block_size(self._file)
+            if block_size is None:
+                return uoffset, b''
+            self._file.seek(coffset)
+            block = self._file.read(block_size)
+            xlen = struct.unpack('<H', block[10:12])[0]
+            data = zlib.decompress(block[HEADER_SIZE + xlen:-8], -15)
+            self._block = (uoffset, data)
+        return self._block
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,109 @@
+import contextlib
+import gzip
+import shutil
+import subprocess
+
+
+"""
+Streaming access to gzip compressed input files. The files are never
+decompressed into memory as a whole: they are either read as a stream,
+e.g. by the split of a parallel prediction, or decompressed in blocks to
+a file. If pigz is installed, it is used to decompress with several
+threads.
+"""
+
+GZIP_MAGIC = b'\x1f\x8b'
+GZIP_EXTENSION = '.gz'
+# size of the blocks copied at once when decompressing a file
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def is_gzipped(filename):
+    """Checks the magic number of the given file."""
+    with open(filename, 'rb') as file:
+        return file.read(2) == GZIP_MAGIC
+
+
+def strip_gzip_extension(filename):
+    """Returns the filename without the extension .gz, if any."""
+    if filename.endswith(GZIP_EXTENSION):
+        return filename[:-len(GZIP_EXTENSION)]
+    return filename
+
+
+def get_pigz(threads=1):
+    """Returns the path to pigz, if it is installed and more than one
+    thread should be used, otherwise None."""
+    if not threads or threads < 2:
+        return None
+    return shutil.which('pigz')
+
+
+@contextlib.contextmanager
+def open_input(filename, threads=1, binary=False):
+    """Opens a possibly gzip compressed file for reading.
+
+    Args:
+        filename (string): The file, which is decompressed on the fly if it
+            starts with the gzip magic number.
+        threads (int): Optional; The number of threads used by pigz, if it
+            is installed (the default is 1, i.e. Python's gzip module is
+            used).
+        binary (bool): Optional; If True, the file is opened in binary
+            mode (the default is False, i.e. text mode).
+
+    Yields:
+        file: The decompressed stream.
+    """
+    if not is_gzipped(filename):
+        with open(filename, 'rb' if binary else 'r') as file:
+            yield file
+        return
+
+    pigz = get_pigz(threads)
+    if pigz is None:
+        with gzip.open(filename, 'rb' if binary else 'rt') as file:
+            yield file
+        return
+
+    process = subprocess.Popen(
+        [pigz, '-dc', '-p', str(int(threads)), filename],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=not binary)
+    completed = False
+    try:
+        yield process.stdout
+        completed = True
+    finally:
+        process.stdout.close()
+        if not completed:
+            process.kill()
+        stderr = process.stderr.read()
+        if binary:
+            stderr = stderr.decode(errors='replace')
+        process.stderr.close()
+        process.wait()
+    if process.returncode != 0:
+        raise ValueError(f'Could not decompress {filename}: {stderr.strip()}')
+
+
+def decompress(input_file, outfile, threads=1):
+    """Decompresses a gzip compressed file in blocks of BLOCK_SIZE.
+
+    Args:
+        input_file (string): The compressed file.
+        outfile (string): The decompressed file.
+        threads (int): Optional; The number of threads used by pigz, if it
+            is installed (the default is 1).
+    """
+    pigz = get_pigz(threads)
+    with open(outfile, 'wb') as out:
+        if pigz:
+            process = subprocess.run(
+                [pigz, '-dc', '-p', str(int(threads)), input_file],
+                stdout=out, stderr=subprocess.PIPE, universal_newlines=True)
+            if process.returncode != 0:
+                raise ValueError(
+                    f'Could not decompress {input_file}: {process.stderr.strip()}')
+        else:
+            with gzip.open(input_file) as file:
+                shutil.copyfileobj(file, out, BLOCK_SIZE)
@@ -0,0 +1,304 @@
+import itertools
+import os
+import shlex
+import shutil
+import signal
+import subprocess
+import threading
+import time
+import pygustus.gff_methods as gff
+import pygustus.util as util
+
+
+"""
+Backends executing the AUGUSTUS command lines of a parallel prediction.
+The runs are still planned, cached and joined by util.execute_bin_parallel,
+an executor only decides where a single command line is executed: in a
+thread of the Python process or as a job of a batch system.
+"""
+
+EXECUTORS = ('thread', 'template')
+
+
+class RunExecutor:
+    """Base class of the backends executing AUGUSTUS command lines.
+
+    The methods execute_bin and execute_bin_piped are called concurrently
+    by up to jobs threads and block until the command line has been
+    executed.
+
+    Attributes:
+        SHARED_WORK_DIR (bool): True if the work directory is accessed by
+            other hosts, so that a persistent work directory (workDir) is
+            required instead of a local temporary directory.
+    """
+    SHARED_WORK_DIR = False
+
+    def start(self, work_dir):
+        """Called before the first run with the work directory of the
+        prediction."""
+        pass
+
+    def shutdown(self):
+        """Called after the last run."""
+        pass
+
+    def execute_bin(self, cmd, options, timeout=None):
+        """Executes a command line, see util.execute_bin().
+
+        Returns:
+            ExecutionResult: The result of the execution.
+        """
+        raise NotImplementedError
+
+    def execute_bin_piped(self, cmd, options, copy_to=None, timeout=None):
+        """Executes a command line and parses the output of AUGUSTUS, see
+        util.execute_bin_piped().
+
+        Returns:
+            ExecutionResult: The result with the parsed AugustusOutput.
+        """
+        raise NotImplementedError
+
+
+class ThreadExecutor(RunExecutor):
+    """Executes the command lines in the calling thread, i.e. as local
+    child processes of the Python process."""
+
+    def execute_bin(self, cmd, options, timeout=None):
+        return util.execute_bin(cmd, options, timeout=timeout)
+
+    def execute_bin_piped(self, cmd, options, copy_to=None, timeout=None):
+        return util.execute_bin_piped(cmd, options, copy_to=copy_to, timeout=timeout)
+
+
+class CommandTemplateExecutor(RunExecutor):
+    """Executes the command lines as jobs of a batch system.
+
+    For each command line, a shell script is written to a job directory
+    below the work directory and submitted by executing the template with
+    the shell. The script records the exit status of AUGUSTUS in a
+    completion file, which is polled until the job has finished. The work
+    directory must therefore be shared with the nodes of the batch system.
+
+    If the completion file is not written within max_wait seconds, e.g.
+    because the job was cancelled or lost with its node, the job counts
+    as timed out, so that it is retried by the RetryPolicy. A cancel file
+    is then written to the job directory, which keeps a job that is
+    still queued from executing AUGUSTUS. Each job writes the result of
+    AUGUSTUS into its job directory and only the result of a completed
+    job is moved to the result file of the run.
+
+    The template may contain the placeholders {script} (the path to the
+    shell script), {name} (a job name) and {dir} (the job directory),
+    e.g. "sbatch --job-name={name} --output=/dev/null --wrap='sh {script}'"
+    for Slurm or "sh {script}" to execute the jobs locally.
+
+    Attributes:
+        template (string): The command used to submit a job.
+        poll_interval (float): The interval in seconds between two checks
+            for the completion file.
+        max_wait (float): The maximum time in seconds to wait for the
+            completion file of a job or None, i.e. the timeout of the run
+            plus MAX_WAIT_SLACK for the time the job is queued (no limit
+            without timeout).
+    """
+    SHARED_WORK_DIR = True
+    DONE_FILE = 'done'
+    OUTFILE = 'augustus.gff'
+    CANCEL_FILE = 'cancelled'
+    MAX_WAIT_SLACK = 3600
+
+    def __init__(self, template, poll_interval=10, max_wait=None) -> None:
+        if not template or '{script}' not in template:
+            raise ValueError(
+                'The executor template must contain the placeholder {script}.')
+        self.template = template
+        self.poll_interval = poll_interval if poll_interval else 10
+        self.max_wait = max_wait if max_wait else None
+        self.job_dir = None
+        self._numbers = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, work_dir):
+        self.job_dir = os.path.abspath(os.path.join(work_dir, 'jobs'))
+        util.mkdir_if_not_exists(self.job_dir)
+
+    def execute_bin(self, cmd, options, timeout=None):
+        job_dir = self.create_job_dir()
+        # the job writes into its own directory, so that a job that is
+        # still running after the maximum wait does not overwrite the
+        # result of its retry
+        outfile = util.get_outfile(options)
+        job_outfile = os.path.join(job_dir, self.OUTFILE)
+        job_options = [f'--outfile={job_outfile}' if o.startswith('--outfile=') else o
+                       for o in options]
+        returncode, wall_time, timed_out = self.run_job(
+            job_dir, cmd, job_options, timeout, merge_stderr=True)
+        if outfile and returncode is not None and os.path.isfile(job_outfile):
+            shutil.move(job_outfile, outfile)
+        result = read_text(os.path.join(job_dir, 'stdout'))
+
+        if timed_out:
+            if returncode is not None:
+                print(f'{cmd} killed after exceeding the timeout of {timeout}s.')
+            result = ''
+        elif returncode != 0:
+            print("Returncode", returncode, result)
+            result = ''
+
+        if len(result.strip()):
+            print(result.strip())
+
+        return util.ExecutionResult(cmd, options, returncode, output=result,
+                                    outfile=util.get_outfile(options), timed_out=timed_out,
+                                    resources=util.ResourceUsage(wall_time))
+
+    def execute_bin_piped(self, cmd, options, copy_to=None, timeout=None):
+        job_dir = self.create_job_dir()
+        returncode, wall_time, timed_out = self.run_job(
+            job_dir, cmd, options, timeout, merge_stderr=False)
+        stdout_file = os.path.join(job_dir, 'stdout')
+        result = read_text(os.path.join(job_dir, 'stderr'))
+
+        output = gff.AugustusOutput()
+        if os.path.isfile(stdout_file):
+            with open(stdout_file) as file:
+                for line in file:
+                    output.add_line(line)
+            if copy_to:
+                shutil.copyfile(stdout_file, copy_to)
+
+        if timed_out:
+            if returncode is not None:
+                print(f'{cmd} killed after exceeding the timeout of {timeout}s.')
+        elif returncode != 0:
+            print("Returncode", returncode, result)
+        elif len(result.strip()):
+            print(result.strip())
+
+        return util.ExecutionResult(cmd, options, returncode, output=output,
+                                    timed_out=timed_out,
+                                    resources=util.ResourceUsage(wall_time))
+
+    def create_job_dir(self):
+        with self._lock:
+            number = next(self._numbers)
+        job_dir = os.path.join(self.job_dir, f'job_{number}')
+        util.rmtree_if_exists(job_dir, even_none_empty=True)
+        os.makedirs(job_dir)
+        return job_dir
+
+    def run_job(self, job_dir, cmd, options, timeout=None, merge_stderr=True):
+        """Submits a job and waits for its completion.
+
+        Returns:
+            tuple: The exit status of AUGUSTUS (negative if it was killed
+            by a signal, None if the job did not complete within the
+            maximum wait), the wall time of the job and True if the job
+            exceeded the timeout or the maximum wait.
+        """
+        script = os.path.join(job_dir, 'job.sh')
+        with open(script, 'w') as file:
+            file.write(create_job_script(
+                job_dir, [cmd] + options, timeout, merge_stderr))
+
+        submission = self.template.format(
+            script=shlex.quote(script),
+            name=os.path.basename(job_dir),
+            dir=shlex.quote(job_dir))
+        process = subprocess.run(
+            submission, shell=True, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, universal_newlines=True)
+        if process.returncode != 0:
+            print(f'Submission of {script} failed:', process.stdout)
+            return process.returncode, None, False
+
+        done_file = os.path.join(job_dir, self.DONE_FILE)
+        max_wait = self.get_max_wait(timeout)
+        start = time.monotonic()
+        while not os.path.isfile(done_file):
+            if max_wait is not None and time.monotonic() - start > max_wait:
+                open(os.path.join(job_dir, self.CANCEL_FILE), 'w').close()
+                print(f'Job {script} did not complete within {max_wait}s.')
+                return None, None, True
+            time.sleep(self.poll_interval)
+        with open(done_file) as file:
+            status, wall_time = (int(v) for v in file.read().split())
+
+        # map the status of the shell to the returncode of subprocess
+        returncode = status
+        if status > 128:
+            returncode = 128 - status
+        timed_out = bool(timeout) and returncode == -signal.SIGKILL
+        return returncode, wall_time, timed_out
+
+    def get_max_wait(self, timeout=None):
+        """Returns the maximum time to wait for a job with the given
+        timeout or None."""
+        if self.max_wait:
+            return self.max_wait
+        if timeout:
+            return timeout + self.MAX_WAIT_SLACK
+        return None
+
+
+def create_job_script(job_dir, command, timeout=None, merge_stderr=True):
+    """Creates a shell script executing the command in the current
+    working directory and writing the exit status and the wall time to
+    the completion file of the job directory. Nothing is executed if the
+    job has been cancelled."""
+    command = ' '.join(shlex.quote(c) for c in command)
+    if timeout:
+        command = f'timeout -s KILL {int(timeout)} {command}'
+    stdout = shlex.quote(os.path.join(job_dir, 'stdout'))
+    stderr = '&1' if merge_stderr else shlex.quote(os.path.join(job_dir, 'stderr'))
+    done = shlex.quote(os.path.join(job_dir, CommandTemplateExecutor.DONE_FILE))
+    cancel = shlex.quote(os.path.join(job_dir, CommandTemplateExecutor.CANCEL_FILE))
+    return '\n'.join([
+        '#!/bin/sh',
+        # the job was given up while it was queued
+        f'[ -e {cancel} ] && exit 0',
+        f'cd {shlex.quote(os.getcwd())}',
+        'start=$(date +%s)',
+        f'{command} > {stdout} 2>{stderr}',
+        'status=$?',
+        'end=$(date +%s)',
+        f'echo "$status $((end - start))" > {done}.tmp',
+        f'mv {done}.tmp {done}',
+        ''
+    ])
+
+
+def read_text(filename):
+    if not os.path.isfile(filename):
+        return ''
+    with open(filename) as file:
+        return file.read()
+
+
+def create_executor(name=None, template=None, poll_interval=None, max_wait=None):
+    """Creates the executor of a parallel prediction.
+
+    Args:
+        name (string): Optional; One of EXECUTORS (the default is None,
+            i.e. no executor is created and AUGUSTUS is executed by the
+            threads of util.execute_bin_parallel or as asyncio subprocess).
+        template (string): Optional; The submission command of the
+            template executor.
+        poll_interval (float): Optional; The poll interval of the template
+            executor in seconds.
+        max_wait (float): Optional; The maximum time in seconds the
+            template executor waits for the completion of a job.
+
+    Returns:
+        RunExecutor: The created executor or None.
+    """
+    if not name:
+        return None
+    if name == 'thread':
+        return ThreadExecutor()
+    if name == 'template':
+        return CommandTemplateExecutor(template, poll_interval, max_wait)
+    raise ValueError(
+        f'Unknown executor {name}, use one of: {", ".join(EXECUTORS)}.')
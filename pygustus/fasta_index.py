@@ -0,0 +1,254 @@
+import collections
+import gzip
+import os
+from pygustus.bgzf import BgzfIndex, BgzfReader, is_bgzf
+from pygustus.twobit import is_twobit
+
+
+"""
+Index of a FASTA file, compatible with the .fai index written by
+samtools faidx. It provides the names and lengths of the sequences without
+parsing the file and the extraction of arbitrary sub-ranges by seeking to
+the computed byte offsets. Files compressed with bgzip are supported, the
+offsets then refer to the uncompressed data and are mapped to the
+compressed blocks by the .gzi index.
+"""
+
+IndexEntry = collections.namedtuple(
+    'IndexEntry', ['name', 'length', 'offset', 'linebases', 'linewidth'])
+
+
+class FastaIndex:
+    def __init__(self, fasta_file, index_file=None, write=False) -> None:
+        """Loads the index of the given FASTA file or builds it, if it does
+        not exist or is older than the FASTA file.
+
+        Args:
+            fasta_file (string): The uncompressed or BGZF compressed FASTA
+                file.
+            index_file (string): Optional; The path to the index (the
+                default is None, i.e. fasta_file + '.fai').
+            write (bool): Optional; If True, a built index is written to
+                index_file, if the directory is writable (the default is
+                False, i.e. the index is only kept in memory and no file
+                is created next to the input).
+
+        Raises:
+            ValueError: If the FASTA file cannot be indexed, e.g. because
+                the lines of a sequence have different lengths or it is
+                compressed, but not with bgzip.
+        """
+        self.fasta_file = fasta_file
+        self.index_file = index_file if index_file else f'{fasta_file}.fai'
+        self.entries = dict()
+        self.bgzf_index = None
+        if is_bgzf(fasta_file):
+            self.bgzf_index = BgzfIndex(fasta_file, write=write)
+
+        if is_current(self.index_file, fasta_file):
+            self.load()
+        else:
+            self.build()
+            if write:
+                try:
+                    self.save()
+                except OSError:
+                    # keep the index in memory, e.g. in read-only directories
+                    pass
+
+    @property
+    def names(self):
+        return list(self.entries.keys())
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def get_entry(self, name):
+        if name not in self.entries:
+            raise KeyError(f'Sequence {name} not found in {self.fasta_file}.')
+        return self.entries[name]
+
+    def get_length(self, name):
+        return self.get_entry(name).length
+
+    def get_offset(self, name):
+        """Returns the byte offset of the first base of the sequence."""
+        return self.get_entry(name).offset
+
+    def fetch(self, name, start=1, end=None):
+        """Returns a part of a sequence.
+
+        Args:
+            name (string): The name of the sequence.
+            start (int): Optional; The first position, 1-based (the
+                default is 1).
+            end (int): Optional; The last position, inclusive (the default
+                is None, i.e. the end of the sequence).
+
+        Returns:
+            string: The bases from start to end.
+        """
+        return self.fetch_bytes(name, start, end).decode()
+
+    def fetch_bytes(self, name, start=1, end=None):
+        """Returns a part of a sequence like fetch(), but as bytes."""
+        with self.open() as file:
+            return read_range(file, self.get_entry(name), start, end)
+
+    def fetch_header(self, name):
+        """Returns the header line of a sequence without the leading >."""
+        with self.open() as file:
+            return read_header(file, self.get_entry(name))
+
+    def open(self):
+        """Opens the FASTA file for reading the uncompressed data at the
+        offsets of the index."""
+        return open_fasta(self.fasta_file, self.bgzf_index)
+
+    def load(self):
+        self.entries = dict()
+        with open(self.index_file) as file:
+            for line in file:
+                values = line.rstrip('\n').split('\t')
+                if len(values) < 5:
+                    continue
+                self.entries[values[0]] = IndexEntry(
+                    values[0], *(int(v) for v in values[1:5]))
+
+    def save(self):
+        with open(self.index_file, 'w') as file:
+            for e in self.entries.values():
+                file.write(
+                    f'{e.name}\t{e.length}\t{e.offset}\t{e.linebases}\t{e.linewidth}\n')
+
+    def build(self):
+        self.entries = dict()
+        with open(self.fasta_file, 'rb') as file:
+            is_compressed = file.read(2) == b'\x1f\x8b'
+        if is_twobit(self.fasta_file):
+            raise ValueError(
+                f'{self.fasta_file} is a .2bit file, read it with pygustus.twobit.TwoBitFile.')
+        if is_compressed and self.bgzf_index is None:
+            raise ValueError(
+                f'Cannot index the compressed file {self.fasta_file}, compress it with bgzip.')
+
+        opener = gzip.open if is_compressed else open
+        with opener(self.fasta_file, 'rb') as file:
+            builder = None
+            position = 0
+            for line in file:
+                if line.startswith(b'>'):
+                    self._add(builder)
+                    builder = EntryBuilder(
+                        get_name(line), position + len(line))
+                elif builder:
+                    builder.add_line(line)
+                position += len(line)
+            self._add(builder)
+
+    def _add(self, builder):
+        if builder is None:
+            return
+        entry = builder.create_entry()
+        if entry.name in self.entries:
+            print(f'Ignoring duplicate sequence {entry.name} in {self.fasta_file}.')
+            return
+        self.entries[entry.name] = entry
+
+
+class EntryBuilder:
+    """Collects the index entry of a sequence while reading its lines."""
+
+    def __init__(self, name, offset) -> None:
+        self.name = name
+        self.offset = offset
+        self.length = 0
+        self.linebases = 0
+        self.linewidth = 0
+        self.last_line = False
+
+    def add_line(self, line):
+        bases = len(line.rstrip(b'\r\n'))
+        if self.linewidth == 0:
+            self.linebases = bases
+            self.linewidth = len(line)
+        elif self.last_line and bases > 0 or bases > self.linebases:
+            raise ValueError(
+                f'Different line lengths in sequence {self.name}, the file cannot be indexed.')
+        elif bases < self.linebases or len(line) != self.linewidth:
+            self.last_line = True
+        self.length += bases
+
+    def create_entry(self):
+        return IndexEntry(self.name, self.length, self.offset,
+                          self.linebases, self.linewidth)
+
+
+def get_name(header):
+    """Returns the name of a sequence, i.e. the header line up to the
+    first whitespace, like Biopython and samtools."""
+    fields = header[1:].split(None, 1)
+    return fields[0].decode() if fields else ''
+
+
+def open_fasta(fasta_file, bgzf_index=None):
+    """Opens an uncompressed or BGZF compressed FASTA file for reading at
+    uncompressed offsets."""
+    if bgzf_index is not None or is_bgzf(fasta_file):
+        return BgzfReader(fasta_file, bgzf_index)
+    return open(fasta_file, 'rb')
+
+
+def read_sequence(fasta_file, entry, start=1, end=None, bgzf_index=None):
+    """Reads the bases from start to end (1-based, inclusive) of the
+    sequence with the given IndexEntry as bytes."""
+    with open_fasta(fasta_file, bgzf_index) as file:
+        return read_range(file, entry, start, end)
+
+
+def read_range(file, entry, start=1, end=None):
+    """Reads the bases from start to end of the sequence with the given
+    IndexEntry from an opened FASTA file, see read_sequence()."""
+    if end is None or end > entry.length:
+        end = entry.length
+    if start < 1:
+        start = 1
+    if start > end:
+        return b''
+
+    first = get_byte_position(entry, start - 1)
+    last = get_byte_position(entry, end - 1)
+    file.seek(first)
+    data = file.read(last - first + 1)
+    return data.translate(None, b'\r\n')
+
+
+def read_header(file, entry):
+    """Reads the header line preceding the sequence with the given
+    IndexEntry from an opened FASTA file."""
+    size = 256
+    while True:
+        start = max(entry.offset - size, 0)
+        file.seek(start)
+        data = file.read(entry.offset - start)
+        pos = data.rfind(b'\n>', 0, len(data) - 1)
+        if pos >= 0:
+            data = data[pos + 1:]
+            break
+        if start == 0:
+            break
+        size *= 4
+    return data[1:].rstrip(b'\r\n').decode()
+
+
+def get_byte_position(entry, pos):
+    """Returns the byte offset of the 0-based position pos."""
+    return entry.offset + pos // entry.linebases * entry.linewidth + pos % entry.linebases
+
+
+def is_current(index_file, fasta_file):
+    return os.path.isfile(index_file) and \
+        os.path.getmtime(index_file) >= os.path.getmtime(fasta_file)
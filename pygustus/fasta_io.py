@@ -0,0 +1,167 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+"""
+Reading and writing of FASTA files on the level of bytes. The input is read
+in blocks from a binary stream and each sequence is returned as a
+memoryview of its bases without line breaks, so that no objects are
+created per line or per base. The writer wraps the bases in blocks of
+lines, with NumPy if it is installed, and the output is identical to the
+FASTA output of Biopython.
+"""
+
+# size of the blocks read from the input at once
+BLOCK_SIZE = 4 * 1024 * 1024
+LINE_LENGTH = 60
+# number of lines written at once
+LINES_PER_BLOCK = 10000
+WHITESPACE = b' \t\r\n\x0b\x0c'
+
+
+class FastaRecord:
+    """A sequence of a FASTA file, which provides the attributes of a
+    SeqRecord of Biopython used by Pygustus.
+
+    Attributes:
+        id (string): The name of the sequence, i.e. the header line up to
+            the first whitespace.
+        name (string): The name of the sequence, same as id.
+        description (string): The header line without the leading >.
+        offset (int): The byte offset of the first base in the
+            (uncompressed) file or None, e.g. for a part of a sequence.
+        bases (memoryview): The bases without line breaks.
+    """
+
+    def __init__(self, description, bases, offset=None) -> None:
+        fields = description.split(None, 1)
+        self.id = fields[0] if fields else ''
+        self.name = self.id
+        self.description = description
+        self.offset = offset
+        self.bases = memoryview(bases)
+
+    def __len__(self):
+        return len(self.bases)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError('FASTA records can only be sliced.')
+        return FastaRecord(self.description, self.bases[index])
+
+
+def read_fasta(file):
+    """Yields the records of a FASTA file opened in binary mode.
+
+    Like Biopython, lines before the first header are ignored, the header
+    is stripped of trailing whitespace and whitespace is removed from the
+    sequence lines.
+
+    Args:
+        file (file): The binary stream, e.g. an uncompressed file or the
+            output of a decompression.
+
+    Yields:
+        FastaRecord: The records in the order of the file.
+    """
+    # the offset of data in the stream and the data not processed yet
+    data_offset = 0
+    data = b''
+    # data starts with the > of a header, e.g. at the start of the file
+    header_start = True
+    header = None
+    parts = list()
+    eof = False
+    while not eof:
+        block = file.read(BLOCK_SIZE)
+        eof = not block
+        data += block
+        pos = 0
+        while True:
+            if pos == 0 and header_start and data.startswith(b'>'):
+                start = 0
+            else:
+                start = data.find(b'\n>', max(pos - 1, 0))
+                if start >= 0:
+                    start += 1
+            header_start = False
+
+            if start < 0:
+                if header is not None:
+                    parts.append(data[pos:].translate(None, WHITESPACE))
+                pos = len(data)
+                break
+
+            line_end = data.find(b'\n', start)
+            if line_end < 0 and not eof:
+                # the header continues in the next block
+                if header is not None:
+                    parts.append(data[pos:start].translate(None, WHITESPACE))
+                pos = start
+                header_start = True
+                break
+
+            if header is not None:
+                parts.append(data[pos:start].translate(None, WHITESPACE))
+                yield FastaRecord(header[0], b''.join(parts), header[1])
+                parts = list()
+            if line_end < 0:
+                line_end = len(data) - 1
+            header = (data[start + 1:line_end + 1].rstrip().decode(),
+                      data_offset + line_end + 1)
+            pos = line_end + 1
+
+        if pos > 0:
+            # a header may start with the next block
+            header_start = data[pos - 1:pos] == b'\n'
+        data_offset += pos
+        data = data[pos:]
+
+    if header is not None:
+        yield FastaRecord(header[0], b''.join(parts), header[1])
+
+
+def write_record(file, record, line_length=LINE_LENGTH):
+    """Writes a record to a FASTA file opened in binary mode.
+
+    Args:
+        file (file): The binary output file.
+        record (FastaRecord): The record or any other record with the
+            attributes id, description and bases, e.g. an
+            fasta_methods.IndexedRecord.
+        line_length (int): Optional; The number of bases per line (the
+            default is LINE_LENGTH).
+    """
+    description = record.description.replace('\n', ' ').replace('\r', ' ')
+    if description and description.split(None, 1)[0] == record.id:
+        title = description
+    elif description:
+        title = f'{record.id} {description}'
+    else:
+        title = record.id
+    file.write(f'>{title}\n'.encode())
+
+    bases = record.bases
+    block_size = line_length * LINES_PER_BLOCK
+    for i in range(0, len(bases), block_size):
+        write_lines(file, bases[i:i + block_size], line_length)
+
+
+def write_lines(file, bases, line_length):
+    """Writes the bases with a line break after every line_length bases."""
+    full = len(bases) // line_length * line_length
+    if np is not None and full:
+        # append a column of line breaks to the matrix of the full lines
+        lines = np.frombuffer(bases[:full], dtype=np.uint8).reshape(-1, line_length)
+        wrapped = np.empty((len(lines), line_length + 1), dtype=np.uint8)
+        wrapped[:, :-1] = lines
+        wrapped[:, -1] = ord('\n')
+        file.write(memoryview(wrapped).cast('B'))
+    else:
+        full = 0
+    if full < len(bases):
+        file.write(b'\n'.join(
+            bases[j:j + line_length] for j in range(full, len(bases), line_length)))
+        file.write(b'\n')
@@ -1,100 +1,328 @@
-from Bio import SeqIO
+from concurrent.futures import ProcessPoolExecutor
+import collections
+import functools
+import re
+import pygustus.compression as compression
 import pygustus.util as util
-
-
-def summarize_acgt_content(inputfile):
+from pygustus.bgzf import is_bgzf
+from pygustus.fasta_index import FastaIndex, get_byte_position, read_range, read_sequence
+from pygustus.fasta_io import FastaRecord, read_fasta, write_record
+from pygustus.twobit import TwoBitFile, is_twobit
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+BASE_COUNT_KEYS = ['length', 'a', 'c', 'g', 't', 'n', 'rest', 'masked']
+LOWER_CASE = bytes(range(ord('a'), ord('z') + 1))
+
+# default window size of the sequence statistics, like GCwinsize of AUGUSTUS
+GC_WINDOW_SIZE = 10000
+WINDOW_STATS = ('gc', 'n', 'masked')
+# number of bases read from the memory map at once
+WINDOW_STATS_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def summarize_acgt_content(inputfile, jobs=1):
+    """Counts the bases of each sequence and of the whole file and prints
+    the counts like the AUGUSTUS script summarizeACGTcontent.pl.
+
+    Args:
+        inputfile (string): The FASTA file.
+        jobs (int): Optional; If jobs > 1, the sequences are counted by a
+            pool of jobs processes, which read them from the indexed file
+            (the default is 1).
+
+    Returns:
+        dict: The base counts of each sequence (sequences) and of all
+        sequences (total), see count_bases(). The total additionally
+        contains the number of sequences and the GC content in percent.
+    """
     util.check_file(inputfile)
 
-    letters = ['a', 'c', 'g', 't', 'n']
-    file_sum = dict.fromkeys(letters, 0)
-    file_sum.update({'rest': 0})
-    seq_count = 0
-
-    for seq_record in SeqIO.parse(inputfile, 'fasta'):
-        seq_count += 1
-        seq_sum = 0
-        print_seq_acgt = ''
-
-        for l in letters:
-            value = seq_record.seq.lower().count(l)
-            seq_sum += value
-            if l != 'n':
-                print_seq_acgt += f'   {value} {l}'
-            else:
-                if value > 0:
-                    print_seq_acgt += f'   {value} {l}'
+    summary = {'sequences': list()}
+    total = dict.fromkeys(BASE_COUNT_KEYS, 0)
 
-            update_values(file_sum, l, value)
+    for seq_sum in iter_base_counts(inputfile, jobs):
+        summary['sequences'].append(seq_sum)
+        for key in BASE_COUNT_KEYS:
+            total[key] += seq_sum[key]
 
-        rest = len(seq_record) - seq_sum
-        if rest > 0:
-            print_seq_acgt += f'   {rest} ?'
-            update_values(file_sum, 'rest', rest)
+        print_seq_acgt = ''.join(f'   {seq_sum[l]} {l}' for l in ['a', 'c', 'g', 't'])
+        if seq_sum['n'] > 0:
+            print_seq_acgt += f'   {seq_sum["n"]} n'
+        if seq_sum['rest'] > 0:
+            print_seq_acgt += f'   {seq_sum["rest"]} ?'
 
-        print_seq_line = f'{len(seq_record)} bases.\t{seq_record.id} BASE COUNT  {print_seq_acgt}'
+        print_seq_line = f'{seq_sum["length"]} bases.\t{seq_sum["id"]} BASE COUNT  {print_seq_acgt}'
         print(print_seq_line)
 
-    summary_acgt = ''
-    complete_bp = 0
-    sum_acgt = 0
-
-    for l in letters:
-        if l != 'n':
-            summary_acgt += f'   {file_sum[l]} {l}'
-            complete_bp += file_sum[l]
-
-    sum_acgt += complete_bp
+    sum_acgt = sum(total[l] for l in ['a', 'c', 'g', 't'])
+    total['sequences'] = len(summary['sequences'])
+    total['gc'] = 100 * float(total['g'] + total['c']) / sum_acgt if sum_acgt else 0.0
+    summary['total'] = total
 
-    if file_sum['n'] > 0:
-        summary_acgt += f'   {file_sum[l]} {l}'
-        complete_bp += file_sum['n']
-
-    if file_sum['rest'] > 0:
-        summary_acgt += f'   {file_sum[l]} {l}'
-        complete_bp += file_sum['rest']
-
-    gc = 100 * float(file_sum['g'] + file_sum['c']) / sum_acgt
+    summary_acgt = ''.join(f'   {total[l]} {l}' for l in ['a', 'c', 'g', 't'])
+    if total['n'] > 0:
+        summary_acgt += f'   {total["n"]} n'
+    if total['rest'] > 0:
+        summary_acgt += f'   {total["rest"]} ?'
 
     print(f'summary: BASE COUNT  {summary_acgt}')
-    print(f'total {complete_bp}bp in {seq_count} sequence(s).')
-    print(f'gc: {gc}%')
-
-
-def update_values(file_sum, key, value):
-    cur_value = file_sum[key]
-    file_sum.update({key: cur_value + value})
-
-
-def split(inputfile, outputdir, chunksize, overlap, partition_sequences, minsize, max_seq_size):
+    print(f'total {total["length"]}bp in {total["sequences"]} sequence(s).')
+    print(f'gc: {total["gc"]}%')
+
+    return summary
+
+
+def count_bases(sequence):
+    """Counts the bases of a sequence in a single pass.
+
+    Args:
+        sequence (bytes): The sequence, any bytes-like object.
+
+    Returns:
+        dict: The length of the sequence, the number of a, c, g, t and n
+        (case-insensitive), of other characters (rest) and of soft-masked,
+        i.e. lower case, characters (masked).
+    """
+    if np is not None:
+        byte_counts = np.bincount(
+            np.frombuffer(sequence, dtype=np.uint8), minlength=256).tolist()
+        masked = sum(byte_counts[ord('a'):ord('z') + 1])
+    else:
+        sequence = bytes(sequence)
+        byte_counts = [0] * 256
+        for c in b'acgtnACGTN':
+            byte_counts[c] = sequence.count(bytes([c]))
+        masked = len(sequence) - len(sequence.translate(None, LOWER_CASE))
+
+    counts = {'length': len(sequence)}
+    for l in ['a', 'c', 'g', 't', 'n']:
+        counts[l] = byte_counts[ord(l)] + byte_counts[ord(l.upper())]
+    counts['rest'] = len(sequence) - sum(counts[l] for l in ['a', 'c', 'g', 't', 'n'])
+    counts['masked'] = masked
+    return counts
+
+
+def count_indexed_sequence(fasta_file, entry, bgzf_index=None):
+    counts = count_bases(read_sequence(fasta_file, entry, bgzf_index=bgzf_index))
+    counts['id'] = entry.name
+    return counts
+
+
+def count_twobit_sequence(twobit_file, name):
+    counts = count_bases(TwoBitFile(twobit_file).fetch_bytes(name))
+    counts['id'] = name
+    return counts
+
+
+def iter_base_counts(inputfile, jobs=1):
+    """Yields the base counts of each sequence in the order of the file."""
+    if jobs and jobs > 1 and is_twobit(inputfile):
+        with ProcessPoolExecutor(max_workers=int(jobs)) as executor:
+            yield from executor.map(
+                functools.partial(count_twobit_sequence, inputfile),
+                TwoBitFile(inputfile).names)
+        return
+    if jobs and jobs > 1:
+        try:
+            index = FastaIndex(inputfile)
+        except ValueError as e:
+            print(f'{e} The sequences are counted sequentially.')
+        else:
+            with ProcessPoolExecutor(max_workers=int(jobs)) as executor:
+                # the workers use the index in memory, it is not written
+                yield from executor.map(
+                    functools.partial(count_indexed_sequence, inputfile,
+                                      bgzf_index=index.bgzf_index),
+                    index.entries.values())
+            return
+
+    for seq_record in parse_fasta(inputfile):
+        counts = count_bases(seq_record.bases)
+        counts['id'] = seq_record.id
+        yield counts
+
+
+def compute_window_stats(inputfile, window_size=None, step=None):
+    """Computes the GC content, the fraction of N and the fraction of
+    soft-masked bases in sliding windows of each sequence.
+
+    The sequences are read from a memory map of the indexed FASTA file in
+    blocks of windows, so that whole chromosomes are never loaded. Files
+    compressed with bgzip and .2bit files are read block by block instead.
+
+    Args:
+        inputfile (string): The FASTA file, which must be indexable, i.e.
+            uncompressed or compressed with bgzip, or a .2bit file.
+        window_size (int): Optional; The size of the windows, e.g. the
+            value of the AUGUSTUS parameter GCwinsize (the default is
+            None, i.e. GC_WINDOW_SIZE).
+        step (int): Optional; The distance between the starts of two
+            windows (the default is None, i.e. the windows do not
+            overlap).
+
+    Returns:
+        dict: For each sequence a dict of NumPy arrays: start (0-based)
+        and end of the windows, gc (the fraction of G and C among the
+        bases A, C, G and T, 0 if there are none), n and masked.
+    """
+    if np is None:
+        raise ImportError('NumPy is required to compute window statistics.')
+    util.check_file(inputfile)
+    window_size = int(window_size) if window_size else GC_WINDOW_SIZE
+    step = int(step) if step else window_size
+
+    index = open_index(inputfile)
+    window_stats = dict()
+    if not len(index):
+        # a file without sequences cannot be mapped
+        return window_stats
+
+    if isinstance(index, TwoBitFile):
+        data = index
+    elif index.bgzf_index is None:
+        data = np.memmap(inputfile, dtype=np.uint8, mode='r')
+    else:
+        # compressed files are read block by block
+        data = index.open()
+    try:
+        for entry in index.entries.values():
+            window_stats[entry.name] = compute_sequence_window_stats(
+                data, entry, window_size, step)
+    finally:
+        if isinstance(index, FastaIndex) and index.bgzf_index is not None:
+            data.close()
+    return window_stats
+
+
+def compute_sequence_window_stats(data, entry, window_size, step):
+    starts = np.arange(0, max(entry.length - window_size, 0) + step, step,
+                       dtype=np.int64)
+    if entry.length == 0:
+        starts = starts[:0]
+    ends = np.minimum(starts + window_size, entry.length)
+    stats = {'start': starts, 'end': ends}
+    counts = {key: np.zeros(len(starts), dtype=np.int64)
+              for key in ['gc', 'acgt', 'n', 'masked']}
+
+    windows_per_block = max(WINDOW_STATS_BLOCK_SIZE // step, 1)
+    for i in range(0, len(starts), windows_per_block):
+        block_starts = starts[i:i + windows_per_block]
+        block_ends = ends[i:i + windows_per_block]
+        block_start = int(block_starts[0])
+        bases = map_bases(data, entry, block_start, int(block_ends[-1]))
+
+        upper = bases & 0xDF
+        classes = {
+            'gc': (upper == ord('G')) | (upper == ord('C')),
+            'acgt': np.isin(upper, np.frombuffer(b'ACGT', dtype=np.uint8)),
+            'n': upper == ord('N'),
+            'masked': (bases >= ord('a')) & (bases <= ord('z'))
+        }
+        for key, is_class in classes.items():
+            cumulative = np.concatenate(([0], np.cumsum(is_class, dtype=np.int64)))
+            counts[key][i:i + windows_per_block] = \
+                cumulative[block_ends - block_start] - cumulative[block_starts - block_start]
+
+    lengths = ends - starts
+    stats['gc'] = counts['gc'] / np.maximum(counts['acgt'], 1)
+    stats['n'] = counts['n'] / np.maximum(lengths, 1)
+    stats['masked'] = counts['masked'] / np.maximum(lengths, 1)
+    return stats
+
+
+def map_bases(data, entry, start, end):
+    """Returns the bases from start to end (0-based, exclusive) of the
+    sequence with the given IndexEntry from the memory-mapped FASTA file
+    (or the opened BGZF file or the TwoBitFile) as uint8 array without line
+    breaks."""
+    if isinstance(data, TwoBitFile):
+        return np.frombuffer(data.fetch_bytes(entry.name, start + 1, end), dtype=np.uint8)
+    if not isinstance(data, np.ndarray):
+        return np.frombuffer(read_range(data, entry, start + 1, end), dtype=np.uint8)
+    first = get_byte_position(entry, start)
+    last = get_byte_position(entry, end - 1)
+    raw = data[first:last + 1]
+    return raw[(raw != ord('\n')) & (raw != ord('\r'))]
+
+
+def write_window_stats(outfile, window_stats, stat='gc'):
+    """Writes window statistics computed by compute_window_stats().
+
+    Args:
+        outfile (string): The output file. If it ends with .npz, all
+            statistics are saved as compressed NumPy archive with the
+            arrays <sequence>/<key>, otherwise the given statistic is
+            written in bedGraph format.
+        window_stats (dict): The statistics of each sequence.
+        stat (string): Optional; One of WINDOW_STATS, the statistic
+            written to a bedGraph file (the default is 'gc').
+    """
+    if outfile.endswith('.npz'):
+        arrays = {f'{name}/{key}': values
+                  for name, stats in window_stats.items()
+                  for key, values in stats.items()}
+        np.savez_compressed(outfile, **arrays)
+        return
+
+    if stat not in WINDOW_STATS:
+        raise ValueError(
+            f'Unknown window statistic {stat}, use one of: {", ".join(WINDOW_STATS)}.')
+    with open(outfile, 'w') as file:
+        file.write(f'track type=bedGraph name="{stat}"\n')
+        for name, stats in window_stats.items():
+            for start, end, value in zip(stats['start'].tolist(), stats['end'].tolist(),
+                                         stats[stat].tolist()):
+                file.write(f'{name}\t{start}\t{end}\t{value:.4f}\n')
+
+
+def split(inputfile, outputdir, chunksize, overlap, partition_sequences, minsize, max_seq_size, min_gap_length=0, max_n_fraction=1.0, write_windows=False, threads=1, packing=None):
+    """Splits the input file for a parallel execution of AUGUSTUS.
+
+    The input is read and written sequence by sequence, so that at most
+    one sequence is held in memory. A gzip compressed input is
+    decompressed on the fly, with threads threads if pigz is installed. If
+    write_windows is set, each window of a partitioned sequence is written
+    to a separate file instead of writing the whole sequence once.
+
+    Small sequences are joined in one file until minsize is reached. If
+    packing is given, e.g. by a RunPlan of pygustus.run_planner, it
+    assigns each small sequence to a file instead and minsize is ignored.
+
+    Returns:
+        list: The run information, a dict per run with the run number, the
+        index of the split file, the prediction window of each sequence
+        and the length of the predicted sequence(s). For a window written
+        to a separate file, offset is the position before the window.
+    """
     util.check_file(inputfile)
     util.rmtree_if_exists(outputdir, even_none_empty=True)
     util.mkdir_if_not_exists(outputdir)
 
     fileidx = 0
     run = 0
-    filesize = 0
-    records_to_write = list()
-    records = list(SeqIO.parse(inputfile, 'fasta'))
+    split_file = None
     run_information = list()
+    packed_files = dict()
+    if packing:
+        remaining = collections.Counter(packing.values())
 
-    for seq_record in records:
+    for seq_record, is_last in iter_with_last(parse_fasta(inputfile, threads)):
         seqsize = len(seq_record)
 
         if seqsize > max_seq_size:
-            if len(records_to_write) > 0:
-                fileidx += 1
+            if split_file:
                 run += 1
-                run_information.append(
-                    {
-                        'run': run,
-                        'fileidx': fileidx,
-                        'seqinfo': {x.id: [0, 0] for x in records_to_write}
-                    })
-                write_file(records_to_write, inputfile, outputdir, fileidx)
-                filesize = 0
+                run_information.append(split_file.close(run))
+                split_file = None
 
-            fileidx += 1
-            write_file([seq_record], inputfile, outputdir, fileidx)
+            if not (partition_sequences and write_windows):
+                fileidx += 1
+                SplitFile(inputfile, outputdir, fileidx).write(seq_record)
             if partition_sequences:
                 if chunksize == 0:
                     chunksize = 2500000
@@ -102,74 +330,285 @@ def split(inputfile, outputdir, chunksize, overlap, partition_sequences, minsize
                     chunksize = 3500000
                 if overlap == 0:
                     overlap = int(chunksize / 6)
+                # the whole sequence is only needed to find gaps, windows
+                # of indexed sequences are read separately otherwise
+                sequence = None
+                if min_gap_length or not write_windows:
+                    sequence = seq_record.bases
+                gaps = list()
+                if min_gap_length:
+                    gaps = find_gaps(sequence, min_gap_length)
                 chunks = list()
-                go_on = True
-                while go_on:
-                    if len(chunks) == 0:
-                        chunks.append([1, chunksize])
-                    else:
-                        last_start, last_end = chunks[-1]
-                        start = last_end + 1 - overlap
-                        end = start + chunksize - 1
-                        if end >= seqsize:
-                            end = seqsize
-                            go_on = False
-                        chunks.append([start, end])
+                for segment in get_segments(seqsize, gaps):
+                    chunks.extend(create_chunks(
+                        segment[0], segment[1], chunksize, overlap))
+                if gaps:
+                    chunks = merge_chunks(chunks, chunksize)
                 for c in chunks:
+                    if write_windows:
+                        window = seq_record[c[0] - 1:c[1]]
+                        n_fraction = get_n_fraction(window.bases, 1, len(window))
+                    else:
+                        n_fraction = get_n_fraction(sequence, c[0], c[1])
+                    if n_fraction >= max_n_fraction:
+                        continue
+
                     run += 1
-                    run_information.append(
-                        {
-                            'run': run,
-                            'fileidx': fileidx,
-                            'seqinfo': {seq_record.id: [c[0], c[1]]}
-                        })
+                    if write_windows:
+                        fileidx += 1
+                        SplitFile(inputfile, outputdir, fileidx).write(window)
+                    info = {
+                        'run': run,
+                        'fileidx': fileidx,
+                        'seqinfo': {seq_record.id: [c[0], c[1]]},
+                        'size': c[1] - c[0] + 1
+                    }
+                    if write_windows:
+                        info['offset'] = c[0] - 1
+                    run_information.append(info)
             else:
                 run += 1
                 run_information.append(
                     {
                         'run': run,
                         'fileidx': fileidx,
-                        'seqinfo': {seq_record.id: [0, 0]}
+                        'seqinfo': {seq_record.id: [0, 0]},
+                        'size': seqsize
                     })
-        elif minsize == 0 or filesize + seqsize >= minsize or seq_record.id == records[-1].id:
-            records_to_write.append(seq_record)
-            fileidx += 1
-            run += 1
-            run_information.append(
-                {
-                    'run': run,
-                    'fileidx': fileidx,
-                    'seqinfo': {x.id: [0, 0] for x in records_to_write}
-                })
-            write_file(records_to_write, inputfile, outputdir, fileidx)
-            filesize = 0
+        elif packing and seq_record.id in packing:
+            # a packed file is closed with its last sequence
+            b = packing[seq_record.id]
+            if b not in packed_files:
+                fileidx += 1
+                packed_files[b] = SplitFile(inputfile, outputdir, fileidx)
+            packed_files[b].add(seq_record)
+            remaining[b] -= 1
+            if remaining[b] == 0:
+                run += 1
+                run_information.append(packed_files.pop(b).close(run))
         else:
-            records_to_write.append(seq_record)
-            filesize += seqsize
+            # small sequences are joined in one file until minsize is reached
+            if split_file is None:
+                fileidx += 1
+                split_file = SplitFile(inputfile, outputdir, fileidx)
+            split_file.add(seq_record)
+            if minsize == 0 or split_file.size >= minsize or is_last:
+                run += 1
+                run_information.append(split_file.close(run))
+                split_file = None
+
+    # e.g. files of sequences missing in the input
+    for packed_file in packed_files.values():
+        run += 1
+        run_information.append(packed_file.close(run))
 
     return run_information
 
 
-def write_file(records_to_write, inputfile, outputdir, fileidx):
-    splitpath = util.create_split_filenanme(
-        inputfile, outputdir, fileidx)
-    SeqIO.write(records_to_write, splitpath, 'fasta')
-    records_to_write.clear()
+def parse_fasta(inputfile, threads=1):
+    """Yields the records of a possibly gzip compressed FASTA file or of a
+    .2bit file.
+
+    The records of a FASTA file are read by fasta_io.read_fasta(). The
+    sequences of a file compressed with bgzip or of a .2bit file are
+    not decompressed as a whole, they are read from the indexed file as far
+    as required, see IndexedRecord.
+    """
+    if is_bgzf(inputfile) or is_twobit(inputfile):
+        index = open_index(inputfile)
+        for name in index.names:
+            yield IndexedRecord(index, name)
+        return
+
+    with compression.open_input(inputfile, threads, binary=True) as handle:
+        yield from read_fasta(handle)
+
+
+def open_index(inputfile, write=False):
+    """Returns the index of the sequences of the given file, a TwoBitFile
+    for a .2bit file, otherwise a FastaIndex, which is only written next
+    to the FASTA file if write is set.
+
+    Raises:
+        ValueError: If the FASTA file cannot be indexed.
+    """
+    if is_twobit(inputfile):
+        return TwoBitFile(inputfile)
+    return FastaIndex(inputfile, write=write)
+
+
+class IndexedRecord:
+    """A sequence of an indexed FASTA file or a .2bit file, which can be
+    used like a fasta_io.FastaRecord. The sequence is read when it is
+    accessed for the first time, a slice reads only the part containing it.
+    """
+
+    def __init__(self, index, name) -> None:
+        self.index = index
+        self.id = name
+        self.name = name
+        self._description = None
+        self._bases = None
+
+    def __len__(self):
+        return self.index.get_length(self.id)
+
+    @property
+    def description(self):
+        if self._description is None:
+            self._description = self.index.fetch_header(self.id)
+        return self._description
+
+    @property
+    def bases(self):
+        if self._bases is None:
+            self._bases = memoryview(self.index.fetch_bytes(self.id))
+        return self._bases
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError('Indexed records can only be sliced.')
+        if self._bases is not None:
+            bases = self._bases[index]
+        else:
+            start, stop, _ = index.indices(len(self))
+            bases = self.index.fetch_bytes(self.id, start + 1, stop)
+        return FastaRecord(self.description, bases)
+
+
+def iter_with_last(iterable):
+    """Yields the items of iterable together with a flag, which is True
+    for the last item."""
+    iterator = iter(iterable)
+    try:
+        item = next(iterator)
+    except StopIteration:
+        return
+    for next_item in iterator:
+        yield item, False
+        item = next_item
+    yield item, True
+
+
+class SplitFile:
+    """A file of the split input, the sequences are written as soon as they
+    are added."""
+
+    def __init__(self, inputfile, outputdir, fileidx) -> None:
+        self.fileidx = fileidx
+        self.path = util.create_split_filenanme(inputfile, outputdir, fileidx)
+        self.seqinfo = dict()
+        self.size = 0
+        self._file = None
+
+    def add(self, seq_record):
+        if self._file is None:
+            self._file = open(self.path, 'wb')
+        write_record(self._file, seq_record)
+        self.seqinfo[seq_record.id] = [0, 0]
+        self.size += len(seq_record)
+
+    def write(self, seq_record):
+        """Writes a file containing only the given sequence."""
+        self.add(seq_record)
+        self._file.close()
+
+    def close(self, run):
+        """Closes the file and returns its run information."""
+        self._file.close()
+        return {
+            'run': run,
+            'fileidx': self.fileidx,
+            'seqinfo': self.seqinfo,
+            'size': self.size
+        }
+
+
+def find_gaps(sequence, min_gap_length):
+    """Returns the runs of N of at least min_gap_length in the given
+    sequence (a string or bytes-like object) as list of [start, end]
+    (1-based, inclusive)."""
+    pattern = f'[Nn]{{{int(min_gap_length)},}}'
+    if not isinstance(sequence, str):
+        pattern = pattern.encode()
+    pattern = re.compile(pattern)
+    return [[m.start() + 1, m.end()] for m in pattern.finditer(sequence)]
+
+
+def find_n_runs(inputfile, names):
+    """Returns all runs of N of the given sequences, see find_gaps(). The
+    other sequences of an indexed file are not read."""
+    return {record.id: find_gaps(record.bases, 1)
+            for record in parse_fasta(inputfile) if record.id in names}
+
+
+def get_segments(seqsize, gaps):
+    """Returns the parts of a sequence of length seqsize between the
+    given gaps as list of [start, end]."""
+    segments = list()
+    start = 1
+    for gap_start, gap_end in gaps:
+        if gap_start > start:
+            segments.append([start, gap_start - 1])
+        start = gap_end + 1
+    if start <= seqsize:
+        segments.append([start, seqsize])
+    return segments
+
+
+def create_chunks(start, end, chunksize, overlap):
+    """Covers the range from start to end with windows of at most
+    chunksize, which overlap by overlap."""
+    if overlap >= chunksize:
+        raise ValueError(
+            f'The overlap ({overlap}) must be smaller than the chunksize ({chunksize}).')
+    chunks = [[start, min(start + chunksize - 1, end)]]
+    while chunks[-1][1] < end:
+        chunk_start = chunks[-1][1] + 1 - overlap
+        chunks.append([chunk_start, min(chunk_start + chunksize - 1, end)])
+    return chunks
+
+
+def merge_chunks(chunks, chunksize):
+    """Merges neighboring windows, e.g. of short segments between two
+    gaps, as long as the merged window is not larger than chunksize."""
+    merged = list()
+    for chunk in chunks:
+        if merged and chunk[1] - merged[-1][0] + 1 <= chunksize:
+            merged[-1] = [merged[-1][0], chunk[1]]
+        else:
+            merged.append(list(chunk))
+    return merged
 
 
-def get_sequence_count(inputfile):
+def get_n_fraction(sequence, start, end):
+    window = sequence[start - 1:end]
+    if not len(window):
+        return 1.0
+    window = window.encode() if isinstance(window, str) else bytes(window)
+    return (window.count(b'N') + window.count(b'n')) / len(window)
+
+
+def get_sequence_lengths(inputfile, write_index=False):
+    """Returns the name and length of each sequence in the order of the
+    file, from the index if the file can be indexed, otherwise by reading
+    the sequences. A built index is written next to the file if
+    write_index is set."""
     util.check_file(inputfile)
-    sequences = list(SeqIO.parse(inputfile, 'fasta'))
-    return len(sequences)
+    try:
+        index = open_index(inputfile, write_index)
+    except ValueError:
+        return [(r.id, len(r)) for r in parse_fasta(inputfile)]
+    return [(e.name, e.length) for e in index.entries.values()]
+
+
+def get_sequence_count(inputfile):
+    return len(get_sequence_lengths(inputfile))
 
 
 def get_sequence_size(inputfile, idx=0):
-    util.check_file(inputfile)
-    sequences = list(SeqIO.parse(inputfile, 'fasta'))
-    return len(sequences[idx])
+    return get_sequence_lengths(inputfile)[idx][1]
 
 
 def get_sequence_id(inputfile, idx=0):
-    util.check_file(inputfile)
-    sequences = list(SeqIO.parse(inputfile, 'fasta'))
-    return sequences[idx].id
+    return get_sequence_lengths(inputfile)[idx][0]
@@ -1,3 +1,7 @@
+from concurrent.futures import ProcessPoolExecutor
+import bisect
+import collections
+import functools
 import os
 import re
 
@@ -9,14 +13,44 @@ different sequence segments. Based on the AUGUSTUS script join_aug_pred.pl
 # TODO: gff3 support
 # TODO: add gene droplist?
 
+# a gene of a result file, the text of the gene is length bytes at offset
+GeneRecord = collections.namedtuple(
+    'GeneRecord', ['id', 'sequence', 'start', 'end', 'offset', 'length'])
+
 
 class Gene:
-    def __init__(self, id, sequence, start, end, txt):
+    """A predicted gene of a run.
+
+    The text of the gene is either given or read from the result file of
+    the run at the given offset when it is written. Renaming and shifting
+    the gene only change its attributes, the text is rewritten at write
+    time, see get_text().
+
+    Attributes:
+        id (string): The (new) id of the gene.
+        sequence (string): The name of the sequence.
+        start (string): The first position of the gene.
+        end (string): The last position of the gene.
+        file (string): The result file containing the text of the gene or
+            None, if the text is given.
+        offset (int): The byte offset of the text in file.
+        length (int): The length of the text in bytes.
+    """
+
+    __slots__ = ('id', 'sequence', 'start', 'end', 'file', 'offset', 'length',
+                 '_txt', '_predicted_id', '_shift')
+
+    def __init__(self, id, sequence, start, end, txt=None, file=None, offset=0, length=0):
         self.id = id
         self.sequence = sequence
         self.start = start
         self.end = end
-        self.txt = txt
+        self.file = file
+        self.offset = offset
+        self.length = length
+        self._txt = txt
+        self._predicted_id = id
+        self._shift = 0
 
     def __eq__(self, o: object) -> bool:
         return isinstance(o, Gene) and self.sequence == o.sequence and self.start == o.start
@@ -28,120 +62,414 @@ class Gene:
         return f'Gene {self.id} starts at {self.start} and ends at {self.end} in sequence {self.sequence}.'
 
     def rename(self, id):
-        old_id = self.id
         self.id = id
-        self.txt = self.txt.replace(old_id, id)
 
+    def shift(self, offset):
+        """Moves the gene by offset, e.g. from the coordinates of a
+        sequence window back to the coordinates of the whole sequence."""
+        self.start = str(int(self.start) + offset)
+        self.end = str(int(self.end) + offset)
+        self._shift += offset
+
+    @property
+    def txt(self):
+        return self.get_text()
+
+    def get_text(self, source=None):
+        """Returns the text of the gene with the current id and
+        coordinates.
+
+        Args:
+            source (file): Optional; The result file opened in binary
+                mode, e.g. to read the texts of several genes (the default
+                is None, i.e. the file is opened).
+        """
+        txt = self._txt
+        if txt is None:
+            if source is None:
+                with open(self.file, 'rb') as file:
+                    file.seek(self.offset)
+                    txt = file.read(self.length).decode()
+            else:
+                source.seek(self.offset)
+                txt = source.read(self.length).decode()
+        if self._shift:
+            txt = ''.join(shift_gff_line(line, self._shift)
+                          for line in txt.splitlines(keepends=True))
+        if self.id != self._predicted_id:
+            pattern = create_id_pattern(self._predicted_id, self.sequence)
+            txt = pattern.sub(self.id.replace('\\', r'\\'), txt)
+        return txt
+
+
+class AugustusOutput:
+    """The genes of the output of a single AUGUSTUS run.
+
+    The output is parsed line by line, so that it can be read while
+    AUGUSTUS is still running, e.g. from a pipe.
+    """
 
-class GFFFile:
     def __init__(self) -> None:
         self.header = None
         self.genes = list()
+        self._file_header = ''
+        self._gff3 = False
+        self._gene_lines = list()
+        self._gene_collection = False
+        self._gid = None
+        self._gseq = None
+        self._gstart = None
+        self._gend = None
+
+    def add_line(self, line):
+        # read file header
+        if line.strip().startswith('##gff-version 3'):
+            self._gff3 = True
+
+        if self.header is None:
+            go_on1 = not 'prediction on sequence number' in line.strip()
+            go_on2 = not re.search(
+                "Looks like.*is in.*format", line.strip())
+            if go_on1 and go_on2:
+                self._file_header += line
+            else:
+                self.header = self._file_header
+
+        # read genes
+        # if back compatibility is required add condition like re.search("^### gene", line.strip())
+        if re.search("^# start gene", line.strip()):
+            self._gene_collection = True
+
+        if self._gene_collection:
+            self._gene_lines.append(line)
+
+        l_split = line.strip().split('\t')
+        if len(l_split) > 5:
+            if l_split[2] == 'gene':
+                if self._gff3:
+                    self._gid = l_split[-1].replace('ID=', '').split('.')[-1]
+                else:
+                    self._gid = l_split[-1].split('.')[-1]
+                self._gseq = l_split[0]
+                self._gstart = l_split[3]
+                self._gend = l_split[4]
+
+        # if back compatibility is required add condition like re.search("^### end gene", line.strip())
+        if re.search("^# end gene", line.strip()):
+            self.genes.append(Gene(self._gid, self._gseq, self._gstart,
+                                   self._gend, ''.join(self._gene_lines)))
+            self._gene_collection = False
+            self._gene_lines = list()
+
+    def __len__(self):
+        return len(self.genes)
+
+
+class IndexedAugustusOutput:
+    """The genes of a result file of a single AUGUSTUS run as compact
+    GeneRecords, which can be created in another process, see
+    index_aug_output(). The text of a gene is read from the file when the
+    gene is written.
+    """
+
+    def __init__(self, filepath, header, records) -> None:
+        self.filepath = filepath
+        self.header = header
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def genes(self):
+        """Yields the genes, which point to their text in the result
+        file."""
+        for r in self.records:
+            yield Gene(r.id, r.sequence, r.start, r.end, file=self.filepath,
+                       offset=r.offset, length=r.length)
+
+
+class GFFFile:
+    def __init__(self, file=None, renumber=False) -> None:
+        """Creates an empty joined result.
+
+        Args:
+            file (file): Optional; The opened output file. If given, the
+                joined genes are written as soon as no gene of a later
+                run can replace them, i.e. genes only contains the last
+                joined gene, and finish() must be called after the last
+                run. Otherwise all genes are kept until write() is called.
+            renumber (bool): Optional; If True, the genes are renamed to
+                g1, g2, ... in the order of the output when they are
+                written (the default is False, i.e. the genes keep their
+                ids unless they are already used).
+        """
+        self.header = None
+        self.genes = list()
+        self.gene_count = 0
+        self.renumber = renumber
+        self._file = file
+        self._header_written = False
+        self._written_count = 0
+        # the result file of the last written gene
+        self._source = None
+        # the starts of the joined genes of each sequence, genes are
+        # equal if they start at the same position of the same sequence
+        self._gene_starts = collections.defaultdict(set)
 
     def add_content(self, filepath):
         """Joins the given AUGUSTUS results.
         
         The files should be passed in the order of the AUGUSTUS runs.
         """
-        if not os.path.isfile(filepath):
-            raise ValueError(f'Could not open {filepath}')
+        self.add_output(read_aug_output(filepath))
 
-        gene_txt = ''
-        gene_collection = False
-        with open(filepath) as file:
-            line = file.readline()
-            file_header = ''
-            gff3 = False
-            while line:
-                # read file header
-                if line.strip().startswith('##gff-version 3'):
-                    gff3 = True
-
-                if not self.header:
-                    go_on1 = not 'prediction on sequence number' in line.strip()
-                    go_on2 = not re.search(
-                        "Looks like.*is in.*format", line.strip())
-                    if go_on1 and go_on2:
-                        file_header += line
-                    else:
-                        self.header = file_header
+    def add_output(self, output, offset=0):
+        """Joins the given parsed AUGUSTUS results.
 
-                # read genes
-                # if back compatibility is required add condition like re.search("^### gene", line.strip())
-                if re.search("^# start gene", line.strip()):
-                    gene_collection = True
+        The outputs should be passed in the order of the AUGUSTUS runs.
+        If the run predicted a window of a sequence written to a separate
+        file, offset is the position before the window in the sequence.
+        """
+        if not self.header:
+            self.header = output.header
 
-                if gene_collection:
-                    gene_txt += line
+        for gene in output.genes:
+            if offset:
+                gene.shift(offset)
+            # use unique gene name (id)
+            int_gid = int(gene.id.replace('g', ''))
+            if int_gid <= self.gene_count:
+                new_int_gid = self.gene_count + 1
+                gene.rename(f'g{new_int_gid}')
 
-                l_split = line.strip().split('\t')
-                if len(l_split) > 5:
-                    if l_split[2] == 'gene':
-                        if gff3:
-                            gid = l_split[-1].replace('ID=', '').split('.')[-1]
-                        else:
-                            gid = l_split[-1].split('.')[-1]
-                        gseq = l_split[0]
-                        gstart = l_split[3]
-                        gend = l_split[4]
-
-                # if back compatibility is required add condition like re.search("^### end gene", line.strip())
-                if re.search("^# end gene", line.strip()):
-                    gene = Gene(gid, gseq, gstart, gend, gene_txt)
-
-                    # use unique gene name (id)
-                    int_gid = int(gid.replace('g', ''))
-                    if int_gid <= len(self.genes):
-                        new_int_gid = len(self.genes) + 1
-                        gene.rename(f'g{new_int_gid}')
-
-                    # do not add redundant genes of two possibly overlapping neighboring runs
-                    if len(self.genes) > 0:
-                        if not gene in self.genes:
-                            last_gene = self.genes[-1]
-                            if gene.sequence == last_gene.sequence and int(gene.start) < int(last_gene.end):
-                                pass
-                            else:
-                                self.genes.append(gene)
-                        else:
-                            last_gene = self.genes[-1]
-                            if gene.sequence == last_gene.sequence and int(gene.start) == int(last_gene.start):
-                                gene.rename(last_gene.id)
-                                self.genes[-1] = gene
+            # do not add redundant genes of two possibly overlapping neighboring runs
+            if self.gene_count > 0:
+                if not gene.start in self._gene_starts[gene.sequence]:
+                    last_gene = self.genes[-1]
+                    if gene.sequence == last_gene.sequence and int(gene.start) < int(last_gene.end):
+                        pass
                     else:
-                        self.genes.append(gene)
+                        self._append(gene)
+                else:
+                    last_gene = self.genes[-1]
+                    if gene.sequence == last_gene.sequence and int(gene.start) == int(last_gene.start):
+                        gene.rename(last_gene.id)
+                        self.genes[-1] = gene
+            else:
+                self._append(gene)
+
+        if self._file is not None:
+            self._flush()
+
+    def _append(self, gene):
+        self.genes.append(gene)
+        self.gene_count += 1
+        self._gene_starts[gene.sequence].add(gene.start)
+
+    def _flush(self):
+        """Writes all genes except the last one, which may still be
+        replaced by the same gene of the next run."""
+        # the header is taken from the first run with a header
+        if not self.header:
+            return
+        self._write_header()
+        for g in self.genes[:-1]:
+            self._write_gene(self._file, g)
+        del self.genes[:-1]
 
-                    gene_collection = False
-                    gene_txt = ''
+    def _write_header(self):
+        if not self._header_written:
+            self._file.write(self.header if self.header else '')
+            self._header_written = True
 
-                line = file.readline()
+    def _write_gene(self, file, gene):
+        if self.renumber:
+            self._written_count += 1
+            gene.rename(f'g{self._written_count}')
+        source = None
+        if gene.file is not None:
+            if self._source is None or self._source.name != gene.file:
+                self._close_source()
+                self._source = open(gene.file, 'rb')
+            source = self._source
+        file.write(gene.get_text(source))
+
+    def _close_source(self):
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+    def finish(self):
+        """Writes the remaining genes to the output file given on
+        creation."""
+        self._write_header()
+        for g in self.genes:
+            self._write_gene(self._file, g)
+        self.genes = list()
+        self._close_source()
 
     def write(self, filename):
         with open(filename, "w") as file:
             file.write(self.header)
+            self._written_count = 0
             for g in self.genes:
-                file.write(g.txt)
+                self._write_gene(file, g)
+        self._close_source()
+
+
+def read_aug_output(filepath):
+    """Reads the given result file of a single AUGUSTUS run.
+
+    Returns:
+        AugustusOutput: The parsed genes of the run.
+    """
+    if not os.path.isfile(filepath):
+        raise ValueError(f'Could not open {filepath}')
+
+    output = AugustusOutput()
+    with open(filepath) as file:
+        line = file.readline()
+        while line:
+            output.add_line(line)
+            line = file.readline()
+    return output
+
+
+def index_aug_output(filepath):
+    """Reads the given result file of a single AUGUSTUS run like
+    read_aug_output(), but keeps only the position of the text of each
+    gene in the file.
+
+    Returns:
+        IndexedAugustusOutput: The header and the GeneRecords of the run.
+    """
+    if not os.path.isfile(filepath):
+        raise ValueError(f'Could not open {filepath}')
+
+    header_lines = list()
+    header = None
+    gff3 = False
+    records = list()
+    # the offset of the gene text, None outside of a gene
+    gene_offset = None
+    gid = gseq = gstart = gend = None
+    position = 0
+    with open(filepath, 'rb') as file:
+        for line in file:
+            stripped = line.strip()
+            if stripped.startswith(b'##gff-version 3'):
+                gff3 = True
+
+            if header is None:
+                if b'prediction on sequence number' in stripped or \
+                        re.search(b'Looks like.*is in.*format', stripped):
+                    header = b''.join(header_lines).decode()
+                else:
+                    header_lines.append(line)
 
+            if gene_offset is None and stripped.startswith(b'# start gene'):
+                gene_offset = position
+            position += len(line)
+
+            l_split = stripped.split(b'\t')
+            if len(l_split) > 5 and l_split[2] == b'gene':
+                attributes = l_split[-1].decode()
+                if gff3:
+                    attributes = attributes.replace('ID=', '')
+                gid = attributes.split('.')[-1]
+                gseq = l_split[0].decode()
+                gstart = l_split[3].decode()
+                gend = l_split[4].decode()
+
+            if stripped.startswith(b'# end gene'):
+                if gene_offset is None:
+                    gene_offset = position
+                records.append(GeneRecord(gid, gseq, gstart, gend, gene_offset,
+                                          position - gene_offset))
+                gene_offset = None
+
+    return IndexedAugustusOutput(filepath, header, records)
+
+
+def index_aug_outputs(filepaths, jobs=1):
+    """Indexes the given result files with index_aug_output().
+
+    Args:
+        filepaths (list): The result files.
+        jobs (int): Optional; If jobs > 1, the files are read by a pool of
+            jobs processes (the default is 1).
 
-def join_aug_pred(out_file, pred_files):
+    Returns:
+        list: The IndexedAugustusOutput of each file in the given order.
+    """
+    if jobs and jobs > 1 and len(filepaths) > 1:
+        with ProcessPoolExecutor(max_workers=min(int(jobs), len(filepaths))) as executor:
+            return list(executor.map(index_aug_output, filepaths))
+    return [index_aug_output(filepath) for filepath in filepaths]
+
+
+def join_aug_pred(out_file, pred_files, jobs=1, renumber=False):
     """Joins the given AUGUSTUS results.
     
-    After all result parts are joinedand it writes the result to the given
-    out_file. The files should be passed in the order of the AUGUSTUS runs.
+    The result is written to the given out_file while the files are
+    joined, so that only one file is held in memory. The files should be
+    passed in the order of the AUGUSTUS runs.
 
     Args:
         out_file (string): The path to the ouput file to write the
             joined results.
         pred_files (list): A list of AUGUSTUS result file names
             ordered by runs.
+        jobs (int): Optional; If jobs > 1, the files are parsed in
+            parallel by jobs processes into the positions of their genes,
+            which are then joined in the order of the runs, see
+            index_aug_outputs() (the default is 1).
+        renumber (bool): Optional; If True, the joined genes are renamed
+            to g1, g2, ... (the default is False).
+    """
+    with open(out_file, 'w') as file:
+        gff = GFFFile(file, renumber)
+        if jobs and jobs > 1:
+            for output in index_aug_outputs(pred_files, jobs):
+                gff.add_output(output)
+        else:
+            for pred in pred_files:
+                gff.add_content(pred)
+        gff.finish()
+
+
+def join_aug_outputs(out_file, outputs, offsets=None, renumber=False):
+    """Joins the given parsed AUGUSTUS results.
+
+    Works like join_aug_pred, but the results of the runs have already
+    been parsed into AugustusOutput objects, e.g. while reading the
+    output of AUGUSTUS from a pipe.
+
+    Args:
+        out_file (string): The path to the ouput file to write the
+            joined results.
+        outputs (list): A list of AugustusOutput objects ordered by runs.
+        offsets (list): Optional; The offset of the coordinates of each
+            output, see GFFFile.add_output().
+        renumber (bool): Optional; If True, the joined genes are renamed
+            to g1, g2, ... (the default is False).
     """
-    gff = GFFFile()
-    for pred in pred_files:
-        gff.add_content(pred)
-    gff.write(out_file)
+    if offsets is None:
+        offsets = [0] * len(outputs)
+    with open(out_file, 'w') as file:
+        gff = GFFFile(file, renumber)
+        for output, offset in zip(outputs, offsets):
+            gff.add_output(output, offset)
+        gff.finish()
 
 
-def create_hint_parts(inputfile, outfile, sequences, whitespaces=False):
+def create_hint_parts(inputfile, outfile, sequences, whitespaces=False, offset=0):
+    """Writes the hints of the given sequences and prediction windows.
+
+    If offset is given, the hints are moved by -offset, i.e. into the
+    coordinates of a window written to a separate file.
+    """
     output = list()
     with open(inputfile) as file:
         line = file.readline()
@@ -155,7 +483,7 @@ def create_hint_parts(inputfile, outfile, sequences, whitespaces=False):
                 start, end = sequences[l_split[0]]
                 if start > 0 and end > 0:
                     if int(l_split[3]) >= start and int(l_split[4]) <= end:
-                        output.append(line)
+                        output.append(shift_gff_line(line, -offset) if offset else line)
                 else:
                     output.append(line)
 
@@ -164,3 +492,90 @@ def create_hint_parts(inputfile, outfile, sequences, whitespaces=False):
     with open(outfile, "w") as file:
         for line in output:
             file.write(line)
+
+
+def shift_gff_line(line, offset):
+    """Moves the start and end (columns 4 and 5) of a GFF line by offset,
+    other lines are returned unchanged."""
+    if line.startswith('#'):
+        return line
+    l_split = line.split('\t')
+    if len(l_split) < 5 or not l_split[3].isdigit() or not l_split[4].isdigit():
+        return line
+    l_split[3] = str(int(l_split[3]) + offset)
+    l_split[4] = str(int(l_split[4]) + offset)
+    return '\t'.join(l_split)
+
+
+@functools.lru_cache(maxsize=1024)
+def create_id_pattern(gene_id, sequence):
+    """Returns a pattern matching the gene id as a whole token, e.g. g1 in
+    g1.t1 or in ctg1.g1 (the id prefixed with the sequence name, like with
+    the AUGUSTUS parameter uniqueGeneId), but neither in g10 nor in the
+    sequence name ctg1. Only the id itself is matched, so that a match is
+    replaced by the new id alone.
+
+    The token must not start a line, so that a sequence named like a gene
+    id is kept, i.e. it is only found in the attributes (column 9) and in
+    the comments of a gene.
+    """
+    # the pattern starts with the id, so that it is searched for as a
+    # literal, and the start of the token is looked behind
+    token = re.escape(gene_id)
+    token_start = r'[^\w.\n-]'
+    return re.compile(f'{token}(?![\\w-])(?:(?<={token_start}{token})|'
+                      f'(?<={token_start}{re.escape(sequence)}\\.{token}))')
+
+
+def read_hint_starts(inputfile, whitespaces=False):
+    """Returns the sorted start positions of the hints of each sequence."""
+    starts = dict()
+    with open(inputfile) as file:
+        line = file.readline()
+        while line:
+            if whitespaces:
+                l_split = re.split(' +', line.strip())
+            else:
+                l_split = line.strip().split('\t')
+
+            if len(l_split) > 4:
+                starts.setdefault(l_split[0], list()).append(int(l_split[3]))
+
+            line = file.readline()
+
+    for seq_starts in starts.values():
+        seq_starts.sort()
+    return starts
+
+
+def count_hints(inputfile, run_information, whitespaces=False):
+    """Counts the hints that fall into the prediction window of each run.
+
+    Only the start positions of the hints are considered, which is
+    sufficient to estimate the cost of a run.
+
+    Args:
+        inputfile (string): The path to the hints file.
+        run_information (list): The run information created by
+            fasta_methods.split.
+        whitespaces (bool): Optional; Set to True if the columns of the
+            hints file are separated by spaces (the default is False).
+
+    Returns:
+        dict: The number of hints per run number.
+    """
+    starts = read_hint_starts(inputfile, whitespaces)
+
+    hint_counts = dict()
+    for ri in run_information:
+        count = 0
+        for seq, (start, end) in ri['seqinfo'].items():
+            seq_starts = starts.get(seq, [])
+            if start > 0 and end > 0:
+                count += bisect.bisect_right(seq_starts, end) - \
+                    bisect.bisect_left(seq_starts, start)
+            else:
+                count += len(seq_starts)
+        hint_counts[ri['run']] = count
+
+    return hint_counts
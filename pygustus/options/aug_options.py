@@ -163,7 +163,8 @@ class AugustusOptions:
 
     def setPygustusDefaultValues(self):
         for key, item in self._allowed_options.items():
-            if not self.get_value_or_none(key) and item.default_value and \
+            # explicit values like 0 or False are kept
+            if self.get_value_or_none(key) is None and item.default_value and \
                     'augustus' in item.get_exclude() and \
                     'etraining' in item.get_exclude():
                 if item.type == 'int':
@@ -82,6 +82,51 @@ allowed_parameters = [
         DESCRIPTION: 'Parallelize large sequences by automatically setting the AUGUSTUS parameters predictionStart and predictionEnd based on the given values for chunksize and overlap.',
         EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
     },
+    {
+        NAME: 'minGapLength',
+        DEVELOPMENT: False,
+        TYPE: TYPE_INT,
+        USAGE: 'minGapLength=n',
+        DEFAULT: '0',
+        DESCRIPTION: 'If this option is set to n > 0, partitionLargeSequences=True and jobs > 1, runs of at least n N are not predicted and the sequence segments are cut within these gaps, so that no overlap is needed there. Neighboring segments are combined as long as they fit into chunksize.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'maxNFraction',
+        DEVELOPMENT: False,
+        TYPE: TYPE_FLOAT,
+        USAGE: 'maxNFraction=f',
+        DEFAULT: '1.0',
+        DESCRIPTION: 'If partitionLargeSequences=True and jobs > 1, sequence segments with at least this fraction of N are not predicted. The default 1.0 only skips segments that consist entirely of N.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'writeChunkWindows',
+        DEVELOPMENT: False,
+        TYPE: TYPE_BOOL,
+        USAGE: 'writeChunkWindows=True/False',
+        DEFAULT: 'False',
+        DESCRIPTION: 'If this option is set to True, partitionLargeSequences=True and jobs > 1, only the sequence segment of each AUGUSTUS job is written to a separate file instead of writing the whole sequence once for all jobs. The coordinates of the hints and the predicted genes are shifted accordingly. This reduces the I/O and memory usage of the jobs on large sequences.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'balanceRuns',
+        DEVELOPMENT: False,
+        TYPE: TYPE_BOOL,
+        USAGE: 'balanceRuns=True/False',
+        DEFAULT: 'False',
+        DESCRIPTION: 'If this option is set to True and jobs > 1, the runs are planned by their estimated cost (sequence length and hints): small sequences are packed into runs of similar cost and the chunksize of large sequences is chosen for the number of jobs. minSplitSize and chunksize are ignored, the overlap is kept. The plan can be inspected with plan_prediction() before the execution.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'renumberGenes',
+        DEVELOPMENT: False,
+        TYPE: TYPE_BOOL,
+        USAGE: 'renumberGenes=True/False',
+        DEFAULT: 'False',
+        DESCRIPTION: 'If this option is set to True and jobs > 1, the genes of the joined output are renamed to g1, g2, ... in the order of the output. Otherwise the genes keep the ids of their runs unless an id is already used by a previous run.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
     {
         NAME: 'debugOutputDir',
         DEVELOPMENT: False,
@@ -91,6 +136,141 @@ allowed_parameters = [
         DESCRIPTION: 'If the directory is specified, all generated files, i.e. the split of the input file and intermediate results, as well as the generated AUGUSTUS command lines are stored there. This option works only for the parallelization, i. e. jobs > 1 is set.',
         EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
     },
+    {
+        NAME: 'cacheDir',
+        DEVELOPMENT: False,
+        TYPE: TYPE_STRING,
+        USAGE: 'cacheDir=path/to/dir',
+        DEFAULT: None,
+        DESCRIPTION: 'If this option is set and jobs > 1, the results of the single AUGUSTUS jobs are cached in the given directory. A job is skipped if its result is already cached, i.e. if the sequence part, the prediction window, the hints, the AUGUSTUS options and the AUGUSTUS version did not change. The cache may be shared by several processes.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'cacheMaxSize',
+        DEVELOPMENT: False,
+        TYPE: TYPE_INT,
+        USAGE: 'cacheMaxSize=n',
+        DEFAULT: '10240',
+        DESCRIPTION: 'The maximum size of the cache (see cacheDir) in megabytes. If the cache grows beyond this size, the least recently used results are removed.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'workDir',
+        DEVELOPMENT: False,
+        TYPE: TYPE_STRING,
+        USAGE: 'workDir=path/to/dir',
+        DEFAULT: None,
+        DESCRIPTION: 'If this option is set and jobs > 1, the split input file, the intermediate results and a manifest of all AUGUSTUS jobs with their completion state are stored in the given directory instead of a temporary directory. Existing contents of the directory are replaced, unless the prediction is resumed (see resume). The directory is kept after the prediction.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'resume',
+        DEVELOPMENT: False,
+        TYPE: TYPE_BOOL,
+        USAGE: 'resume=True/False',
+        DEFAULT: 'False',
+        DESCRIPTION: 'If this option is set to True and a work directory (see workDir) of an interrupted prediction with the same input and options is given, only the AUGUSTUS jobs that are missing or failed are executed before the results are joined.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'jobTimeout',
+        DEVELOPMENT: False,
+        TYPE: TYPE_INT,
+        USAGE: 'jobTimeout=n',
+        DEFAULT: None,
+        DESCRIPTION: 'If this option is set and jobs > 1, each AUGUSTUS job is killed if it runs longer than n seconds. A killed job counts as failed.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'jobRetries',
+        DEVELOPMENT: False,
+        TYPE: TYPE_INT,
+        USAGE: 'jobRetries=n',
+        DEFAULT: '0',
+        DESCRIPTION: 'If this option is set and jobs > 1, a failed or killed AUGUSTUS job is repeated up to n times.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'jobRetryDelay',
+        DEVELOPMENT: False,
+        TYPE: TYPE_INT,
+        USAGE: 'jobRetryDelay=n',
+        DEFAULT: '10',
+        DESCRIPTION: 'The delay in seconds before a failed AUGUSTUS job is repeated for the first time (see jobRetries). The delay is doubled for each further retry.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'allowPartialResults',
+        DEVELOPMENT: False,
+        TYPE: TYPE_BOOL,
+        USAGE: 'allowPartialResults=True/False',
+        DEFAULT: 'False',
+        DESCRIPTION: 'If this option is set to False and jobs > 1, the prediction fails with an error if an AUGUSTUS job fails. If it is set to True, the results of the successful jobs are joined and the failed jobs are reported.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'runReport',
+        DEVELOPMENT: False,
+        TYPE: TYPE_STRING,
+        USAGE: 'runReport=json/tsv',
+        DEFAULT: None,
+        DESCRIPTION: 'If this option is set to json or tsv and jobs > 1, a report with the predicted sequence parts, their length, the number of hints and genes, the wall time, the CPU time and the peak memory usage of each AUGUSTUS job is written next to the joined output, e.g. augustus.gff.runs.json.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'maxMemory',
+        DEVELOPMENT: False,
+        TYPE: TYPE_INT,
+        USAGE: 'maxMemory=n',
+        DEFAULT: None,
+        DESCRIPTION: 'Sets the memory budget in MB for the AUGUSTUS jobs if jobs > 1. A job is only started if its estimated memory usage, which is based on the sequence length and the number of hints and refined by the observed memory usage of finished jobs, fits into the remaining budget. Smaller jobs are started while a larger job waits for free memory.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'executor',
+        DEVELOPMENT: False,
+        TYPE: TYPE_STRING,
+        USAGE: 'executor=thread/template',
+        DEFAULT: None,
+        DESCRIPTION: 'Sets the backend that executes the AUGUSTUS jobs if jobs > 1: thread (local child processes started by threads) or template (jobs of a batch system submitted by executorTemplate).',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'executorTemplate',
+        DEVELOPMENT: False,
+        TYPE: TYPE_STRING,
+        USAGE: 'executorTemplate=command',
+        DEFAULT: None,
+        DESCRIPTION: 'Sets the command that submits an AUGUSTUS job if executor=template, e.g. sbatch --wrap="sh {script}". The placeholder {script} is replaced by the path to a shell script executing the job, {name} by a job name and {dir} by the job directory. The work directory (see workDir) must be shared with the nodes of the batch system.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'executorPollInterval',
+        DEVELOPMENT: False,
+        TYPE: TYPE_INT,
+        USAGE: 'executorPollInterval=n',
+        DEFAULT: '10',
+        DESCRIPTION: 'Sets the interval in seconds in which the completion of the submitted jobs is checked if executor=template.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'executorMaxWait',
+        DEVELOPMENT: False,
+        TYPE: TYPE_INT,
+        USAGE: 'executorMaxWait=n',
+        DEFAULT: None,
+        DESCRIPTION: 'Sets the maximum time in seconds to wait for the completion of a submitted job if executor=template. A job that does not complete in time counts as timed out and is retried (see jobRetries). By default, the wait is limited to jobTimeout plus one hour if jobTimeout is set.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
+    {
+        NAME: 'pipeOutput',
+        DEVELOPMENT: False,
+        TYPE: TYPE_BOOL,
+        USAGE: 'pipeOutput=True/False',
+        DEFAULT: 'False',
+        DESCRIPTION: 'If this option is set to True and jobs > 1, the output of each AUGUSTUS job is read from a pipe and parsed while the job is running instead of writing and reading intermediate result files.',
+        EXCLUDE_APPS: [EXCLUDE_AUGUSTUS, EXCLUDE_ETRAINING]
+    },
     {
         NAME: 'species',
         DEVELOPMENT: False,
@@ -0,0 +1,217 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pygustus.fasta_index import FastaIndex
+
+
+"""
+On-disk cache for the results of single AUGUSTUS runs of a parallel
+prediction. The entries are addressed by a hash of everything that
+determines the result of a run, so that unchanged sequence parts do not
+have to be predicted again. The cache may be shared by several processes.
+"""
+
+TMP_PREFIX = '.tmp_'
+# temporary files older than this (in seconds) are left by an aborted
+# store() and are removed on eviction
+STALE_TMP_AGE = 3600
+# the number of bases hashed at once
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class RunCache:
+    def __init__(self, cache_dir, max_size=None) -> None:
+        """Opens (and creates if required) the cache in the given directory.
+
+        Args:
+            cache_dir (string): The directory containing the cache entries.
+            max_size (int): Optional; The maximum size of all entries in
+                bytes. If the cache grows beyond this size, the least
+                recently used entries are removed (the default is None,
+                i.e. the size is not limited).
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._hashes = dict()
+        self._indexes = dict()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def create_key(self, input_file, window, hints_file, options, version, offset=0):
+        """Creates the key of an AUGUSTUS run.
+
+        Args:
+            input_file (string): The input file of the run.
+            window (dict): The prediction window of each sequence.
+            hints_file (string): The hints file of the run or None.
+            options (list): The AUGUSTUS command line arguments, which
+                must not contain temporary paths except the input, hints
+                and output file.
+            version (string): The version of the AUGUSTUS executable.
+            offset (int): Optional; The position of the input file's
+                first base in the sequence, if it contains only the window
+                (the default is 0).
+
+        Returns:
+            string: The key of the run.
+        """
+        ignored = ('--outfile=', '--hintsfile=')
+        key_options = [o for o in options
+                       if o != input_file and not o.startswith(ignored)]
+        content = {
+            'sequence': self.window_hash(input_file, window, offset),
+            'window': window,
+            'hints': self.file_hash(hints_file) if hints_file else None,
+            'options': key_options,
+            'version': version
+        }
+        key = json.dumps(content, sort_keys=True).encode()
+        return hashlib.sha256(key).hexdigest()
+
+    def file_hash(self, filename):
+        """Returns the hash of the given file's contents.
+
+        The hash is computed only once per file and instance, since all
+        chunks of a large sequence share the same input file.
+        """
+        if filename not in self._hashes:
+            self._hashes[filename] = file_sha256(filename)
+        return self._hashes[filename]
+
+    def window_hash(self, input_file, window, offset=0):
+        """Returns the hash of the bases in the prediction window of each
+        sequence, so that a run's key does not change with the other parts
+        of its input file. The whole file is hashed, if it cannot be
+        indexed.
+        """
+        index = self._open_index(input_file)
+        if index is None:
+            return self.file_hash(input_file)
+        sha = hashlib.sha256()
+        for name, (start, end) in sorted(window.items()):
+            length = index.get_length(name)
+            if start > 0 and end > 0:
+                start, end = start - offset, min(end - offset, length)
+            else:
+                start, end = 1, length
+            sha.update(f'>{name}\n'.encode())
+            for pos in range(start, end + 1, HASH_BLOCK_SIZE):
+                sha.update(index.fetch_bytes(
+                    name, pos, min(pos + HASH_BLOCK_SIZE - 1, end)))
+        return sha.hexdigest()
+
+    def _open_index(self, filename):
+        if filename not in self._indexes:
+            try:
+                self._indexes[filename] = FastaIndex(filename)
+            except ValueError:
+                self._indexes[filename] = None
+        return self._indexes[filename]
+
+    def open(self, key):
+        """Opens the cached result for the given key.
+
+        Returns:
+            file: The opened result in text mode or None, if the key is
+            not cached.
+        """
+        path = self._entry_path(key)
+        try:
+            file = open(path)
+        except FileNotFoundError:
+            return None
+
+        # mark the entry as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return file
+
+    def fetch(self, key, outfile):
+        """Copies the cached result for the given key to outfile.
+
+        Returns:
+            bool: True if the key was cached, otherwise False.
+        """
+        file = self.open(key)
+        if file is None:
+            return False
+        with file, open(outfile, 'w') as out:
+            shutil.copyfileobj(file, out)
+        return True
+
+    def store(self, key, result_file):
+        """Stores a copy of result_file for the given key."""
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # write to a temporary file first, the rename is atomic
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix=TMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'w') as out, open(result_file) as file:
+                shutil.copyfileobj(file, out)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        if self.max_size:
+            self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the size of the cache
+        is not larger than max_size.
+
+        Temporary files of store() count towards the size; they are
+        removed if they are older than STALE_TMP_AGE, e.g. left by a killed
+        process.
+        """
+        with open(os.path.join(self.cache_dir, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            entries = list()
+            total_size = 0
+            now = time.time()
+            for subdir, _, files in os.walk(self.cache_dir):
+                for f in files:
+                    is_tmp = f.startswith(TMP_PREFIX)
+                    if not f.endswith('.gff') and not is_tmp:
+                        continue
+                    path = os.path.join(subdir, f)
+                    try:
+                        stat = os.stat(path)
+                        if is_tmp and now - stat.st_mtime > STALE_TMP_AGE:
+                            os.remove(path)
+                            continue
+                    except FileNotFoundError:
+                        continue
+                    if not is_tmp:
+                        entries.append((stat.st_mtime, stat.st_size, path))
+                    total_size += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.gff')
+
+
+def file_sha256(filename):
+    """Returns the SHA-256 hash of the given file's contents."""
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            sha.update(block)
+    return sha.hexdigest()
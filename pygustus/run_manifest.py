@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+
+
+"""
+Manifest of the runs of a parallel prediction in a persistent work
+directory. It records the planned runs and their completion state, so
+that an interrupted prediction can be resumed.
+"""
+
+PLANNED = 'planned'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class RunManifest:
+    FILENAME = 'manifest.json'
+
+    def __init__(self, work_dir) -> None:
+        self.path = os.path.join(work_dir, self.FILENAME)
+        self.signature = None
+        self.runs = list()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Loads an existing manifest.
+
+        Returns:
+            bool: True if a manifest was found, otherwise False.
+        """
+        if not os.path.isfile(self.path):
+            return False
+        with open(self.path) as file:
+            content = json.load(file)
+        self.signature = content['signature']
+        self.runs = content['runs']
+        return True
+
+    def matches(self, signature):
+        """Checks if the manifest belongs to a prediction with the given
+        signature, i.e. the same input and options."""
+        # compare the JSON representations, e.g. tuples become lists
+        return json.loads(json.dumps(signature)) == self.signature
+
+    def create(self, signature, runs):
+        """Creates a new manifest.
+
+        Args:
+            signature (dict): Describes the input and options of the
+                prediction.
+            runs (list): The planned runs as dicts, each containing the
+                key 'number'.
+        """
+        self.signature = signature
+        self.runs = list()
+        for run in runs:
+            run = dict(run)
+            run['status'] = PLANNED
+            self.runs.append(run)
+        with self._lock:
+            self._write()
+
+    def get_status(self, number):
+        for run in self.runs:
+            if run['number'] == number:
+                return run['status']
+        return None
+
+    def set_status(self, number, status):
+        """Updates the state of a run and writes the manifest."""
+        with self._lock:
+            for run in self.runs:
+                if run['number'] == number:
+                    run['status'] = status
+            self._write()
+
+    def _write(self):
+        # write to a temporary file first, the rename is atomic
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump({'signature': self.signature, 'runs': self.runs},
+                      file, indent=4, sort_keys=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,289 @@
+import bisect
+import heapq
+import math
+import pygustus.fasta_methods as fm
+
+
+"""
+Cost-based planning of the runs of a parallel prediction. The cost of a
+run is estimated from the length of its sequences and the number of
+hints. Consecutive small sequences are packed into runs of balanced cost,
+so that the runs keep the order of the input file, and the chunk size of large sequences is chosen so that the estimated makespan
+of all runs on the given number of jobs is minimal.
+"""
+
+# the limits of the chunk size, the upper limit is also used by the split
+MIN_CHUNKSIZE = 500000
+MAX_CHUNKSIZE = 3500000
+# the cost of a hint and of starting AUGUSTUS, e.g. loading the
+# parameters, in bases
+HINT_COST = 50
+RUN_OVERHEAD = 100000
+# the largest number of runs per job considered by the planner
+MAX_RUNS_PER_JOB = 8
+
+
+def estimate_cost(size, hints=0):
+    """Estimates the cost of an AUGUSTUS run in bases."""
+    return size + HINT_COST * hints
+
+
+def estimate_makespan(costs, jobs):
+    """Estimates the makespan of runs with the given costs, which are
+    started with the most expensive run first on jobs jobs, like the
+    runs of util.execute_bin_parallel."""
+    loads = [0] * max(int(jobs), 1)
+    for cost in sorted(costs, reverse=True):
+        heapq.heapreplace(loads, loads[0] + cost + RUN_OVERHEAD)
+    return max(loads)
+
+
+class PlannedRun:
+    """A run of a RunPlan.
+
+    Attributes:
+        seqinfo (dict): The prediction window of each sequence, [0, 0]
+            for a complete sequence, like the run information of
+            fasta_methods.split.
+        size (int): The length of the predicted sequence(s).
+        hints (int): The number of hints in the prediction windows.
+    """
+
+    def __init__(self, seqinfo, size, hints=0) -> None:
+        self.seqinfo = seqinfo
+        self.size = size
+        self.hints = hints
+
+    @property
+    def cost(self):
+        return estimate_cost(self.size, self.hints)
+
+    def to_dict(self):
+        return {
+            'seqinfo': self.seqinfo,
+            'size': self.size,
+            'hints': self.hints,
+            'cost': self.cost
+        }
+
+
+class RunPlan:
+    """The planned runs of a parallel prediction.
+
+    Attributes:
+        runs (list): The PlannedRun objects.
+        jobs (int): The number of jobs the plan was created for.
+        chunksize (int): The chunk size of large sequences.
+        overlap (int): The overlap of the chunks of large sequences.
+        packing (dict): The index of the run of each small sequence; the
+            sequences of a run are written to the same split file. The
+            sequences of a run are consecutive in the input file, so that
+            the runs and their joined results follow the input order.
+    """
+
+    def __init__(self, runs, jobs, chunksize, overlap, packing) -> None:
+        self.runs = runs
+        self.jobs = jobs
+        self.chunksize = chunksize
+        self.overlap = overlap
+        self.packing = packing
+
+    @property
+    def total_cost(self):
+        return sum(run.cost for run in self.runs)
+
+    @property
+    def makespan(self):
+        """The estimated makespan of the runs in bases."""
+        return estimate_makespan([run.cost for run in self.runs], self.jobs)
+
+    @property
+    def balance(self):
+        """The ratio of the mean load of the jobs to the makespan, 1.0
+        if all jobs are busy until the last run has finished."""
+        if not self.runs:
+            return 1.0
+        total = self.total_cost + RUN_OVERHEAD * len(self.runs)
+        return total / (max(int(self.jobs), 1) * self.makespan)
+
+    def to_dict(self):
+        return {
+            'jobs': self.jobs,
+            'chunksize': self.chunksize,
+            'overlap': self.overlap,
+            'total_cost': self.total_cost,
+            'makespan': self.makespan,
+            'balance': self.balance,
+            'runs': [run.to_dict() for run in self.runs]
+        }
+
+    def print_summary(self):
+        print(f'Planned {len(self.runs)} runs for {self.jobs} jobs with chunksize {self.chunksize} and overlap {self.overlap}, estimated balance {self.balance:.0%}.')
+
+
+def create_plan(sequences, jobs, max_seq_size, overlap=0, partition_sequences=True, hint_starts=None, min_gap_length=0, max_n_fraction=1.0, n_runs=None):
+    """Plans the runs of a parallel prediction.
+
+    Args:
+        sequences (list): The name and length of each sequence in the
+            order of the input file.
+        jobs (int): The number of jobs.
+        max_seq_size (int): Sequences longer than max_seq_size are
+            predicted in separate runs and partitioned, if
+            partition_sequences is set.
+        overlap (int): Optional; The overlap of the chunks of large
+            sequences (the default is 0, i.e. one sixth of the chunk
+            size).
+        partition_sequences (bool): Optional; If False, large sequences
+            are predicted in a single run (the default is True).
+        hint_starts (dict): Optional; The sorted start positions of the
+            hints of each sequence.
+        min_gap_length (int): Optional; Large sequences are split at runs
+            of N of at least this length, like by fasta_methods.split()
+            (the default is 0, i.e. they are not split at gaps).
+        max_n_fraction (float): Optional; Chunks with at least this
+            fraction of N are not predicted (the default is 1.0).
+        n_runs (dict): Optional; The runs of N of each large sequence, see
+            fasta_methods.find_n_runs(). Gaps and the fraction of N are
+            only considered if they are given.
+
+    Returns:
+        RunPlan: The plan with the smallest estimated makespan.
+    """
+    jobs = max(int(jobs), 1)
+    hint_starts = hint_starts if hint_starts else dict()
+    n_runs = n_runs if n_runs else dict()
+    sequence_order = list()
+    small = list()
+    large = dict()
+    for name, length in sequences:
+        sequence_order.append(name)
+        if length > max_seq_size:
+            large[name] = length
+        else:
+            small.append((name, length, len(hint_starts.get(name, []))))
+
+    min_chunksize = MIN_CHUNKSIZE
+    if overlap:
+        min_chunksize = max(MIN_CHUNKSIZE, 2 * overlap)
+    min_chunksize = min(min_chunksize, MAX_CHUNKSIZE)
+
+    total = sum(length for _, length in sequences)
+    best_plan = None
+    for runs_per_job in range(1, MAX_RUNS_PER_JOB + 1):
+        target = max(math.ceil(total / (jobs * runs_per_job)), 1)
+        chunksize = min(max(target, min_chunksize), MAX_CHUNKSIZE)
+        plan = create_candidate_plan(
+            sequence_order, small, large, jobs, target, chunksize, overlap,
+            partition_sequences, hint_starts, min_gap_length, max_n_fraction, n_runs)
+        if best_plan is None or plan.makespan < best_plan.makespan:
+            best_plan = plan
+    return best_plan
+
+
+def create_candidate_plan(sequence_order, small, large, jobs, target, chunksize, overlap, partition_sequences, hint_starts, min_gap_length=0, max_n_fraction=1.0, n_runs=None):
+    chunk_overlap = overlap if overlap else int(chunksize / 6)
+    n_runs = n_runs if n_runs else dict()
+    runs = list()
+    packing = dict()
+    sizes = {name: length for name, length, _ in small}
+    hint_counts = {name: hints for name, _, hints in small}
+
+    # the consecutive small sequences between two large sequences are
+    # packed into bins of about the target cost, the runs are ordered
+    # like the split, which closes a bin with its last sequence
+    group = list()
+    for name in sequence_order + [None]:
+        if name is not None and name not in large:
+            group.append(name)
+            continue
+        bin_runs = dict()
+        costs = [estimate_cost(sizes[n], hint_counts[n]) for n in group]
+        for seq_name, b in zip(group, pack_sequences(costs, target)):
+            if b not in bin_runs:
+                bin_runs[b] = PlannedRun(dict(), 0)
+                runs.append(bin_runs[b])
+            run = bin_runs[b]
+            run.seqinfo[seq_name] = [0, 0]
+            run.size += sizes[seq_name]
+            run.hints += hint_counts[seq_name]
+            packing[seq_name] = len(runs) - 1
+        group = list()
+
+        if name is None:
+            break
+        if not partition_sequences:
+            # large sequences are always predicted in a separate run
+            runs.append(PlannedRun({name: [0, 0]}, large[name],
+                                   len(hint_starts.get(name, []))))
+        else:
+            length = large[name]
+            starts = hint_starts.get(name, [])
+            for start, end in create_chunks(length, chunksize, chunk_overlap, n_runs.get(name),
+                                            min_gap_length, max_n_fraction):
+                hints = count_starts(starts, start, end)
+                runs.append(PlannedRun({name: [start, end]}, end - start + 1, hints))
+
+    # number the bins in the order of the runs
+    numbers = dict()
+    for b in packing.values():
+        numbers.setdefault(b, len(numbers))
+    packing = {name: numbers[b] for name, b in packing.items()}
+    return RunPlan(runs, jobs, chunksize, chunk_overlap, packing)
+
+
+def pack_sequences(costs, target):
+    """Packs consecutive sequences with the given costs into bins of about
+    the target cost.
+
+    Returns:
+        list: The bin of each sequence, the bins are consecutive ranges
+        of the sequences.
+    """
+    total = sum(costs)
+    count = min(max(math.ceil(total / target), 1), len(costs))
+    bins = list()
+    load = 0
+    for cost in costs:
+        # the bin containing the middle of the sequence
+        b = int((load + cost / 2) * count / total) if total else 0
+        bins.append(min(b, count - 1))
+        load += cost
+    return bins
+
+
+def create_chunks(length, chunksize, overlap, n_runs=None, min_gap_length=0, max_n_fraction=1.0):
+    """Returns the windows of a large sequence like fasta_methods.split(),
+    i.e. split at the runs of N of at least min_gap_length and without
+    the windows with a fraction of N of at least max_n_fraction, if the
+    sorted runs of N of the sequence are given."""
+    n_runs = n_runs if n_runs else list()
+    gaps = list()
+    if min_gap_length:
+        gaps = [[s, e] for s, e in n_runs if e - s + 1 >= min_gap_length]
+    chunks = list()
+    for segment in fm.get_segments(length, gaps):
+        chunks.extend(fm.create_chunks(segment[0], segment[1], chunksize, overlap))
+    if gaps:
+        chunks = fm.merge_chunks(chunks, chunksize)
+    if n_runs:
+        ends = [e for _, e in n_runs]
+        chunks = [c for c in chunks
+                  if count_n(n_runs, ends, c[0], c[1]) / (c[1] - c[0] + 1) < max_n_fraction]
+    return chunks
+
+
+def count_n(n_runs, ends, start, end):
+    """Counts the positions of the sorted runs of N from start to end."""
+    count = 0
+    for i in range(bisect.bisect_left(ends, start), len(n_runs)):
+        run_start, run_end = n_runs[i]
+        if run_start > end:
+            break
+        count += min(run_end, end) - max(run_start, start) + 1
+    return count
+
+
+def count_starts(starts, start, end):
+    """Counts the sorted positions from start to end."""
+    return bisect.bisect_right(starts, end) - bisect.bisect_left(starts, start)
@@ -0,0 +1,257 @@
+import bisect
+import struct
+import pygustus.fasta_io as fasta_io
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+"""
+Reader of genomes in the UCSC .2bit format. The file contains an index of
+the sequences, so that any window of a sequence can be read by seeking to
+its packed bases (four bases per byte). The bytes are unpacked with a
+table of the four bases of each byte value, with NumPy if it is
+installed. Runs of N and soft-masked regions are stored as block tables
+per sequence and applied to the window.
+"""
+
+SIGNATURE = 0x1A412743
+TWOBIT_EXTENSION = '.2bit'
+BASES = 'TCAG'
+# the four bases packed into each byte value
+BYTE_BASES = [''.join(BASES[(b >> shift) & 3] for shift in (6, 4, 2, 0)).encode()
+              for b in range(256)]
+BYTE_BASES_TABLE = None
+if np is not None:
+    BYTE_BASES_TABLE = np.frombuffer(b''.join(BYTE_BASES), dtype=np.uint8).reshape(256, 4)
+
+
+def is_twobit(filename):
+    """Checks the signature of the given file."""
+    with open(filename, 'rb') as file:
+        header = file.read(4)
+    return len(header) == 4 and SIGNATURE in (
+        struct.unpack('<I', header)[0], struct.unpack('>I', header)[0])
+
+
+class TwoBitSequence:
+    """The length and the N and mask blocks of a sequence in a .2bit file.
+
+    Attributes:
+        name (string): The name of the sequence.
+        length (int): The number of bases.
+        dna_offset (int): The file offset of the packed bases.
+        n_blocks (tuple): The sorted 0-based starts and the ends of the
+            runs of N, see read_blocks().
+        mask_blocks (tuple): The sorted 0-based starts and the ends of the
+            soft-masked regions.
+    """
+
+    def __init__(self, name, length, dna_offset, n_blocks, mask_blocks) -> None:
+        self.name = name
+        self.length = length
+        self.dna_offset = dna_offset
+        self.n_blocks = n_blocks
+        self.mask_blocks = mask_blocks
+
+
+class TwoBitFile:
+    def __init__(self, filename) -> None:
+        """Reads the index of the given .2bit file.
+
+        The block tables of a sequence are read when the sequence is
+        accessed for the first time.
+
+        Raises:
+            ValueError: If the file is not a .2bit file.
+        """
+        self.filename = filename
+        self.offsets = dict()
+        self._sequences = dict()
+
+        with open(filename, 'rb') as file:
+            header = file.read(16)
+            if len(header) < 16:
+                raise ValueError(f'{filename} is not a .2bit file.')
+            for byte_order in ('<', '>'):
+                if struct.unpack(f'{byte_order}I', header[:4])[0] == SIGNATURE:
+                    break
+            else:
+                raise ValueError(f'{filename} is not a .2bit file.')
+            self.byte_order = byte_order
+            version, count = struct.unpack(f'{byte_order}II', header[4:12])
+            if version not in (0, 1):
+                raise ValueError(f'Unsupported .2bit version {version} of {filename}.')
+            # version 1 uses 64 bit offsets for files larger than 4 GB
+            offset_format = f'{byte_order}Q' if version == 1 else f'{byte_order}I'
+            offset_size = struct.calcsize(offset_format)
+
+            for _ in range(count):
+                name_size = file.read(1)[0]
+                name = file.read(name_size).decode()
+                self.offsets[name] = struct.unpack(
+                    offset_format, file.read(offset_size))[0]
+
+    @property
+    def names(self):
+        return list(self.offsets.keys())
+
+    @property
+    def entries(self):
+        """The TwoBitSequence of each sequence, like the entries of a
+        fasta_index.FastaIndex."""
+        return {name: self.get_sequence(name) for name in self.names}
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, name):
+        return name in self.offsets
+
+    def get_sequence(self, name):
+        """Returns the TwoBitSequence of the given sequence."""
+        if name not in self.offsets:
+            raise KeyError(f'Sequence {name} not found in {self.filename}.')
+        if name not in self._sequences:
+            with open(self.filename, 'rb') as file:
+                self._sequences[name] = self._read_sequence(file, name)
+        return self._sequences[name]
+
+    def get_length(self, name):
+        return self.get_sequence(name).length
+
+    def fetch_header(self, name):
+        """Returns the header of a sequence, i.e. its name."""
+        self.get_sequence(name)
+        return name
+
+    def fetch(self, name, start=1, end=None):
+        """Returns a part of a sequence with soft-masked regions in lower
+        case.
+
+        Args:
+            name (string): The name of the sequence.
+            start (int): Optional; The first position, 1-based (the
+                default is 1).
+            end (int): Optional; The last position, inclusive (the default
+                is None, i.e. the end of the sequence).
+
+        Returns:
+            string: The bases from start to end.
+        """
+        return self.fetch_bytes(name, start, end).decode()
+
+    def fetch_bytes(self, name, start=1, end=None):
+        """Returns a part of a sequence like fetch(), but as bytearray."""
+        sequence = self.get_sequence(name)
+        if end is None or end > sequence.length:
+            end = sequence.length
+        start = max(start, 1) - 1
+        if start >= end:
+            return bytearray()
+
+        first_byte = start // 4
+        last_byte = (end - 1) // 4
+        with open(self.filename, 'rb') as file:
+            file.seek(sequence.dna_offset + first_byte)
+            packed = file.read(last_byte - first_byte + 1)
+        bases = unpack_bases(packed)
+        skip = start - first_byte * 4
+        del bases[skip + end - start:]
+        del bases[:skip]
+
+        n_starts, n_ends = get_overlapping_blocks(sequence.n_blocks, start, end)
+        mask_starts, mask_ends = get_overlapping_blocks(sequence.mask_blocks, start, end)
+        if np is not None:
+            array = np.frombuffer(bases, dtype=np.uint8)
+            if len(n_starts):
+                array[get_block_mask(n_starts - start, n_ends - start, len(array))] = ord('N')
+            if len(mask_starts):
+                # the bases are upper case letters
+                array[get_block_mask(mask_starts - start, mask_ends - start, len(array))] |= 0x20
+        else:
+            for block_start, block_end in zip(n_starts, n_ends):
+                bases[block_start - start:block_end - start] = b'N' * (block_end - block_start)
+            for block_start, block_end in zip(mask_starts, mask_ends):
+                i, j = block_start - start, block_end - start
+                bases[i:j] = bases[i:j].lower()
+        return bases
+
+    def _read_sequence(self, file, name):
+        order = self.byte_order
+        file.seek(self.offsets[name])
+        length, n_count = struct.unpack(f'{order}II', file.read(8))
+        n_blocks = read_blocks(file, order, n_count)
+        mask_count = struct.unpack(f'{order}I', file.read(4))[0]
+        mask_blocks = read_blocks(file, order, mask_count)
+        # skip the reserved field
+        dna_offset = file.tell() + 4
+        return TwoBitSequence(name, length, dna_offset, n_blocks, mask_blocks)
+
+
+def unpack_bases(packed):
+    """Returns the four bases of each of the packed bytes as bytearray."""
+    bases = bytearray(4 * len(packed))
+    if np is not None:
+        np.take(BYTE_BASES_TABLE, np.frombuffer(packed, dtype=np.uint8), axis=0,
+                out=np.frombuffer(bases, dtype=np.uint8).reshape(-1, 4))
+    else:
+        bases[:] = b''.join(map(BYTE_BASES.__getitem__, packed))
+    return bases
+
+
+def read_blocks(file, byte_order, count):
+    """Reads a block table: count starts followed by count sizes.
+
+    Returns:
+        tuple: The starts and the ends of the blocks, as NumPy arrays if
+        NumPy is installed, otherwise as lists.
+    """
+    starts = file.read(4 * count)
+    sizes = file.read(4 * count)
+    if np is not None:
+        starts = np.frombuffer(starts, dtype=f'{byte_order}u4').astype(np.int64)
+        return starts, starts + np.frombuffer(sizes, dtype=f'{byte_order}u4')
+    starts = list(struct.unpack(f'{byte_order}{count}I', starts))
+    sizes = struct.unpack(f'{byte_order}{count}I', sizes)
+    return starts, [s + size for s, size in zip(starts, sizes)]
+
+
+def get_overlapping_blocks(blocks, start, end):
+    """Returns the starts and the ends of the parts of the sorted blocks
+    between start and end (0-based, exclusive)."""
+    starts, ends = blocks
+    # the first block ending after start and the first starting at end
+    if np is not None and isinstance(starts, np.ndarray):
+        i = np.searchsorted(ends, start, side='right')
+        j = np.searchsorted(starts, end, side='left')
+        return np.maximum(starts[i:j], start), np.minimum(ends[i:j], end)
+    i = bisect.bisect_right(ends, start)
+    j = bisect.bisect_left(starts, end)
+    return ([max(s, start) for s in starts[i:j]],
+            [min(e, end) for e in ends[i:j]])
+
+
+def get_block_mask(starts, ends, length):
+    """Returns a boolean array, which is True within the sorted,
+    non-overlapping blocks."""
+    delta = np.zeros(length + 1, dtype=np.int8)
+    delta[starts] = 1
+    delta[ends] -= 1
+    return np.cumsum(delta[:-1], dtype=np.int8).view(bool)
+
+
+def write_fasta(twobit_file, outfile, line_length=60):
+    """Converts a .2bit file into a FASTA file, sequence by sequence."""
+    genome = TwoBitFile(twobit_file)
+    with open(outfile, 'wb') as out:
+        for name in genome.names:
+            out.write(f'>{name}\n'.encode())
+            length = genome.get_length(name)
+            # read the sequence in windows of whole lines
+            window = line_length * fasta_io.LINES_PER_BLOCK
+            for start in range(0, length, window):
+                fasta_io.write_lines(
+                    out, genome.fetch_bytes(name, start + 1, start + window), line_length)
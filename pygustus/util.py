@@ -1,92 +1,1485 @@
+import asyncio
+import contextlib
+import functools
 import subprocess
 import os
 import os.path
 import re
 import json
 import shutil
+import statistics
 import tempfile
+import threading
 from shutil import which
 from pygustus.options.aug_options import *
 from pkg_resources import resource_filename
+import pygustus.compression as compression
 import pygustus.fasta_methods as fm
 import pygustus.gff_methods as gff
-from concurrent.futures import ThreadPoolExecutor
+import pygustus.run_planner as run_planner
+import pygustus.twobit as twobit
+from pygustus.run_cache import RunCache
+from pygustus.run_manifest import RunManifest
+import pygustus.run_manifest as run_manifest
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import sysconfig
 import time
 import random
 import string
+import sys
 
-def execute_bin_parallel(cmd, aug_options, jobs, chunksize, overlap, partition_sequences, part_hints, minsize, max_seq_size, debug_dir):
-    print(f'Execute AUGUSTUS with {jobs} jobs in parallel.')
+RUN_REPORT_FORMATS = ('json', 'tsv')
+# the subdirectory of the work directory containing the split input
+SPLIT_DIR = 'split'
+# marks a persistent work directory created by Pygustus
+WORK_DIR_MARKER = '.pygustus'
 
-    input_file = aug_options.get_input_filename()[1]
+
+class ParallelOptions:
+    """The options of a parallel execution, i.e. the Pygustus options of
+    the README as returned by augustus.get_parallel_options().
+
+    Attributes:
+        jobs (int): The number of runs executed at the same time.
+        chunksize, overlap, partition_sequences, part_hints, minsize,
+        max_seq_size, min_gap_length, max_n_fraction, write_windows,
+        balance_runs: The split of the input file, see prepare_runs().
+        debug_dir (string): The directory the work directory is copied to
+            or None.
+        pipe_output (bool): Whether the output of AUGUSTUS is read from a
+            pipe.
+        cache_dir, cache_max_size: The RunCache or None.
+        work_dir (string): The persistent work directory or None.
+        resume (bool): Whether a previous execution in work_dir is
+            resumed.
+        timeout, retries, retry_delay: The RetryPolicy of the runs.
+        allow_partial (bool): Whether failed runs are skipped by the join.
+        run_report (string): The format of the run report or None.
+        max_memory (int): The memory limit of the running runs in MB or
+            None, see RunDispatcher.
+        executor (RunExecutor): The backend of pygustus.executors
+            executing the command lines of the runs or None, i.e.
+            AUGUSTUS is executed locally.
+        renumber_genes (bool): Whether the joined genes are renamed.
+    """
+
+    def __init__(self, jobs=1, chunksize=0, overlap=0, partition_sequences=True, part_hints=False, minsize=0, max_seq_size=3500000, debug_dir=None, pipe_output=False, cache_dir=None, cache_max_size=None, work_dir=None, resume=False, timeout=None, retries=0, retry_delay=10, allow_partial=False, run_report=None, max_memory=None, executor=None, min_gap_length=0, max_n_fraction=1.0, write_windows=False, balance_runs=False, renumber_genes=False) -> None:
+        self.jobs = jobs
+        self.chunksize = chunksize
+        self.overlap = overlap
+        self.partition_sequences = partition_sequences
+        self.part_hints = part_hints
+        self.minsize = minsize
+        self.max_seq_size = max_seq_size
+        self.debug_dir = debug_dir
+        self.pipe_output = pipe_output
+        self.cache_dir = cache_dir
+        self.cache_max_size = cache_max_size
+        self.work_dir = work_dir
+        self.resume = resume
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.allow_partial = allow_partial
+        self.run_report = run_report
+        self.max_memory = max_memory
+        self.executor = executor
+        self.min_gap_length = min_gap_length
+        self.max_n_fraction = max_n_fraction
+        self.write_windows = write_windows
+        self.balance_runs = balance_runs
+        self.renumber_genes = renumber_genes
+
+
+def execute_bin_parallel(cmd, aug_options, options):
+    """Executes AUGUSTUS in parallel on parts of the input file.
+
+    The results of the runs are joined in the order of the runs as soon as
+    all previous runs have finished, see RunJoiner. The runs are executed
+    by a pool of local threads, see ThreadRunner.
+
+    Args:
+        options (ParallelOptions): The options of the parallel execution.
+
+    Returns:
+        ExecutionResult: The result of the parallel execution, the
+        returncode is the first non-zero returncode of the runs (if any),
+        options contains the command line arguments of all runs and
+        run_stats the statistics of each run (see collect_run_stats).
+    """
+    with ThreadRunner(options.jobs, options.executor) as runner:
+        return run_steps(execute_parallel_steps(cmd, aug_options, options), runner)
+
+
+async def execute_bin_parallel_async(cmd, aug_options, options, semaphore=None):
+    """Executes AUGUSTUS in parallel on parts of the input file.
+
+    Works like execute_bin_parallel, but the runs are awaited as
+    asyncio subprocesses and the blocking steps (split and join) are
+    executed in the default executor of the running event loop, see
+    AsyncRunner.
+
+    Args:
+        options (ParallelOptions): The options of the parallel execution.
+            If options.executor is given, the command lines of the runs
+            are executed by this backend in the default executor of the
+            event loop instead of as asyncio subprocesses.
+        semaphore (asyncio.Semaphore): Optional; A semaphore shared by
+            several predictions to limit the number of concurrently running
+            AUGUSTUS processes. The runs of this call are additionally
+            limited by jobs.
+
+    Returns:
+        ExecutionResult: The result of the parallel execution, see
+        execute_bin_parallel().
+    """
+    runner = AsyncRunner(options.executor, semaphore)
+    return await run_steps_async(execute_parallel_steps(cmd, aug_options, options), runner)
+
+
+def execute_parallel_steps(cmd, aug_options, options):
+    """Plans, executes, caches and joins the runs of a parallel execution.
+
+    The blocking steps and the execution of the runs are yielded to the
+    runner of execute_bin_parallel() or execute_bin_parallel_async(), see
+    run_steps().
+
+    Returns:
+        ExecutionResult: The result of the parallel execution.
+    """
+    print(f'Execute AUGUSTUS with {options.jobs} jobs in parallel.')
+
+    if options.run_report:
+        check_run_report_format(options.run_report)
+    executor = options.executor
+    check_executor(executor, options.work_dir)
+    joined_outfile = get_joined_outfile(aug_options)
+    cache = create_run_cache(options.cache_dir, options.cache_max_size)
+
+    with open_work_dir(options.work_dir) as tmpdir:
+        manifest = RunManifest(tmpdir) if options.work_dir else None
+        runs, pending_runs = yield Step('call', plan_runs, cmd, aug_options, tmpdir, options, cache, manifest)
+
+        dispatcher = RunDispatcher(pending_runs, options.jobs, options.max_memory)
+        results = dict()
+        try:
+            joiner = yield Step(
+                'call', RunJoiner, joined_outfile, runs, pending_runs, options.pipe_output,
+                options.allow_partial, options.jobs, options.renumber_genes)
+            with joiner:
+                if executor:
+                    yield Step('call', executor.start, tmpdir)
+                running = 0
+                try:
+                    finished = list()
+                    while dispatcher.has_pending_runs() or running:
+                        for run in dispatcher.start_runs():
+                            yield Step('start', run, execute_run_steps(cmd, run, options, cache, manifest))
+                            running += 1
+                        # join the finished runs while the started runs are executed
+                        for run in finished:
+                            yield Step('call', joiner.add_result, run, results[run.number])
+                        finished = list()
+                        for run, result in (yield Step('wait')):
+                            running -= 1
+                            results[run.number] = result
+                            dispatcher.finish_run(run, result)
+                            finished.append(run)
+                    for run in finished:
+                        yield Step('call', joiner.add_result, run, results[run.number])
+                finally:
+                    if running:
+                        yield Step('wait_all')
+                    if executor:
+                        yield Step('call', executor.shutdown)
+                print_cache_summary(cache, results.values())
+
+                check_run_results(runs, results, options.allow_partial, manifest)
+                gene_counts = yield Step('call', joiner.finish)
+            print(f'Joined output written to: {joined_outfile}')
+        finally:
+            if options.debug_dir:
+                yield Step('call', copy_debug_output, tmpdir, options.debug_dir, runs)
+
+    return (yield Step('call', create_parallel_result, cmd, runs, results, gene_counts,
+                       joined_outfile, options.run_report))
+
+
+def create_parallel_result(cmd, runs, results, gene_counts, joined_outfile, run_report=None):
+    """Creates the ExecutionResult of a parallel execution and writes the
+    run report next to the joined output, if run_report is set to a
+    report format."""
+    returncode = next((r.returncode for r in results.values() if r.returncode), 0)
+    result = ExecutionResult(cmd, [run.options for run in runs], returncode,
+                             outfile=joined_outfile)
+    result.run_stats = collect_run_stats(runs, results, gene_counts)
+
+    if run_report:
+        report_file = f'{joined_outfile}.runs.{run_report}'
+        write_run_report(report_file, result.run_stats, run_report)
+        print(f'Run report written to: {report_file}')
+
+    return result
+
+
+@contextlib.contextmanager
+def open_work_dir(work_dir=None):
+    """Provides the directory for the split input and the results of the
+    runs: the given persistent work directory or a temporary directory.
+
+    Raises:
+        ValueError: If the persistent work directory contains files that
+            were not written by Pygustus, see check_work_dir().
+    """
+    if work_dir:
+        check_work_dir(work_dir)
+        mkdir_if_not_exists(work_dir)
+        open(os.path.join(work_dir, WORK_DIR_MARKER), 'a').close()
+        yield work_dir
+    else:
+        with tempfile.TemporaryDirectory(prefix='.tmp_') as tmpdir:
+            yield tmpdir
+
+
+def check_work_dir(work_dir):
+    """Checks that the persistent work directory is new, empty or the
+    work directory of a previous prediction (containing WORK_DIR_MARKER or
+    a RunManifest), since its contents are replaced.
+
+    Raises:
+        ValueError: If the directory contains other files, e.g. the input.
+    """
+    if not os.path.exists(work_dir):
+        return
+    if not os.path.isdir(work_dir):
+        raise ValueError(f'The work directory {work_dir} is not a directory.')
+    contents = os.listdir(work_dir)
+    if contents and WORK_DIR_MARKER not in contents and RunManifest.FILENAME not in contents:
+        raise ValueError(
+            f'The work directory {work_dir} is not empty and was not created by Pygustus, use a new or empty directory.')
+
+
+def plan_runs(cmd, aug_options, tmpdir, options, cache=None, manifest=None):
+    """Plans the runs of a parallel execution.
+
+    If resume is set and the manifest of a previous execution of the same
+    prediction is found, its runs are used without splitting the input
+    again. The input file is identified by its path, size and
+    modification time, so that it is not read for the manifest.
+
+    Returns:
+        tuple: All runs ordered by runs and the runs that still have to
+        be executed.
+    """
+    signature = None
+    if manifest:
+        input_file = aug_options.get_input_filename()[1]
+        stat = os.stat(input_file)
+        signature = {
+            'input': [os.path.abspath(input_file), stat.st_size, stat.st_mtime_ns],
+            'options': [o for o in aug_options.get_options() if not o.startswith('--outfile=')],
+            'split': [options.chunksize, options.overlap, options.partition_sequences, options.part_hints,
+                      options.minsize, options.max_seq_size, options.min_gap_length, options.max_n_fraction,
+                      options.write_windows, options.balance_runs,
+                      # the plan depends on the number of jobs
+                      options.jobs if options.balance_runs else None],
+            'pipe_output': options.pipe_output
+        }
+
+    if options.resume and manifest and manifest.load():
+        if not manifest.matches(signature):
+            raise ValueError(
+                f'The work directory {os.path.dirname(manifest.path)} belongs to a different prediction and cannot be resumed.')
+        runs = [AugustusRun.from_dict(r) for r in manifest.runs]
+        pending_runs = [r for r in runs
+                        if manifest.get_status(r.number) != run_manifest.DONE or not os.path.isfile(r.outfile)]
+        print(f'Resume prediction: {len(runs) - len(pending_runs)} of {len(runs)} runs are already done.')
+        return runs, pending_runs
+
+    runs = prepare_runs(aug_options, tmpdir, options)
+    if cache:
+        assign_cache_keys(runs, cache, get_aug_version(cmd))
+    if manifest:
+        manifest.create(signature, [run.to_dict() for run in runs])
+
+    return runs, runs
+
+
+def check_run_results(runs, results, allow_partial=False, manifest=None):
+    """Prints a summary of the executed runs and checks for failed runs.
+
+    Args:
+        runs (list): All runs ordered by runs.
+        results (dict): The ExecutionResult of each executed run by run
+            number.
+        allow_partial (bool): Optional; If True, failed runs are reported
+            but do not raise an error (the default is False).
+        manifest (RunManifest): Optional; The manifest of the work
+            directory, if any.
+
+    Returns:
+        list: The runs whose results can be joined.
+
+    Raises:
+        RuntimeError: If a run failed and allow_partial is not set.
+    """
+    failed_runs = [run for run in runs
+                   if run.number in results and not results[run.number].success]
+    retried = sum(1 for r in results.values() if r.attempts > 1)
+    print(f'{len(results) - len(failed_runs)} of {len(results)} executed runs succeeded, {retried} after retries.')
+    for run in failed_runs:
+        print(f'Run {run.number} on {run.info["seqinfo"]} failed: {results[run.number]}')
+
+    if failed_runs and not allow_partial:
+        msg = f'{len(failed_runs)} AUGUSTUS runs failed, no joined output was written.'
+        if manifest:
+            msg += ' Set resume=True to execute only the failed runs again.'
+        raise RuntimeError(msg)
+
+    if failed_runs:
+        print(f'WARNING: The joined output is incomplete, the results of {len(failed_runs)} runs are missing.')
+
+    return [run for run in runs if run not in failed_runs]
+
+
+class RunJoiner:
+    """Joins the results of the runs of a parallel execution in the order
+    of the runs while the runs are executed.
+
+    The result of a finished run is parsed at once and kept in a reorder
+    buffer until the results of all previous runs are joined. So the
+    joined output grows while the runs are executed and is complete
+    shortly after the last run has finished. A failed run stops the join,
+    unless allow_partial is set, then its result is skipped. If the
+    execution fails, the incomplete joined output is removed on exit.
+
+    Attributes:
+        gene_counts (dict): The number of genes predicted by each joined
+            run by run number.
+    """
+
+    def __init__(self, joined_outfile, runs, pending_runs, pipe_output=False, allow_partial=False, jobs=1, renumber_genes=False):
+        """Creates the joined output and joins the results of the runs
+        that are already done, e.g. before a resume.
+
+        Args:
+            runs (list): All runs ordered by runs.
+            pending_runs (list): The runs that are executed; the results of
+                the other runs are read from their result files, which are
+                parsed by jobs processes, see
+                gff_methods.index_aug_outputs().
+            renumber_genes (bool): Optional; If True, the joined genes are
+                renamed to g1, g2, ... (the default is False).
+        """
+        self.joined_outfile = joined_outfile
+        self.runs = runs
+        self.pipe_output = pipe_output
+        self.allow_partial = allow_partial
+        self.gene_counts = dict()
+        # the parsed results by run number, None for a failed run
+        self._buffer = dict()
+        self._next = 0
+        self._failed = False
+        self._file = open(joined_outfile, 'w')
+        self._gff = gff.GFFFile(self._file, renumber_genes)
+
+        pending = {run.number for run in pending_runs}
+        done_runs = [run for run in runs if run.number not in pending]
+        outputs = gff.index_aug_outputs([run.outfile for run in done_runs], jobs)
+        for run, output in zip(done_runs, outputs):
+            self._buffer[run.number] = output
+        self._join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._file.close()
+        if exc_type is not None and os.path.isfile(self.joined_outfile):
+            os.remove(self.joined_outfile)
+        return False
+
+    def add_result(self, run, result):
+        """Adds the result of a finished run and joins all buffered results
+        that follow the joined runs."""
+        if self._failed:
+            return
+        if not result.success:
+            output = None
+        elif self.pipe_output and isinstance(result.output, gff.AugustusOutput):
+            output = result.output
+        else:
+            output = gff.index_aug_output(run.outfile)
+        self._buffer[run.number] = output
+        self._join()
+
+    def _join(self):
+        while self._next < len(self.runs) and self.runs[self._next].number in self._buffer:
+            run = self.runs[self._next]
+            output = self._buffer.pop(run.number)
+            if output is None and not self.allow_partial:
+                self._failed = True
+                break
+            if output is not None:
+                self.gene_counts[run.number] = len(output)
+                self._gff.add_output(output, run.info.get('offset', 0))
+            self._next += 1
+        # provide the joined genes to readers of the growing output
+        self._file.flush()
+
+    def finish(self):
+        """Writes the remaining genes after the last run has been added.
+
+        Returns:
+            dict: The number of genes predicted by each run by run number.
+        """
+        self._gff.finish()
+        self._file.flush()
+        return self.gene_counts
+
+
+def collect_run_stats(runs, results, gene_counts):
+    """Collects the statistics of all runs of a parallel execution.
+
+    Args:
+        runs (list): All runs ordered by runs.
+        results (dict): The ExecutionResult of each executed run by run
+            number.
+        gene_counts (dict): The number of predicted genes by run number.
+
+    Returns:
+        list: A dict per run with the predicted sequence parts, the
+        length of the sequences, the number of hints and genes, the
+        exit status and the used resources of the last attempt.
+    """
+    stats = list()
+    for run in runs:
+        result = results.get(run.number)
+        if result is None:
+            status = 'done'
+        elif result.cached:
+            status = 'cached'
+        elif result.success:
+            status = 'success'
+        elif result.timed_out:
+            status = 'timeout'
+        else:
+            status = 'failed'
+        resources = result.resources if result and result.resources else ResourceUsage(None)
+        stats.append({
+            'run': run.number,
+            'sequences': ';'.join(f'{name}:{window[0]}-{window[1]}'
+                                  for name, window in run.info['seqinfo'].items()),
+            'length': run.info.get('size'),
+            'hints': run.cost[1],
+            'genes': gene_counts.get(run.number),
+            'status': status,
+            'attempts': result.attempts if result else None,
+            'returncode': result.returncode if result else None,
+            **resources.to_dict()
+        })
+    return stats
+
+
+def write_run_report(filename, run_stats, report_format='json'):
+    """Writes the statistics of the runs of a parallel execution.
+
+    Args:
+        filename (string): The path to the report file.
+        run_stats (list): The statistics created by collect_run_stats.
+        report_format (string): Optional; Either 'json' or 'tsv' (the
+            default is 'json').
+    """
+    check_run_report_format(report_format)
+
+    if report_format == 'json':
+        with open(filename, 'w') as file:
+            json.dump(run_stats, file, indent=4)
+    elif report_format == 'tsv':
+        with open(filename, 'w') as file:
+            if run_stats:
+                columns = list(run_stats[0].keys())
+                file.write('\t'.join(columns) + '\n')
+                for stat in run_stats:
+                    file.write('\t'.join(
+                        '' if stat[c] is None else str(stat[c]) for c in columns) + '\n')
+
+
+def check_executor(executor, work_dir=None):
+    """Checks that a work directory is given if the executor accesses it
+    from other hosts, since a temporary directory is local."""
+    if executor and executor.SHARED_WORK_DIR and not work_dir:
+        raise ValueError(
+            f'The executor {type(executor).__name__} requires a work directory (workDir) shared with the hosts executing the jobs.')
+
+
+def check_run_report_format(report_format):
+    if report_format not in RUN_REPORT_FORMATS:
+        raise ValueError(
+            f'Unknown run report format {report_format}, use json or tsv.')
+
+
+class AugustusRun:
+    """A single AUGUSTUS run of a parallel execution.
+
+    Attributes:
+        number (int): The number of the run; the results of all runs are
+            joined in the order of these numbers.
+        info (dict): The run information created by fasta_methods.split.
+        input_file (string): The input file of the run.
+        hints_file (string): The hints file of the run or None.
+        options (list): The AUGUSTUS command line arguments.
+        outfile (string): The result file of the run.
+        cost (tuple): The estimated cost of the run.
+        cache_key (string): The key of the run in the RunCache or None.
+    """
+
+    def __init__(self, info, input_file, hints_file, options, outfile, cost):
+        self.number = info['run']
+        self.info = info
+        self.input_file = input_file
+        self.hints_file = hints_file
+        self.options = options
+        self.outfile = outfile
+        self.cost = cost
+        self.cache_key = None
+
+    def __str__(self) -> str:
+        return f'AUGUSTUS run {self.number} on {self.input_file}.'
+
+    def to_dict(self):
+        return {
+            'number': self.number,
+            'info': self.info,
+            'input_file': self.input_file,
+            'hints_file': self.hints_file,
+            'options': self.options,
+            'outfile': self.outfile,
+            'cost': list(self.cost),
+            'cache_key': self.cache_key
+        }
+
+    @classmethod
+    def from_dict(cls, values):
+        run = cls(values['info'], values['input_file'], values['hints_file'],
+                  values['options'], values['outfile'], tuple(values['cost']))
+        run.cache_key = values['cache_key']
+        return run
+
+
+def get_joined_outfile(aug_options):
     joined_outfile = aug_options.get_value_or_none('outfile')
     if not joined_outfile:
         joined_outfile = 'augustus.gff'
+    return joined_outfile
+
+
+def prepare_runs(aug_options, tmpdir, options):
+    """Splits the input file and creates the command lines of all runs.
+
+    Args:
+        options (ParallelOptions): The options of the parallel execution.
+            If balance_runs is set, the split follows a RunPlan for jobs
+            jobs, see create_run_plan().
 
-    options = list()
-    outfiles = list()
-    with tempfile.TemporaryDirectory(prefix='.tmp_') as tmpdir:
-        hintsfile = aug_options.get_value_or_none('hintsfile')
-
-        run_information = fm.split(
-            input_file, tmpdir, chunksize, overlap, partition_sequences, minsize, max_seq_size)
-
-        for ri in run_information:
-            runno = str(ri['run'])
-            fileidx = str(ri['fileidx'])
-            seqinfo = ri['seqinfo']
-            outfile = os.path.join(tmpdir, f'augustus_{runno}.gff')
-            outfiles.append(outfile)
-            curfile = create_split_filenanme(input_file, tmpdir, fileidx)
-            aug_options.set_input_filename(curfile)
+    Returns:
+        list: The AugustusRun objects ordered by runs.
+    """
+    input_file = aug_options.get_input_filename()[1]
+    hintsfile = aug_options.get_value_or_none('hintsfile')
+
+    runs = list()
+
+    chunksize, overlap, packing = options.chunksize, options.overlap, None
+    if options.balance_runs:
+        plan = create_run_plan(input_file, hintsfile, options.jobs, overlap, options.partition_sequences,
+                               options.max_seq_size, options.min_gap_length, options.max_n_fraction)
+        plan.print_summary()
+        chunksize, overlap, packing = plan.chunksize, plan.overlap, plan.packing
+
+    split_dir = os.path.join(tmpdir, SPLIT_DIR)
+    run_information = fm.split(
+        input_file, split_dir, chunksize, overlap, options.partition_sequences, options.minsize,
+        options.max_seq_size, options.min_gap_length, options.max_n_fraction, options.write_windows,
+        options.jobs, packing)
+
+    hint_counts = dict()
+    if hintsfile:
+        hint_counts = gff.count_hints(hintsfile, run_information)
+
+    for ri in run_information:
+        runno = str(ri['run'])
+        fileidx = str(ri['fileidx'])
+        seqinfo = ri['seqinfo']
+        outfile = os.path.join(tmpdir, f'augustus_{runno}.gff')
+        curfile = create_split_filenanme(input_file, split_dir, fileidx)
+        aug_options.set_input_filename(curfile)
+        if options.pipe_output:
+            aug_options.remove('outfile')
+        else:
             aug_options.set_value('outfile', outfile)
-            aug_options.remove('predictionStart')
-            aug_options.remove('predictionEnd')
-            if len(seqinfo) == 1 and list(seqinfo.values())[0][0] > 0 and list(seqinfo.values())[0][1] > 0:
-                aug_options.set_value(
-                    'predictionStart', list(seqinfo.values())[0][0])
-                aug_options.set_value(
-                    'predictionEnd', list(seqinfo.values())[0][1])
-            if hintsfile and part_hints:
-                tmp_hintsfile = os.path.join(
-                    tmpdir, f'augustus_hints_{str(runno)}.gff')
-                gff.create_hint_parts(
-                    hintsfile, tmp_hintsfile, seqinfo)
-                aug_options.set_value('hintsfile', tmp_hintsfile)
-            options.append(aug_options.get_options())
-
-        with ThreadPoolExecutor(max_workers=int(jobs)) as executor:
-            for opt in options:
-                executor.submit(execute_bin, cmd, opt)
-
-        gff.join_aug_pred(joined_outfile, outfiles)
-        print(f'Joined output written to: {joined_outfile}')
-
-        if debug_dir:
-            rmtree_if_exists(debug_dir, even_none_empty=True)
-            shutil.copytree(src=tmpdir, dst=debug_dir)
-            cmd_filename = os.path.join(debug_dir, 'aug_cmd_lines.txt')
-            with open(cmd_filename, "w") as file:
-                for o in options:
-                    file.write(str(o) + '\n' + '\n')
-
-
-def execute_bin(cmd, options):
-    # execute given binary with given options
-    result = ''
+        aug_options.remove('predictionStart')
+        aug_options.remove('predictionEnd')
+        # a window written to a separate file is predicted completely
+        if len(seqinfo) == 1 and list(seqinfo.values())[0][0] > 0 and list(seqinfo.values())[0][1] > 0 \
+                and 'offset' not in ri:
+            aug_options.set_value(
+                'predictionStart', list(seqinfo.values())[0][0])
+            aug_options.set_value(
+                'predictionEnd', list(seqinfo.values())[0][1])
+        run_hintsfile = hintsfile
+        # the hints of a separately written window have to be shifted
+        if hintsfile and (options.part_hints or 'offset' in ri):
+            run_hintsfile = os.path.join(
+                tmpdir, f'augustus_hints_{str(runno)}.gff')
+            gff.create_hint_parts(
+                hintsfile, run_hintsfile, seqinfo, offset=ri.get('offset', 0))
+            aug_options.set_value('hintsfile', run_hintsfile)
+        runs.append(AugustusRun(ri, curfile, run_hintsfile, aug_options.get_options(),
+                                outfile, estimate_run_cost(ri, hint_counts)))
+
+    return runs
+
+
+def create_run_plan(input_file, hintsfile, jobs, overlap, partition_sequences, max_seq_size, min_gap_length=0, max_n_fraction=1.0):
+    """Creates the cost-based RunPlan of a parallel execution, see
+    run_planner.create_plan().
+
+    The runs of N of the partitioned sequences are only read, if the
+    chunks depend on them, i.e. if min_gap_length or max_n_fraction is
+    given.
+    """
+    hint_starts = gff.read_hint_starts(hintsfile) if hintsfile else None
+    sequences = fm.get_sequence_lengths(input_file)
+    n_runs = None
+    if partition_sequences and (min_gap_length or max_n_fraction < 1.0):
+        large = {name for name, length in sequences if length > max_seq_size}
+        if large:
+            n_runs = fm.find_n_runs(input_file, large)
+    return run_planner.create_plan(
+        sequences, jobs, max_seq_size, overlap, partition_sequences, hint_starts,
+        min_gap_length, max_n_fraction, n_runs)
+
+
+def schedule_runs(runs):
+    """Returns the runs in the order in which they should be started.
+
+    The most expensive runs are started first to avoid a long tail of
+    large chunks at the end, the join still uses the run order.
+    """
+    return sorted(runs, key=lambda run: run.cost, reverse=True)
+
+
+class MemoryEstimator:
+    """Estimates the peak memory usage of AUGUSTUS runs.
+
+    The estimate is a linear model of the sequence length and the number
+    of hints of a run. It is scaled by the median ratio of observed to
+    estimated memory usage of the finished runs, so that the estimate
+    adapts to the species, the options and the platform, but a single
+    outlier does not change all later estimates. Runs shorter than
+    MIN_OBSERVED_SIZE are not observed, since their memory usage is
+    dominated by the constant part, which the model does not scale well.
+    """
+    BASE = 100
+    PER_MB_SEQUENCE = 400
+    PER_1000_HINTS = 2
+    MIN_OBSERVED_SIZE = 100000
+
+    def __init__(self) -> None:
+        self.scale = None
+        self.ratios = list()
+
+    def estimate(self, run):
+        """Returns the estimated peak memory usage of the run in MB."""
+        memory = self.estimate_model(run)
+        if self.scale:
+            memory *= self.scale
+        return memory
+
+    def estimate_model(self, run):
+        size, hints = run.cost
+        return self.BASE + self.PER_MB_SEQUENCE * size / 1e6 + self.PER_1000_HINTS * hints / 1000
+
+    def observe(self, run, result):
+        """Refines the estimate with the observed memory usage of a
+        finished run, if it is known."""
+        if result is None or result.resources is None or result.resources.max_rss is None:
+            return
+        if run.cost[0] < self.MIN_OBSERVED_SIZE:
+            return
+        self.ratios.append(result.resources.max_rss / 1024 / self.estimate_model(run))
+        self.scale = statistics.median(self.ratios)
+
+
+class RunDispatcher:
+    """Decides when the runs of a parallel execution are started.
+
+    At most jobs runs are executed at the same time. If a memory budget is
+    given, a run is only started if its estimated memory usage fits into
+    the remaining budget. The runs are considered in the order of
+    schedule_runs(), so that smaller runs are started while a larger run
+    has to wait for free memory. Once max_skips runs have been started
+    before the first waiting run, no further runs are started until it
+    fits, so that it is not starved by a stream of smaller runs. A run
+    whose estimate exceeds the whole budget is started when no other run
+    is executed.
+
+    Attributes:
+        max_memory (int): The memory budget in MB or None.
+        estimator (MemoryEstimator): The estimator of the memory usage.
+        max_skips (int): The number of runs that may be started before
+            the first waiting run, the number of jobs.
+    """
+
+    def __init__(self, runs, jobs, max_memory=None, estimator=None):
+        self.pending = schedule_runs(runs)
+        self.jobs = int(jobs)
+        self.max_memory = max_memory if max_memory else None
+        self.estimator = estimator if estimator else MemoryEstimator()
+        self.max_skips = self.jobs
+        self.running = dict()
+        # the number of the first waiting run and of the runs started before it
+        self._waiting = None
+        self._skips = 0
+
+    def has_pending_runs(self):
+        return len(self.pending) > 0
+
+    def start_runs(self):
+        """Returns the pending runs that can be started now; they are
+        considered to be running until finish_run() is called."""
+        started = list()
+        waiting = None
+        for run in list(self.pending):
+            if len(self.running) >= self.jobs:
+                break
+            memory = 0
+            if self.max_memory:
+                memory = self.estimator.estimate(run)
+                used = sum(self.running.values())
+                if self.running and used + memory > self.max_memory:
+                    if waiting is None:
+                        waiting = run
+                    continue
+            if waiting is not None:
+                if self._waiting != waiting.number:
+                    self._waiting, self._skips = waiting.number, 0
+                if self._skips >= self.max_skips:
+                    break
+                self._skips += 1
+            self.pending.remove(run)
+            self.running[run.number] = memory
+            started.append(run)
+        return started
+
+    def finish_run(self, run, result=None):
+        del self.running[run.number]
+        self.estimator.observe(run, result)
+
+
+class RetryPolicy:
+    """Timeout and retries of the single runs of a parallel execution.
+
+    Attributes:
+        timeout (float): A run is killed if it takes longer than timeout
+            seconds (None: no timeout).
+        retries (int): The number of times a failed run is repeated.
+        delay (float): The delay in seconds before the first retry, the
+            delay is doubled for each further retry.
+    """
+
+    def __init__(self, timeout=None, retries=0, delay=10):
+        self.timeout = timeout if timeout else None
+        self.retries = retries if retries else 0
+        self.delay = delay if delay is not None else 10
+
+    def get_delay(self, attempt):
+        return self.delay * 2 ** (attempt - 1)
+
+
+def execute_run_steps(cmd, run, options, cache=None, manifest=None):
+    """Executes a single AUGUSTUS run of a parallel execution.
+
+    If a cache is given and the result of the run is already known, it is
+    taken from the cache. Otherwise, the result of a successful run is
+    added to the cache. If a manifest is given, the completion state of
+    the run is recorded there. A failed run is repeated as given by the
+    RetryPolicy of the options. The command line and the blocking steps
+    are yielded to the runner of the parallel execution, see run_steps().
+
+    Returns:
+        ExecutionResult: The result of the run.
+    """
+    result = None
+    if cache and run.cache_key:
+        result = yield Step('call', fetch_cached_run, cmd, run, cache, options.pipe_output)
+
+    if not result:
+        policy = RetryPolicy(options.timeout, options.retries, options.retry_delay)
+        # keep the piped output if it is needed by the cache or for a resume
+        copy_to = run.outfile if cache or manifest else None
+        attempt = 1
+        while True:
+            result = yield Step('execute', cmd, run.options, options.pipe_output, copy_to, policy.timeout)
+            result.attempts = attempt
+
+            if result.success or attempt > policy.retries:
+                break
+            delay = policy.get_delay(attempt)
+            print(f'Run {run.number} failed, retry {attempt} of {policy.retries} in {delay}s.')
+            yield Step('sleep', delay)
+            attempt += 1
+
+        if cache and run.cache_key and result.success:
+            yield Step('call', cache.store, run.cache_key, run.outfile)
 
+    if manifest:
+        yield Step('call', manifest.set_status, run.number,
+                   run_manifest.DONE if result.success else run_manifest.FAILED)
+
+    return result
+
+
+class Step:
+    """A step of a parallel execution, which is performed by the method
+    name of a runner with the given arguments, see run_steps()."""
+
+    def __init__(self, name, *args, **kwargs) -> None:
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+
+def run_steps(steps, runner):
+    """Performs the Steps yielded by the generator steps with the given
+    runner, e.g. execute_parallel_steps() with a ThreadRunner.
+
+    The result of each step is sent back to the generator, an exception
+    is raised in the generator.
+
+    Returns:
+        The value returned by the generator.
+    """
+    send, value = steps.send, None
+    while True:
+        try:
+            step = send(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value = getattr(runner, step.name)(*step.args, **step.kwargs)
+            send = steps.send
+        except BaseException as e:
+            send, value = steps.throw, e
+
+
+async def run_steps_async(steps, runner):
+    """Coroutine version of run_steps(), the steps of the runner are
+    awaited, e.g. those of an AsyncRunner."""
+    send, value = steps.send, None
+    while True:
+        try:
+            step = send(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value = await getattr(runner, step.name)(*step.args, **step.kwargs)
+            send = steps.send
+        except BaseException as e:
+            send, value = steps.throw, e
+
+
+class ThreadRunner:
+    """Performs the steps of a parallel execution in the calling thread
+    and executes the started runs in a pool of jobs threads.
+
+    The command lines are executed by the given RunExecutor or, if it is
+    None, as local subprocesses.
+    """
+
+    def __init__(self, jobs, executor=None) -> None:
+        self.executor = executor
+        self._pool = ThreadPoolExecutor(max_workers=int(jobs))
+        self._futures = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._pool.shutdown()
+        return False
+
+    def call(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    def sleep(self, delay):
+        time.sleep(delay)
+
+    def execute(self, cmd, options, pipe_output=False, copy_to=None, timeout=None):
+        if pipe_output:
+            execute_piped = self.executor.execute_bin_piped if self.executor else execute_bin_piped
+            return execute_piped(cmd, options, copy_to=copy_to, timeout=timeout)
+        execute = self.executor.execute_bin if self.executor else execute_bin
+        return execute(cmd, options, timeout=timeout)
+
+    def start(self, run, steps):
+        """Starts the steps of a run, see execute_run_steps()."""
+        self._futures[self._pool.submit(run_steps, steps, self)] = run
+
+    def wait(self):
+        """Waits until at least one started run has finished.
+
+        Returns:
+            list: The finished runs and their results.
+        """
+        done, _ = wait(self._futures, return_when=FIRST_COMPLETED)
+        return [(self._futures.pop(future), future.result()) for future in done]
+
+    def wait_all(self):
+        """Waits for the started runs, e.g. after an error."""
+        wait(self._futures)
+        self._futures = dict()
+
+
+class AsyncRunner:
+    """Performs the steps of a parallel execution in the running event
+    loop: the blocking steps are executed in its default executor and the
+    started runs as tasks.
+
+    The command lines are executed by the given RunExecutor in the default
+    executor or, if it is None, as asyncio subprocesses. The semaphore
+    (if any) limits the number of running command lines.
+    """
+
+    def __init__(self, executor=None, semaphore=None) -> None:
+        self.executor = executor
+        self.semaphore = semaphore
+        self._tasks = dict()
+
+    async def call(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def sleep(self, delay):
+        await asyncio.sleep(delay)
+
+    async def execute(self, cmd, options, pipe_output=False, copy_to=None, timeout=None):
+        if self.executor and pipe_output:
+            return await execute_in_executor(
+                self.semaphore, self.executor.execute_bin_piped, cmd, options,
+                copy_to=copy_to, timeout=timeout)
+        if self.executor:
+            return await execute_in_executor(
+                self.semaphore, self.executor.execute_bin, cmd, options, timeout=timeout)
+        if pipe_output:
+            return await execute_bin_piped_async(
+                cmd, options, semaphore=self.semaphore, copy_to=copy_to, timeout=timeout)
+        return await execute_bin_async(cmd, options, semaphore=self.semaphore, timeout=timeout)
+
+    async def start(self, run, steps):
+        """Starts the steps of a run as task, see execute_run_steps()."""
+        loop = asyncio.get_running_loop()
+        self._tasks[loop.create_task(run_steps_async(steps, self))] = run
+
+    async def wait(self):
+        """Coroutine version of ThreadRunner.wait()."""
+        done, _ = await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+        return [(self._tasks.pop(task), task.result()) for task in done]
+
+    async def wait_all(self):
+        """Cancels the started runs and waits for them, e.g. after an
+        error."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = dict()
+
+
+async def execute_in_executor(semaphore, func, *args, **kwargs):
+    """Calls the blocking func in the default executor of the running
+    event loop after the semaphore (if any) has been acquired."""
+    if semaphore is not None:
+        async with semaphore:
+            return await execute_in_executor(None, func, *args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, functools.partial(func, *args, **kwargs))
+
+
+def create_run_cache(cache_dir, cache_max_size=None):
+    if not cache_dir:
+        return None
+    max_size = None
+    if cache_max_size:
+        max_size = cache_max_size * 1024 * 1024
+    return RunCache(cache_dir, max_size)
+
+
+def assign_cache_keys(runs, cache, version):
+    for run in runs:
+        run.cache_key = cache.create_key(
+            run.input_file, run.info['seqinfo'], run.hints_file, run.options, version,
+            offset=run.info.get('offset', 0))
+
+
+def fetch_cached_run(cmd, run, cache, pipe_output=False):
+    """Returns the cached result of the given run or None, if the result
+    is not cached."""
+    if pipe_output:
+        file = cache.open(run.cache_key)
+        if file is None:
+            return None
+        output = gff.AugustusOutput()
+        with file:
+            for line in file:
+                output.add_line(line)
+        return ExecutionResult(cmd, run.options, 0, output=output, cached=True)
+
+    if not cache.fetch(run.cache_key, run.outfile):
+        return None
+    return ExecutionResult(cmd, run.options, 0, outfile=run.outfile, cached=True)
+
+
+def print_cache_summary(cache, results):
+    if cache:
+        cached = sum(1 for r in results if r.cached)
+        print(f'Results of {cached} of {len(results)} runs taken from cache.')
+
+
+def copy_debug_output(tmpdir, debug_dir, runs):
+    rmtree_if_exists(debug_dir, even_none_empty=True)
+    shutil.copytree(src=tmpdir, dst=debug_dir)
+    cmd_filename = os.path.join(debug_dir, 'aug_cmd_lines.txt')
+    with open(cmd_filename, "w") as file:
+        for run in runs:
+            file.write(str(run.options) + '\n' + '\n')
+
+
+def estimate_run_cost(run_info, hint_counts=None):
+    """Estimates the cost of an AUGUSTUS run.
+
+    The cost is given by the length of the predicted sequence(s) and,
+    as secondary factor, the number of hints in the prediction window.
+
+    Args:
+        run_info (dict): An entry of the run information created by
+            fasta_methods.split.
+        hint_counts (dict): Optional; The number of hints per run number.
+
+    Returns:
+        tuple: The estimated cost, suitable for sorting.
+    """
+    hints = 0
+    if hint_counts:
+        hints = hint_counts.get(run_info['run'], 0)
+    return run_info.get('size', 0), hints
+
+
+class ExecutionResult:
+    """The result of the execution of a binary.
+
+    Attributes:
+        cmd (string): The executed binary.
+        options (list): The command line arguments.
+        returncode (int): The exit status of the binary.
+        output: The output of the binary: the text written to stdout and
+            stderr or, if the output was parsed while reading it from a
+            pipe, the parsed AugustusOutput.
+        outfile (string): The path to the written result file, if any.
+        cached (bool): True if the result was taken from a RunCache
+            instead of executing the binary.
+        timed_out (bool): True if the binary was killed because it
+            exceeded the timeout.
+        resources (ResourceUsage): The resources used by the binary or
+            None, e.g. if the result was taken from a RunCache.
+        attempts (int): The number of executions, including retries.
+        run_stats (list): The statistics of each run of a parallel
+            execution, otherwise None.
+    """
+
+    def __init__(self, cmd, options, returncode, output=None, outfile=None, cached=False, timed_out=False, resources=None):
+        self.cmd = cmd
+        self.options = options
+        self.returncode = returncode
+        self.output = output
+        self.outfile = outfile
+        self.cached = cached
+        self.timed_out = timed_out
+        self.resources = resources
+        self.attempts = 1
+        self.run_stats = None
+
+    @property
+    def success(self):
+        return self.returncode == 0 and not self.timed_out
+
+    def __str__(self) -> str:
+        if self.timed_out:
+            return f'{self.cmd} was killed after exceeding the timeout.'
+        return f'{self.cmd} exited with returncode {self.returncode}.'
+
+
+class ResourceUsage:
+    """The resources used by an executed binary.
+
+    Attributes:
+        wall_time (float): The elapsed real time in seconds.
+        user_time (float): The user CPU time in seconds or None, if it is
+            not available on this platform.
+        system_time (float): The system CPU time in seconds or None.
+        max_rss (int): The peak resident set size in kilobytes or None.
+            If /proc is available, it is the last sampled peak of the
+            binary itself, see PeakMemorySampler; it may miss an increase
+            shortly before the binary terminates. Otherwise it is the
+            ru_maxrss of the child.
+    """
+
+    def __init__(self, wall_time, user_time=None, system_time=None, max_rss=None):
+        self.wall_time = wall_time
+        self.user_time = user_time
+        self.system_time = system_time
+        self.max_rss = max_rss
+
+    @classmethod
+    def from_rusage(cls, wall_time, rusage=None, sampler=None):
+        """Creates the resource usage from the rusage of a child process
+        as returned by os.wait4, which may be None, and the peak memory
+        sampled by the given PeakMemorySampler, if it is available."""
+        max_rss = None
+        if sampler is not None and sampler.available:
+            max_rss = sampler.max_rss
+        elif rusage is not None:
+            max_rss = rusage.ru_maxrss
+            if sys.platform == 'darwin':
+                # reported in bytes instead of kilobytes
+                max_rss //= 1024
+        if rusage is None:
+            return cls(wall_time, max_rss=max_rss)
+        return cls(wall_time, rusage.ru_utime, rusage.ru_stime, max_rss)
+
+    def to_dict(self):
+        return {
+            'wall_time': round_or_none(self.wall_time),
+            'user_time': round_or_none(self.user_time),
+            'system_time': round_or_none(self.system_time),
+            'max_rss': self.max_rss
+        }
+
+
+def round_or_none(value, digits=3):
+    return None if value is None else round(value, digits)
+
+
+def start_kill_timer(process, timeout=None):
+    """Kills the given process after timeout seconds.
+
+    Returns:
+        tuple: The started threading.Timer (None without timeout) and a
+        threading.Event, which is set if the process was killed.
+    """
+    killed = threading.Event()
+    timer = None
+    if timeout:
+        def kill():
+            killed.set()
+            process.kill()
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+    return timer, killed
+
+
+class PeakMemorySampler:
+    """Samples the peak resident set size (VmHWM) of a running process
+    from /proc.
+
+    On Linux, the ru_maxrss of a forked child includes the memory of the
+    Python process, so the peak of the binary itself is read from
+    /proc/<pid>/status while it is running. The value is lost when the
+    process terminates, so the last sample is kept.
+
+    Attributes:
+        available (bool): False if /proc is not available, e.g. on macOS.
+        max_rss (int): The last sampled peak in kilobytes or None.
+    """
+
+    def __init__(self, pid, interval=0.2) -> None:
+        self.status_file = f'/proc/{pid}/status'
+        self.interval = interval
+        self.available = os.path.isfile(self.status_file)
+        self.max_rss = None
+        self._stopped = threading.Event()
+        self._thread = None
+        if self.available:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self.sample()
+            if self._stopped.wait(self.interval):
+                break
+
+    def sample(self):
+        try:
+            with open(self.status_file) as file:
+                for line in file:
+                    if line.startswith('VmHWM:'):
+                        self.max_rss = max(self.max_rss or 0, int(line.split()[1]))
+                        break
+        except (OSError, ValueError):
+            # the process has terminated
+            pass
+
+    def stop(self):
+        """Stops sampling; must be called before the process is reaped."""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+
+
+def wait_process(process):
+    """Waits for the given subprocess.Popen to terminate.
+
+    Unlike Popen.wait(), os.wait4 is used to collect the resource usage of
+    the terminated child, if available on this platform.
+
+    Returns:
+        resource.struct_rusage: The resource usage of the child or None.
+    """
+    if not hasattr(os, 'wait4'):
+        process.wait()
+        return None
+
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        # already reaped elsewhere
+        process.wait()
+        return None
+
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+    return rusage
+
+
+def execute_bin(cmd, options, timeout=None):
+    """Executes the given binary and collects the used resources.
+
+    Args:
+        cmd (string): The binary to execute.
+        options (list): The command line arguments.
+        timeout (float): Optional; The binary is killed if it runs longer
+            than timeout seconds.
+
+    Returns:
+        ExecutionResult: The exit status, the output and the resource
+        usage of the binary.
+    """
+    start = time.monotonic()
+    process = subprocess.Popen(
+        [cmd] + options,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True)
+    sampler = PeakMemorySampler(process.pid)
+    # killing the process ends the output and thereby the read below
+    timer, killed = start_kill_timer(process, timeout)
+    result = process.stdout.read()
+    process.stdout.close()
+    sampler.stop()
+    rusage = wait_process(process)
+    if timer:
+        timer.cancel()
+    resources = ResourceUsage.from_rusage(time.monotonic() - start, rusage, sampler)
+    timed_out = killed.is_set()
+
+    if timed_out:
+        print(f'{cmd} killed after exceeding the timeout of {timeout}s.')
+        result = ''
+    elif process.returncode != 0:
+        print("Returncode", process.returncode, result)
+        result = ''
+
+    if len(result.strip()):
+        print(result.strip())
+
+    return ExecutionResult(cmd, options, process.returncode, output=result,
+                           outfile=get_outfile(options), timed_out=timed_out,
+                           resources=resources)
+
+
+async def execute_bin_async(cmd, options, semaphore=None, timeout=None):
+    """Executes the given binary as asyncio subprocess.
+
+    Args:
+        cmd (string): The binary to execute.
+        options (list): The command line arguments.
+        semaphore (asyncio.Semaphore): Optional; If given, the binary is
+            executed only after the semaphore has been acquired.
+        timeout (float): Optional; The binary is killed if it runs longer
+            than timeout seconds.
+
+    Returns:
+        ExecutionResult: The exit status and the output of the binary.
+        The child is reaped by asyncio, so the resource usage only
+        contains the wall time.
+    """
+    if semaphore is not None:
+        async with semaphore:
+            return await execute_bin_async(cmd, options, timeout=timeout)
+
+    start = time.monotonic()
+    process = await asyncio.create_subprocess_exec(
+        cmd, *options,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT)
     try:
-        result = subprocess.check_output(
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        print(f'{cmd} killed after exceeding the timeout of {timeout}s.')
+        return ExecutionResult(cmd, options, process.returncode, output='',
+                               outfile=get_outfile(options), timed_out=True,
+                               resources=ResourceUsage(time.monotonic() - start))
+    resources = ResourceUsage(time.monotonic() - start)
+    result = stdout.decode()
+
+    if process.returncode != 0:
+        print("Returncode", process.returncode, result)
+    elif len(result.strip()):
+        print(result.strip())
+
+    return ExecutionResult(cmd, options, process.returncode, output=result,
+                           outfile=get_outfile(options), resources=resources)
+
+
+async def execute_bin_piped_async(cmd, options, semaphore=None, copy_to=None, timeout=None):
+    """Executes AUGUSTUS as asyncio subprocess and parses its output.
+
+    Works like execute_bin_piped, but the output is read from the pipe
+    without blocking the event loop.
+
+    Returns:
+        ExecutionResult: The exit status and the parsed AugustusOutput.
+    """
+    if semaphore is not None:
+        async with semaphore:
+            return await execute_bin_piped_async(cmd, options, copy_to=copy_to, timeout=timeout)
+
+    output = gff.AugustusOutput()
+
+    async def read_output(process, copy):
+        line = await process.stdout.readline()
+        while line:
+            output.add_line(line.decode())
+            if copy:
+                copy.write(line.decode())
+            line = await process.stdout.readline()
+        await process.wait()
+
+    timed_out = False
+    start = time.monotonic()
+    with tempfile.TemporaryFile(mode='w+') as errfile:
+        process = await asyncio.create_subprocess_exec(
+            cmd, *options,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=errfile)
+        copy = open(copy_to, 'w') if copy_to else None
+        try:
+            await asyncio.wait_for(read_output(process, copy), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            timed_out = True
+        resources = ResourceUsage(time.monotonic() - start)
+        if copy:
+            copy.close()
+
+        errfile.seek(0)
+        result = errfile.read()
+
+    if timed_out:
+        print(f'{cmd} killed after exceeding the timeout of {timeout}s.')
+    elif process.returncode != 0:
+        print("Returncode", process.returncode, result)
+    elif len(result.strip()):
+        print(result.strip())
+
+    return ExecutionResult(cmd, options, process.returncode, output=output,
+                           timed_out=timed_out, resources=resources)
+
+
+def get_outfile(options):
+    for opt in options:
+        if opt.startswith('--outfile='):
+            return opt[len('--outfile='):]
+    return None
+
+
+def execute_bin_piped(cmd, options, copy_to=None, timeout=None):
+    """Executes the given binary of AUGUSTUS and parses its output.
+
+    The output is read from a pipe and parsed while AUGUSTUS is running,
+    so that no intermediate result file needs to be written and read.
+
+    Args:
+        cmd (string): The AUGUSTUS executable.
+        options (list): The command line arguments; must not contain
+            --outfile.
+        copy_to (string): Optional; If given, the output is additionally
+            written to this file, e.g. to store it in a RunCache.
+        timeout (float): Optional; AUGUSTUS is killed if it runs longer
+            than timeout seconds.
+
+    Returns:
+        ExecutionResult: The exit status, the parsed AugustusOutput and
+        the resource usage of AUGUSTUS.
+    """
+    output = gff.AugustusOutput()
+
+    start = time.monotonic()
+    with tempfile.TemporaryFile(mode='w+') as errfile:
+        process = subprocess.Popen(
             [cmd] + options,
-            stderr=subprocess.STDOUT,
+            stdout=subprocess.PIPE,
+            stderr=errfile,
             universal_newlines=True)
-    except subprocess.CalledProcessError as cpe:
-        print("Returncode", cpe.returncode, cpe.output)
+        sampler = PeakMemorySampler(process.pid)
+        # killing the process ends the output and thereby the loop below
+        timer, killed = start_kill_timer(process, timeout)
+        copy = open(copy_to, 'w') if copy_to else None
+        for line in process.stdout:
+            output.add_line(line)
+            if copy:
+                copy.write(line)
+        if copy:
+            copy.close()
+        process.stdout.close()
+        sampler.stop()
+        rusage = wait_process(process)
+        if timer:
+            timer.cancel()
+        resources = ResourceUsage.from_rusage(time.monotonic() - start, rusage, sampler)
+        timed_out = killed.is_set()
 
-    if len(result.strip()):
+        errfile.seek(0)
+        result = errfile.read()
+
+    if timed_out:
+        print(f'{cmd} killed after exceeding the timeout of {timeout}s.')
+    elif process.returncode != 0:
+        print("Returncode", process.returncode, result)
+    elif len(result.strip()):
         print(result.strip())
 
+    return ExecutionResult(cmd, options, process.returncode, output=output,
+                           timed_out=timed_out, resources=resources)
+
 
 def check_bin(bin):
     if which(bin) is None:
@@ -149,18 +1542,25 @@ def set_config_item(name, value):
 
 
 def create_split_filenanme(inputfile, outputdir, idx):
-    filename = os.path.basename(inputfile)
+    # the split files are not compressed and .2bit input is written as FASTA
+    filename = compression.strip_gzip_extension(os.path.basename(inputfile))
     f_name, f_ext = os.path.splitext(filename)
+    if f_ext == twobit.TWOBIT_EXTENSION:
+        f_ext = '.fa'
     s_filename = f'{f_name}.split.{str(idx)}{f_ext}'
     return os.path.join(outputdir, s_filename)
 
 
-def check_aug_version(aug_bin, min_aug_version):
+def get_aug_version(aug_bin):
     result = subprocess.run(
         [aug_bin, '--version'],
         capture_output=True, encoding='UTF-8')
 
-    version_str = re.findall(r'\d+.\d+.\d+', result.stderr)[0]
+    return re.findall(r'\d+.\d+.\d+', result.stderr)[0]
+
+
+def check_aug_version(aug_bin, min_aug_version):
+    version_str = get_aug_version(aug_bin)
     min_version_no = version_str_to_int(min_aug_version)
     version_no = version_str_to_int(version_str)
 
@@ -30,7 +30,9 @@ setup(
         "Operating System :: POSIX :: Linux",
         "Topic :: Scientific/Engineering :: Bio-Informatics",
     ],
-    install_requires=[
-        "biopython",
-    ],
+    install_requires=[],
+    extras_require={
+        "biopython": ["biopython"],
+        "numpy": ["numpy"],
+    },
 )
@@ -1,4 +1,5 @@
 import pytest
+import asyncio
 import os
 import shutil
 from pygustus import *
@@ -116,6 +117,29 @@ def test_augustus_parallel_one_large_sequence():
                        options=options)
 
 
+@pytest.mark.ghactions
+def test_augustus_async():
+    outdir = os.path.join('tests/out', test_augustus_async.__name__)
+    if (os.path.exists(outdir)):
+        shutil.rmtree(outdir)
+    os.makedirs(outdir)
+
+    async def run_predictions():
+        semaphore = asyncio.Semaphore(2)
+        return await asyncio.gather(
+            augustus.predict_async('tests/data/example.fa', species='human',
+                                   outfile=os.path.join(outdir, 'single.gff'),
+                                   semaphore=semaphore),
+            augustus.predict_async('tests/data/example.fa', species='human',
+                                   outfile=os.path.join(outdir, 'parallel.gff'),
+                                   jobs=2, semaphore=semaphore))
+
+    results = asyncio.run(run_predictions())
+    for result in results:
+        assert result.returncode == 0
+        assert os.path.exists(result.outfile)
+
+
 def run_parallel_tests(inputfile, jobs, testname, options):
     outdir = os.path.join('tests/out', testname)
     out_html = os.path.join(outdir, 'output_html')
@@ -0,0 +1,27 @@
+import os
+import pytest
+from Bio import bgzf
+from pygustus.bgzf import BgzfIndex, BgzfReader, is_bgzf
+
+
+@pytest.mark.ghactions
+def test_bgzf_reader(tmp_path):
+    data = bytes(range(256)) * 1000
+    bgzf_file = str(tmp_path / 'data.gz')
+    with bgzf.BgzfWriter(bgzf_file, 'wb') as out:
+        out.write(data)
+    assert is_bgzf(bgzf_file)
+
+    index = BgzfIndex(bgzf_file, write=True)
+    assert len(index.coffsets) > 3
+    assert os.path.isfile(f'{bgzf_file}.gzi')
+    loaded = BgzfIndex(bgzf_file)
+    assert loaded.coffsets == index.coffsets
+    assert loaded.uoffsets == index.uoffsets
+
+    with BgzfReader(bgzf_file, loaded) as reader:
+        # ranges within a block and across several blocks
+        for start, size in [(0, 10), (65000, 1000), (100, 200000), (255990, 100)]:
+            reader.seek(start)
+            assert reader.read(size) == data[start:start + size]
+        assert reader.tell() == len(data)
@@ -0,0 +1,34 @@
+import gzip
+import pytest
+import pygustus.compression as compression
+
+
+@pytest.mark.ghactions
+def test_decompress(tmp_path, monkeypatch):
+    content = '>seq1\nACGT\n' * 1000
+    inputfile = str(tmp_path / 'genome.fa.gz')
+    with gzip.open(inputfile, 'wt') as file:
+        file.write(content)
+
+    # decompress in small blocks
+    monkeypatch.setattr(compression, 'BLOCK_SIZE', 100)
+    outfile = tmp_path / 'genome.fa'
+    compression.decompress(inputfile, str(outfile))
+    assert outfile.read_text() == content
+
+    assert compression.is_gzipped(inputfile)
+    assert not compression.is_gzipped(str(outfile))
+    assert compression.strip_gzip_extension(inputfile) == str(outfile)
+
+
+@pytest.mark.ghactions
+def test_open_input(tmp_path):
+    inputfile = str(tmp_path / 'genome.fa.gz')
+    with gzip.open(inputfile, 'wt') as file:
+        file.write('>seq1\nACGT\n')
+    plainfile = tmp_path / 'genome.fa'
+    plainfile.write_text('>seq1\nACGT\n')
+
+    for filename in [inputfile, str(plainfile)]:
+        with compression.open_input(filename, threads=2) as file:
+            assert file.read() == '>seq1\nACGT\n'
@@ -0,0 +1,118 @@
+import subprocess
+import sys
+import pytest
+import pygustus.executors as executors
+import pygustus.util as util
+
+
+@pytest.mark.ghactions
+def test_template_executor(tmp_path):
+    executor = executors.create_executor(
+        'template', template='sh {script}', poll_interval=0.1)
+    executor.start(str(tmp_path))
+    try:
+        result = executor.execute_bin(sys.executable, ['-c', 'print("finished")'])
+        assert result.success
+        assert result.output.strip() == 'finished'
+
+        result = executor.execute_bin(sys.executable, ['-c', 'import sys; sys.exit(3)'])
+        assert not result.success
+        assert result.returncode == 3
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.ghactions
+def test_template_executor_piped(tmp_path):
+    executor = executors.CommandTemplateExecutor(
+        '(sh {script} &) > /dev/null', poll_interval=0.1)
+    executor.start(str(tmp_path))
+    output = ('# ----- prediction on sequence number 1 (length = 100, name = chr1) -----\n'
+              '# start gene g1\n'
+              'chr1\tAUGUSTUS\tgene\t1\t90\t1\t+\t.\tg1\n'
+              '# end gene g1\n')
+    copy = tmp_path / 'augustus_1.gff'
+    result = executor.execute_bin_piped(
+        sys.executable, ['-c', f'print({output!r}, end="")'], copy_to=str(copy))
+    assert result.success
+    assert len(result.output.genes) == 1
+    assert copy.read_text() == output
+
+
+@pytest.mark.ghactions
+def test_template_executor_timeout(tmp_path):
+    executor = executors.CommandTemplateExecutor('sh {script}', poll_interval=0.1)
+    executor.start(str(tmp_path))
+    result = executor.execute_bin(
+        sys.executable, ['-c', 'import time; time.sleep(10)'], timeout=1)
+    assert result.timed_out
+    assert not result.success
+
+
+@pytest.mark.ghactions
+def test_template_executor_lost_job(tmp_path):
+    # the job is submitted, but never executed
+    executor = executors.CommandTemplateExecutor(
+        'true {script}', poll_interval=0.1, max_wait=0.5)
+    executor.start(str(tmp_path))
+    result = executor.execute_bin(sys.executable, ['-c', 'print("finished")'])
+    assert result.timed_out
+    assert not result.success
+
+    # the job does not execute the command if it is started later
+    job_dir = tmp_path / 'jobs' / 'job_1'
+    subprocess.run(['sh', str(job_dir / 'job.sh')], check=True)
+    assert not (job_dir / 'stdout').exists()
+    assert not (job_dir / executors.CommandTemplateExecutor.DONE_FILE).exists()
+
+
+WRITE_OUTFILE = 'import sys; open(sys.argv[1].split("=", 1)[1], "w").write("result")'
+
+
+@pytest.mark.ghactions
+def test_template_executor_outfile(tmp_path):
+    outfile = tmp_path / 'augustus_1.gff'
+    executor = executors.CommandTemplateExecutor(
+        'true {script}', poll_interval=0.1, max_wait=0.5)
+    executor.start(str(tmp_path))
+    result = executor.execute_bin(sys.executable, ['-c', WRITE_OUTFILE, f'--outfile={outfile}'])
+    assert not result.success
+
+    # a job that is executed after the maximum wait does not write the
+    # result file of the run
+    job_dir = tmp_path / 'jobs' / 'job_1'
+    (job_dir / executors.CommandTemplateExecutor.CANCEL_FILE).unlink()
+    subprocess.run(['sh', str(job_dir / 'job.sh')], check=True)
+    assert not outfile.exists()
+
+    executor.template = 'sh {script}'
+    result = executor.execute_bin(sys.executable, ['-c', WRITE_OUTFILE, f'--outfile={outfile}'])
+    assert result.success
+    assert outfile.read_text() == 'result'
+
+
+@pytest.mark.ghactions
+def test_template_executor_max_wait():
+    executor = executors.CommandTemplateExecutor('sh {script}')
+    assert executor.get_max_wait() is None
+    assert executor.get_max_wait(60) == 60 + executor.MAX_WAIT_SLACK
+    executor = executors.CommandTemplateExecutor('sh {script}', max_wait=120)
+    assert executor.get_max_wait(60) == 120
+
+
+@pytest.mark.ghactions
+def test_template_executor_requires_work_dir(tmp_path):
+    executor = executors.CommandTemplateExecutor('sh {script}')
+    with pytest.raises(ValueError):
+        util.check_executor(executor, None)
+    util.check_executor(executor, str(tmp_path))
+    util.check_executor(executors.ThreadExecutor(), None)
+
+
+@pytest.mark.ghactions
+def test_create_executor_invalid():
+    assert executors.create_executor() is None
+    with pytest.raises(ValueError):
+        executors.create_executor('unknown')
+    with pytest.raises(ValueError):
+        executors.create_executor('template', template='sbatch')
@@ -0,0 +1,106 @@
+import gzip
+import shutil
+import pytest
+from Bio import SeqIO, bgzf
+from pygustus.fasta_index import FastaIndex
+import pygustus.fasta_methods as fm
+
+
+def copy_genome(tmp_path):
+    fasta_file = str(tmp_path / 'genome.fa')
+    shutil.copyfile('tests/data/genome.fa', fasta_file)
+    return fasta_file
+
+
+@pytest.mark.ghactions
+def test_fasta_index(tmp_path):
+    fasta_file = copy_genome(tmp_path)
+    records = list(SeqIO.parse(fasta_file, 'fasta'))
+
+    index = FastaIndex(fasta_file, write=True)
+    assert index.names == [r.id for r in records]
+    for r in records:
+        assert index.get_length(r.id) == len(r)
+        assert index.fetch(r.id) == str(r.seq)
+        assert index.fetch(r.id, 59, 185) == str(r.seq[58:185])
+        assert index.fetch(r.id, len(r) - 10) == str(r.seq[-11:])
+
+    # the written index is compatible with samtools faidx
+    with open(f'{fasta_file}.fai') as file:
+        first = file.readline().split('\t')
+    assert first == ['chrI', str(len(records[0])), '6', '60', '61\n']
+
+    loaded = FastaIndex(fasta_file)
+    assert loaded.entries == index.entries
+
+
+@pytest.mark.ghactions
+def test_fasta_index_invalid(tmp_path):
+    fasta_file = tmp_path / 'invalid.fa'
+    fasta_file.write_text('>seq1\nACGT\nAC\nACGT\n')
+    with pytest.raises(ValueError):
+        FastaIndex(str(fasta_file))
+
+
+@pytest.mark.ghactions
+def test_get_sequence_info(tmp_path):
+    fasta_file = copy_genome(tmp_path)
+    records = list(SeqIO.parse(fasta_file, 'fasta'))
+    assert fm.get_sequence_count(fasta_file) == len(records)
+    assert fm.get_sequence_size(fasta_file, 0) == len(records[0])
+    assert fm.get_sequence_id(fasta_file) == records[0].id
+    # the queries do not write an index next to the input
+    assert not (tmp_path / 'genome.fa.fai').exists()
+
+
+@pytest.mark.ghactions
+def test_get_sequence_info_ragged_lines(tmp_path):
+    # valid FASTA, which cannot be indexed
+    fasta_file = str(tmp_path / 'ragged.fa')
+    with open(fasta_file, 'w') as file:
+        file.write('>seq1 first\nACGT\nAC\nACGT\n>seq2\nACGTACGT\nA\n')
+    assert fm.get_sequence_count(fasta_file) == 2
+    assert fm.get_sequence_size(fasta_file, 0) == 10
+    assert fm.get_sequence_size(fasta_file, 1) == 9
+    assert fm.get_sequence_id(fasta_file, 1) == 'seq2'
+    assert fm.get_sequence_lengths(fasta_file) == [('seq1', 10), ('seq2', 9)]
+
+
+@pytest.mark.ghactions
+def test_fasta_index_bgzf(tmp_path):
+    fasta_file = copy_genome(tmp_path)
+    bgzf_file = str(tmp_path / 'genome.fa.gz')
+    with open(fasta_file, 'rb') as file, bgzf.BgzfWriter(bgzf_file, 'wb') as out:
+        out.write(file.read())
+
+    index = FastaIndex(fasta_file)
+    bgzf_index = FastaIndex(bgzf_file)
+    assert bgzf_index.entries == index.entries
+    for name in index.names:
+        assert bgzf_index.fetch(name) == index.fetch(name)
+        assert bgzf_index.fetch(name, 65000, 140000) == index.fetch(name, 65000, 140000)
+        assert bgzf_index.fetch_header(name) == index.fetch_header(name)
+
+    # split reads the sequences from the index
+    outdir = tmp_path / 'split'
+    run_information = fm.split(bgzf_file, str(outdir), chunksize=100000,
+                               overlap=20000, partition_sequences=True, minsize=0,
+                               max_seq_size=100000, write_windows=True)
+    assert run_information == fm.split(fasta_file, str(tmp_path / 'plain'), chunksize=100000,
+                                       overlap=20000, partition_sequences=True, minsize=0,
+                                       max_seq_size=100000, write_windows=True)
+    assert (outdir / 'genome.split.2.fa').read_text() == \
+        (tmp_path / 'plain' / 'genome.split.2.fa').read_text()
+
+    # the worker processes use the index of the parent, no index is
+    # written next to the input
+    assert fm.summarize_acgt_content(bgzf_file, jobs=2) == \
+        fm.summarize_acgt_content(fasta_file)
+    assert not list(tmp_path.glob('*.fai')) and not list(tmp_path.glob('*.gzi'))
+
+    # a gzip file that is not compressed with bgzip cannot be indexed
+    gzip_file = str(tmp_path / 'genome2.fa.gz')
+    with open(fasta_file, 'rb') as file, gzip.open(gzip_file, 'wb') as out:
+        out.write(file.read())
+    with pytest.raises(ValueError):
+        FastaIndex(gzip_file)
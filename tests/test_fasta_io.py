@@ -0,0 +1,38 @@
+import io
+import pytest
+from Bio import SeqIO
+import pygustus.fasta_io as fasta_io
+
+
+FASTA = b'>chr1 first sequence\nACGTacgt\nNNNN\n>chr2\r\nAC GT\r\n\r\n>chr3  \n>chr4\nACGTACGTAC'
+
+
+@pytest.mark.ghactions
+@pytest.mark.parametrize('block_size', [1, 2, 3, 7, 4096])
+def test_read_fasta(monkeypatch, block_size):
+    monkeypatch.setattr(fasta_io, 'BLOCK_SIZE', block_size)
+    records = list(fasta_io.read_fasta(io.BytesIO(FASTA)))
+
+    assert [r.id for r in records] == ['chr1', 'chr2', 'chr3', 'chr4']
+    assert records[0].description == 'chr1 first sequence'
+    assert [r.bases.tobytes() for r in records] == \
+        [b'ACGTacgtNNNN', b'ACGT', b'', b'ACGTACGTAC']
+    # offsets of the first bases in the file
+    assert [r.offset for r in records] == [21, 42, 59, 65]
+    assert records[3][2:5].bases.tobytes() == b'GTA'
+
+
+@pytest.mark.ghactions
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_write_record(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(fasta_io, 'np', None)
+    records = list(SeqIO.parse('tests/data/genome.fa', 'fasta'))
+    expected = io.StringIO()
+    SeqIO.write(records, expected, 'fasta')
+
+    output = io.BytesIO()
+    with open('tests/data/genome.fa', 'rb') as file:
+        for record in fasta_io.read_fasta(file):
+            fasta_io.write_record(output, record)
+    assert output.getvalue().decode() == expected.getvalue()
@@ -0,0 +1,153 @@
+import gzip
+import pytest
+import pygustus.fasta_methods as fm
+from Bio import SeqIO
+
+
+@pytest.mark.ghactions
+def test_split_run_sizes(tmp_path):
+    outdir = str(tmp_path / 'split')
+    run_information = fm.split('tests/data/genome.fa', outdir, chunksize=250000,
+                               overlap=50000, partition_sequences=True,
+                               minsize=0, max_seq_size=750000)
+
+    assert [ri['run'] for ri in run_information] == [1, 2, 3, 4, 5]
+    for ri in run_information:
+        start, end = list(ri['seqinfo'].values())[0]
+        assert ri['size'] == end - start + 1
+
+
+@pytest.mark.ghactions
+def test_create_chunks():
+    assert fm.create_chunks(1, 900000, 250000, 50000) == [
+        [1, 250000], [200001, 450000], [400001, 650000], [600001, 850000], [800001, 900000]]
+    assert fm.create_chunks(501, 1000, 2000, 100) == [[501, 1000]]
+    with pytest.raises(ValueError):
+        fm.create_chunks(1, 900000, 250000, 500000)
+
+
+@pytest.mark.ghactions
+def test_split_gaps(tmp_path):
+    # 30 kb sequence with a 5 kb gap and a 9 kb region of N at the end
+    sequence = 'ACGT' * 2500 + 'N' * 5000 + 'ACGT' * 1500 + 'N' * 9000 + 'ACGT' * 250
+    inputfile = tmp_path / 'gaps.fa'
+    inputfile.write_text('>chr1\n' + sequence + '\n')
+
+    assert fm.find_gaps(sequence, 1000) == [[10001, 15000], [21001, 30000]]
+
+    run_information = fm.split(str(inputfile), str(tmp_path / 'split'), chunksize=8000,
+                               overlap=1000, partition_sequences=True, minsize=0,
+                               max_seq_size=1000, min_gap_length=1000)
+    assert [ri['seqinfo']['chr1'] for ri in run_information] == [
+        [1, 8000], [7001, 10000], [15001, 21000], [30001, 31000]]
+
+    run_information = fm.split(str(inputfile), str(tmp_path / 'split'), chunksize=8000,
+                               overlap=1000, partition_sequences=True, minsize=0,
+                               max_seq_size=1000, max_n_fraction=0.5)
+    # the windows 7001-15000, 21001-29000 and 28001-31000 are mostly N
+    assert [ri['seqinfo']['chr1'] for ri in run_information] == [
+        [1, 8000], [14001, 22000]]
+
+
+@pytest.mark.ghactions
+def test_split_min_size(tmp_path):
+    inputfile = tmp_path / 'contigs.fa'
+    inputfile.write_text(''.join(f'>ctg{i}\n' + 'ACGT' * 250 + '\n' for i in range(1, 6)))
+
+    run_information = fm.split(str(inputfile), str(tmp_path / 'split'), chunksize=0,
+                               overlap=0, partition_sequences=False, minsize=2000,
+                               max_seq_size=10000)
+    # the last file is written although it is smaller than minsize
+    assert [list(ri['seqinfo']) for ri in run_information] == [
+        ['ctg1', 'ctg2'], ['ctg3', 'ctg4'], ['ctg5']]
+    assert [ri['size'] for ri in run_information] == [2000, 2000, 1000]
+    assert len(list((tmp_path / 'split').iterdir())) == 3
+
+
+@pytest.mark.ghactions
+def test_split_write_windows(tmp_path):
+    outdir = tmp_path / 'split'
+    run_information = fm.split('tests/data/genome.fa', str(outdir), chunksize=250000,
+                               overlap=50000, partition_sequences=True, minsize=0,
+                               max_seq_size=750000, write_windows=True)
+
+    records = list(SeqIO.parse('tests/data/genome.fa', 'fasta'))
+    assert len(list(outdir.iterdir())) == len(run_information)
+    for ri in run_information:
+        start, end = ri['seqinfo']['chrI']
+        assert ri['offset'] == start - 1
+        window = SeqIO.read(str(outdir / f'genome.split.{ri["fileidx"]}.fa'), 'fasta')
+        assert window.id == 'chrI'
+        assert str(window.seq) == str(records[0].seq[start - 1:end])
+
+
+@pytest.mark.ghactions
+def test_count_bases(monkeypatch):
+    sequence = b'ACGTacgtNNnRy'
+    expected = {'length': 13, 'a': 2, 'c': 2, 'g': 2, 't': 2, 'n': 3,
+                'rest': 2, 'masked': 6}
+    assert fm.count_bases(sequence) == expected
+
+    monkeypatch.setattr(fm, 'np', None)
+    assert fm.count_bases(sequence) == expected
+
+
+@pytest.mark.ghactions
+def test_summarize_acgt_content(tmp_path):
+    inputfile = tmp_path / 'genome.fa'
+    inputfile.write_text('>seq1\nACGTNN\nacg\n>seq2 test\nGGCCtt\n')
+
+    summary = fm.summarize_acgt_content(str(inputfile))
+    assert [s['id'] for s in summary['sequences']] == ['seq1', 'seq2']
+    assert summary['sequences'][0]['n'] == 2
+    assert summary['sequences'][0]['masked'] == 3
+    assert summary['total']['length'] == 15
+    assert summary['total']['sequences'] == 2
+    assert summary['total']['gc'] == pytest.approx(100 * 8 / 13)
+
+    # the sequences are read from the index in worker processes
+    assert fm.summarize_acgt_content(str(inputfile), jobs=2) == summary
+
+
+@pytest.mark.ghactions
+def test_compute_window_stats(tmp_path):
+    pytest.importorskip('numpy')
+    inputfile = tmp_path / 'genome.fa'
+    inputfile.write_text('>seq1\nGGCC\nacgt\nNNNN\nAT\n>seq2\nNN\n')
+
+    window_stats = fm.compute_window_stats(str(inputfile), window_size=4)
+    stats = window_stats['seq1']
+    assert stats['start'].tolist() == [0, 4, 8, 12]
+    assert stats['end'].tolist() == [4, 8, 12, 14]
+    assert stats['gc'].tolist() == [1.0, 0.5, 0.0, 0.0]
+    assert stats['n'].tolist() == [0.0, 0.0, 1.0, 0.0]
+    assert stats['masked'].tolist() == [0.0, 1.0, 0.0, 0.0]
+    assert window_stats['seq2']['n'].tolist() == [1.0]
+
+    stats = fm.compute_window_stats(str(inputfile), window_size=6, step=3)['seq1']
+    assert stats['start'].tolist() == [0, 3, 6, 9]
+    assert stats['end'].tolist() == [6, 9, 12, 14]
+
+    outfile = tmp_path / 'n.bedGraph'
+    fm.write_window_stats(str(outfile), window_stats, 'n')
+    lines = outfile.read_text().splitlines()
+    assert lines[0] == 'track type=bedGraph name="n"'
+    assert lines[3] == 'seq1\t8\t12\t1.0000'
+    assert len(lines) == 6
+
+
+@pytest.mark.ghactions
+def test_split_gzipped_input(tmp_path):
+    inputfile = tmp_path / 'genome.fa.gz'
+    with gzip.open(str(inputfile), 'wt') as file:
+        file.write('>seq1\nACGT\n>seq2\nGGCC\n')
+
+    outdir = tmp_path / 'split'
+    run_information = fm.split(str(inputfile), str(outdir), chunksize=0,
+                               overlap=0, partition_sequences=False,
+                               minsize=0, max_seq_size=1000)
+
+    assert [list(ri['seqinfo']) for ri in run_information] == [['seq1'], ['seq2']]
+    # the split files are written uncompressed without the extension .gz
+    assert (outdir / 'genome.split.1.fa').read_text() == '>seq1\nACGT\n'
+    assert (outdir / 'genome.split.2.fa').read_text() == '>seq2\nGGCC\n'
@@ -0,0 +1,167 @@
+import pytest
+import filecmp
+import io
+import pygustus.gff_methods as gff
+
+PRED_FILES = [f'tests/data/gff/augustus_{run}.gff' for run in range(1, 4)]
+JOINED_FILE = 'tests/data/gff/augustus_joined.gff'
+
+
+@pytest.mark.ghactions
+def test_join_aug_pred(tmp_path):
+    out_file = str(tmp_path / 'joined.gff')
+    gff.join_aug_pred(out_file, PRED_FILES)
+
+    assert filecmp.cmp(out_file, JOINED_FILE, shallow=False)
+
+
+@pytest.mark.ghactions
+def test_join_aug_outputs(tmp_path):
+    outputs = list()
+    for pred in PRED_FILES:
+        output = gff.AugustusOutput()
+        with open(pred) as file:
+            for line in file:
+                output.add_line(line)
+        outputs.append(output)
+
+    out_file = str(tmp_path / 'joined.gff')
+    gff.join_aug_outputs(out_file, outputs)
+
+    assert filecmp.cmp(out_file, JOINED_FILE, shallow=False)
+
+
+@pytest.mark.ghactions
+def test_count_hints():
+    run_information = [
+        {'run': 1, 'seqinfo': {'HS04636': [0, 0]}},
+        {'run': 2, 'seqinfo': {'HS04636': [1, 1000]}},
+        {'run': 3, 'seqinfo': {'HS08198': [0, 0]}}]
+
+    hint_counts = gff.count_hints('tests/data/hints.gff', run_information)
+
+    assert hint_counts[1] == 5
+    assert hint_counts[2] == 3
+    assert hint_counts[3] == 3
+
+
+@pytest.mark.ghactions
+def test_join_aug_outputs_offset(tmp_path):
+    # augustus_2.gff is the prediction of HS04636 from 3001, shifted into
+    # the coordinates of a window starting at 3001
+    window_file = tmp_path / 'augustus_2_window.gff'
+    with open(PRED_FILES[1]) as file:
+        window_file.write_text(''.join(gff.shift_gff_line(line, -3000) for line in file))
+
+    outputs = [gff.read_aug_output(PRED_FILES[0]),
+               gff.read_aug_output(str(window_file)),
+               gff.read_aug_output(PRED_FILES[2])]
+    out_file = str(tmp_path / 'joined.gff')
+    gff.join_aug_outputs(out_file, outputs, [0, 3000, 0])
+
+    assert filecmp.cmp(out_file, JOINED_FILE, shallow=False)
+
+
+@pytest.mark.ghactions
+def test_create_hint_parts_offset(tmp_path):
+    out_file = tmp_path / 'hints_part.gff'
+    gff.create_hint_parts('tests/data/hints.gff', str(out_file),
+                          {'HS04636': [101, 1000]}, offset=100)
+
+    lines = out_file.read_text().splitlines()
+    assert [line.split('\t')[3:5] for line in lines] == [['400', '406'], ['866', '868']]
+    assert lines[1].split('\t')[8] == 'gb|AAA35803.1 source=P'
+
+
+@pytest.mark.ghactions
+def test_add_output_duplicates():
+    def create_output(genes):
+        output = gff.AugustusOutput()
+        output.header = ''
+        output.genes = [gff.Gene(f'g{i + 1}', seq, start, end, f'{seq} g{i + 1}\n')
+                        for i, (seq, start, end) in enumerate(genes)]
+        return output
+
+    gff_file = gff.GFFFile()
+    gff_file.add_output(create_output([('chr1', '100', '500'), ('chr1', '1000', '2000')]))
+    # a duplicate of the last gene replaces it, an overlapping gene and a
+    # duplicate of an earlier gene are dropped
+    gff_file.add_output(create_output([
+        ('chr1', '100', '500'), ('chr1', '1000', '2100'), ('chr1', '1500', '2500'),
+        ('chr1', '3000', '4000'), ('chr2', '100', '500')]))
+
+    assert [(g.sequence, g.start, g.end) for g in gff_file.genes] == [
+        ('chr1', '100', '500'), ('chr1', '1000', '2100'),
+        ('chr1', '3000', '4000'), ('chr2', '100', '500')]
+
+
+@pytest.mark.ghactions
+def test_join_streaming(tmp_path):
+    out_file = tmp_path / 'joined.gff'
+    with open(out_file, 'w') as file:
+        gff_file = gff.GFFFile(file)
+        for pred in PRED_FILES:
+            gff_file.add_content(pred)
+            # only the last gene may still be replaced by the next run
+            assert len(gff_file.genes) <= 1
+        gff_file.finish()
+
+    assert filecmp.cmp(str(out_file), JOINED_FILE, shallow=False)
+
+
+@pytest.mark.ghactions
+def test_join_aug_pred_parallel(tmp_path):
+    output = gff.index_aug_output(PRED_FILES[0])
+    genes = gff.read_aug_output(PRED_FILES[0]).genes
+    assert output.header == gff.read_aug_output(PRED_FILES[0]).header
+    assert [(g.id, g.sequence, g.start, g.end, g.txt) for g in output.genes] == \
+        [(g.id, g.sequence, g.start, g.end, g.txt) for g in genes]
+
+    out_file = str(tmp_path / 'joined.gff')
+    gff.join_aug_pred(out_file, PRED_FILES, jobs=2)
+
+    assert filecmp.cmp(out_file, JOINED_FILE, shallow=False)
+
+
+@pytest.mark.ghactions
+def test_gene_rename():
+    txt = ('# start gene g1\n'
+           'ctg1\tAUGUSTUS\tgene\t1\t2000\t0.5\t+\t.\tg1\n'
+           'ctg1\tAUGUSTUS\ttranscript\t1\t2000\t0.5\t+\t.\tg1.t1\n'
+           'ctg1\tAUGUSTUS\tCDS\t11\t1990\t0.5\t+\t0\ttranscript_id "g1.t1"; gene_id "g1";\n'
+           'ctg1\tAUGUSTUS\tCDS\t2011\t2990\t0.5\t+\t0\tID=ctg1.g1.t1.cds;Parent=ctg1.g1.t1;Note=g10\n'
+           '# end gene g1\n')
+    gene = gff.Gene('g1', 'ctg1', '1', '2000', txt)
+    gene.rename('g12')
+    gene.shift(100)
+
+    assert gene.txt == (
+        '# start gene g12\n'
+        'ctg1\tAUGUSTUS\tgene\t101\t2100\t0.5\t+\t.\tg12\n'
+        'ctg1\tAUGUSTUS\ttranscript\t101\t2100\t0.5\t+\t.\tg12.t1\n'
+        'ctg1\tAUGUSTUS\tCDS\t111\t2090\t0.5\t+\t0\ttranscript_id "g12.t1"; gene_id "g12";\n'
+        'ctg1\tAUGUSTUS\tCDS\t2111\t3090\t0.5\t+\t0\tID=ctg1.g12.t1.cds;Parent=ctg1.g12.t1;Note=g10\n'
+        '# end gene g12\n')
+
+
+@pytest.mark.ghactions
+@pytest.mark.parametrize('renumber', [False, True])
+def test_join_renumber(renumber):
+    def create_output(genes):
+        output = gff.AugustusOutput()
+        output.header = '# header\n'
+        output.genes = [gff.Gene(f'g{i + 1}', 'chr1', start, end, f'# start gene g{i + 1}\n')
+                        for i, (start, end) in enumerate(genes)]
+        return output
+
+    file = io.StringIO()
+    gff_file = gff.GFFFile(file, renumber)
+    gff_file.add_output(create_output([('100', '500'), ('1000', '2000')]))
+    # the first three genes are dropped, the fourth keeps its id g4
+    gff_file.add_output(create_output([
+        ('100', '500'), ('1500', '2500'), ('1800', '2600'), ('5000', '6000')]))
+    gff_file.finish()
+
+    expected_ids = ['g1', 'g2', 'g3'] if renumber else ['g1', 'g2', 'g4']
+    assert file.getvalue() == '# header\n' + ''.join(
+        f'# start gene {gene_id}\n' for gene_id in expected_ids)
@@ -0,0 +1,92 @@
+import pytest
+import os
+import time
+from pygustus.run_cache import RunCache
+import pygustus.run_cache as run_cache
+
+
+@pytest.mark.ghactions
+def test_run_cache_keys(tmp_path):
+    cache = RunCache(str(tmp_path / 'cache'))
+    options = ['--species=human', '--outfile=a.gff', 'tests/data/example.fa']
+    key = cache.create_key('tests/data/example.fa', {'HS04636': [0, 0]},
+                           'tests/data/hints.gff', options, '3.4.0')
+
+    # temporary output paths do not change the key
+    other_options = ['--species=human', '--outfile=b.gff', 'tests/data/example.fa']
+    assert key == cache.create_key('tests/data/example.fa', {'HS04636': [0, 0]},
+                                   'tests/data/hints.gff', other_options, '3.4.0')
+    assert key != cache.create_key('tests/data/example.fa', {'HS04636': [1, 5000]},
+                                   'tests/data/hints.gff', options, '3.4.0')
+    assert key != cache.create_key('tests/data/example.fa', {'HS04636': [0, 0]},
+                                   None, options, '3.4.0')
+    assert key != cache.create_key('tests/data/example.fa', {'HS04636': [0, 0]},
+                                   'tests/data/hints.gff', options, '3.5.0')
+
+
+@pytest.mark.ghactions
+def test_run_cache_lru_eviction(tmp_path):
+    result_file = str(tmp_path / 'result.gff')
+    with open(result_file, 'w') as file:
+        file.write('x' * 100)
+
+    cache = RunCache(str(tmp_path / 'cache'), max_size=250)
+    cache.store('a' * 64, result_file)
+    cache.store('b' * 64, result_file)
+    time.sleep(0.01)
+    # use a, so that b is the least recently used entry
+    assert cache.fetch('a' * 64, str(tmp_path / 'fetched.gff'))
+    time.sleep(0.01)
+    cache.store('c' * 64, result_file)
+
+    assert cache.fetch('a' * 64, str(tmp_path / 'fetched.gff'))
+    assert not cache.fetch('b' * 64, str(tmp_path / 'fetched.gff'))
+    assert cache.fetch('c' * 64, str(tmp_path / 'fetched.gff'))
+    assert os.path.getsize(str(tmp_path / 'fetched.gff')) == 100
+
+
+@pytest.mark.ghactions
+def test_run_cache_stale_tmp_files(tmp_path):
+    result_file = str(tmp_path / 'result.gff')
+    with open(result_file, 'w') as file:
+        file.write('x' * 100)
+
+    cache_dir = tmp_path / 'cache'
+    cache = RunCache(str(cache_dir), max_size=250)
+    cache.store('a' * 64, result_file)
+    # a temporary file of a killed process and one of a running store()
+    stale = cache_dir / 'aa' / '.tmp_stale'
+    stale.write_text('x' * 100)
+    old = time.time() - 2 * run_cache.STALE_TMP_AGE
+    os.utime(str(stale), (old, old))
+    running = cache_dir / 'aa' / '.tmp_running'
+    running.write_text('x' * 100)
+
+    cache.store('b' * 64, result_file)
+    assert not stale.exists()
+    assert running.exists()
+    # the running store() counts towards the size
+    assert not cache.fetch('a' * 64, str(tmp_path / 'fetched.gff'))
+    assert cache.fetch('b' * 64, str(tmp_path / 'fetched.gff'))
+
+
+@pytest.mark.ghactions
+def test_run_cache_window_keys(tmp_path):
+    def create_key(name, sequences, window, offset=0):
+        input_file = str(tmp_path / name)
+        with open(input_file, 'w') as file:
+            for seq_name, seq in sequences.items():
+                file.write(f'>{seq_name}\n{seq}\n')
+        return cache.create_key(input_file, window, None, [input_file], '3.4.0', offset)
+
+    cache = RunCache(str(tmp_path / 'cache'))
+    key = create_key('a.fa', {'s1': 'ACGTACGTAC', 's2': 'GGGG'}, {'s1': [3, 6]})
+    # only the bases in the window are part of the key
+    assert key == create_key('b.fa', {'s1': 'TTGTACTTTT', 's2': 'CC'}, {'s1': [3, 6]})
+    assert key == create_key('c.fa', {'s1': 'GTAC'}, {'s1': [3, 6]}, offset=2)
+    assert key != create_key('d.fa', {'s1': 'ACGTAgGTAC'}, {'s1': [3, 6]})
+
+    key = create_key('e.fa', {'s1': 'ACGT', 's2': 'GGGG'}, {'s1': [0, 0], 's2': [0, 0]})
+    assert key == create_key('f.fa', {'s1': 'ACGT', 's2': 'GGGG', 's3': 'A'},
+                             {'s1': [0, 0], 's2': [0, 0]})
+    assert key != create_key('g.fa', {'s1': 'ACGT', 's2': 'GGGT'}, {'s1': [0, 0], 's2': [0, 0]})
@@ -0,0 +1,24 @@
+import pytest
+import pygustus.run_manifest as run_manifest
+from pygustus.run_manifest import RunManifest
+
+
+@pytest.mark.ghactions
+def test_run_manifest_resume(tmp_path):
+    signature = {'input': ['genome.fa', 'abc'], 'split': (2500000, 500000)}
+    manifest = RunManifest(str(tmp_path))
+    manifest.create(signature, [{'number': 1}, {'number': 2}])
+    manifest.set_status(1, run_manifest.DONE)
+    manifest.set_status(2, run_manifest.FAILED)
+
+    loaded = RunManifest(str(tmp_path))
+    assert loaded.load()
+    assert loaded.matches(signature)
+    assert not loaded.matches({'input': ['genome.fa', 'def'], 'split': (2500000, 500000)})
+    assert loaded.get_status(1) == run_manifest.DONE
+    assert loaded.get_status(2) == run_manifest.FAILED
+
+
+@pytest.mark.ghactions
+def test_run_manifest_missing(tmp_path):
+    assert not RunManifest(str(tmp_path)).load()
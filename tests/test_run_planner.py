@@ -0,0 +1,83 @@
+import pytest
+import pygustus.fasta_methods as fm
+import pygustus.run_planner as run_planner
+
+
+@pytest.mark.ghactions
+def test_create_plan_packs_small_sequences():
+    sequences = [(f'ctg{i}', 10000 * (i % 7 + 1)) for i in range(40)]
+    plan = run_planner.create_plan(sequences, jobs=4, max_seq_size=1000000)
+
+    # every sequence is predicted exactly once
+    names = [name for run in plan.runs for name in run.seqinfo]
+    assert sorted(names) == sorted(name for name, _ in sequences)
+    assert set(plan.packing) == set(names)
+    assert len(plan.runs) >= 4
+    assert plan.balance > 0.9
+
+    costs = [run.cost for run in plan.runs]
+    assert max(costs) - min(costs) <= 70000
+
+
+@pytest.mark.ghactions
+def test_create_plan_keeps_input_order():
+    sequences = [(f'ctg{i}', 10000 * (i % 7 + 1)) for i in range(20)]
+    sequences.insert(10, ('chr1', 5000000))
+    sequences += [(f'ctg{i}', 20000) for i in range(20, 30)]
+    plan = run_planner.create_plan(sequences, jobs=4, max_seq_size=1000000)
+
+    # the joined results of the runs follow the input file
+    names = [name for run in plan.runs for name in run.seqinfo]
+    assert [name for name, _ in sequences] == list(dict.fromkeys(names))
+    assert sorted(plan.packing.values()) == list(plan.packing.values())
+
+
+@pytest.mark.ghactions
+def test_create_plan_chunks_large_sequences():
+    sequences = [('chr1', 10000000), ('ctg1', 50000)]
+    hint_starts = {'chr1': [100, 200, 5000000]}
+    plan = run_planner.create_plan(sequences, jobs=8, max_seq_size=3500000,
+                                   overlap=100000, hint_starts=hint_starts)
+
+    assert run_planner.MIN_CHUNKSIZE <= plan.chunksize <= run_planner.MAX_CHUNKSIZE
+    assert plan.overlap == 100000
+    chunks = [run.seqinfo['chr1'] for run in plan.runs if 'chr1' in run.seqinfo]
+    assert chunks == fm.create_chunks(1, 10000000, plan.chunksize, plan.overlap)
+    assert sum(run.hints for run in plan.runs) >= 3
+    # more jobs lead to smaller chunks
+    fewer_jobs = run_planner.create_plan(sequences, jobs=2, max_seq_size=3500000,
+                                         overlap=100000)
+    assert fewer_jobs.chunksize >= plan.chunksize
+
+
+@pytest.mark.ghactions
+def test_split_packing(tmp_path):
+    inputfile = tmp_path / 'genome.fa'
+    inputfile.write_text('>a\nACGT\n>b\nAC\n>c\nACG\n>d\nA\n')
+
+    packing = {'a': 0, 'b': 1, 'c': 0, 'd': 1}
+    run_information = fm.split(str(inputfile), str(tmp_path / 'split'), chunksize=0,
+                               overlap=0, partition_sequences=False, minsize=0,
+                               max_seq_size=1000, packing=packing)
+
+    assert [ri['seqinfo'] for ri in run_information] == [
+        {'a': [0, 0], 'c': [0, 0]}, {'b': [0, 0], 'd': [0, 0]}]
+    assert [ri['size'] for ri in run_information] == [7, 3]
+
+
+@pytest.mark.ghactions
+def test_create_plan_gaps(tmp_path):
+    bases = 'ACGT' * 200000 + 'N' * 50000 + 'ACGT' * 200000 + 'N' * 900000 + 'ACGT' * 10000
+    inputfile = tmp_path / 'genome.fa'
+    inputfile.write_text(f'>chr1\n{bases}\n')
+    sequences = [('chr1', len(bases))]
+    n_runs = fm.find_n_runs(str(inputfile), {'chr1'})
+    assert n_runs == {'chr1': [[800001, 850000], [1650001, 2550000]]}
+
+    for min_gap_length in (1000, 0):
+        plan = run_planner.create_plan(sequences, jobs=4, max_seq_size=100000, overlap=10000,
+                                       min_gap_length=min_gap_length, max_n_fraction=0.5,
+                                       n_runs=n_runs)
+        run_information = fm.split(str(inputfile), str(tmp_path / 'split'), plan.chunksize,
+                                   plan.overlap, True, 0, 100000, min_gap_length, 0.5)
+        assert [run.seqinfo for run in plan.runs] == [ri['seqinfo'] for ri in run_information]
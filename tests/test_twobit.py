@@ -0,0 +1,92 @@
+import pytest
+import re
+import struct
+import pygustus.fasta_methods as fm
+import pygustus.twobit as twobit
+from pygustus.twobit import TwoBitFile, is_twobit, write_fasta
+
+
+SEQUENCES = {
+    'chr1': 'ACGTacgtNNNNNNNNNNGGCCaattTTGCA' * 7 + 'ACG',
+    'chr2': 'nnnnACGTTGCAtgcaNNNNacgtACGTC',
+    'chr3': 'T'
+}
+
+
+def write_twobit(twobit_file, sequences):
+    """Writes the sequences in the .2bit format."""
+    codes = {'T': 0, 'C': 1, 'A': 2, 'G': 3}
+    records = list()
+    for name, seq in sequences.items():
+        n_blocks = [m.span() for m in re.finditer('[Nn]+', seq)]
+        mask_blocks = [m.span() for m in re.finditer('[a-z]+', seq)]
+        packed = bytearray()
+        upper = seq.upper().ljust((len(seq) + 3) // 4 * 4, 'T')
+        for i in range(0, len(upper), 4):
+            byte = 0
+            for base in upper[i:i + 4]:
+                byte = byte << 2 | codes.get(base, 0)
+            packed.append(byte)
+        record = struct.pack('<II', len(seq), len(n_blocks))
+        record += b''.join(struct.pack('<I', s) for s, _ in n_blocks)
+        record += b''.join(struct.pack('<I', e - s) for s, e in n_blocks)
+        record += struct.pack('<I', len(mask_blocks))
+        record += b''.join(struct.pack('<I', s) for s, _ in mask_blocks)
+        record += b''.join(struct.pack('<I', e - s) for s, e in mask_blocks)
+        records.append((name, record + struct.pack('<I', 0) + bytes(packed)))
+
+    offset = 16 + sum(1 + len(name) + 4 for name, _ in records)
+    with open(twobit_file, 'wb') as out:
+        out.write(struct.pack('<IIII', 0x1A412743, 0, len(records), 0))
+        for name, record in records:
+            out.write(struct.pack('<B', len(name)) + name.encode())
+            out.write(struct.pack('<I', offset))
+            offset += len(record)
+        for _, record in records:
+            out.write(record)
+
+
+@pytest.mark.ghactions
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_twobit_file(tmp_path, monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(twobit, 'np', None)
+    twobit_file = str(tmp_path / 'genome.2bit')
+    write_twobit(twobit_file, SEQUENCES)
+    assert is_twobit(twobit_file)
+
+    genome = TwoBitFile(twobit_file)
+    assert genome.names == list(SEQUENCES.keys())
+    for name, seq in SEQUENCES.items():
+        assert genome.get_length(name) == len(seq)
+        assert genome.fetch(name) == seq
+        for start in range(1, len(seq) + 1, 5):
+            for end in range(start, len(seq) + 1, 7):
+                assert genome.fetch(name, start, end) == seq[start - 1:end]
+
+    fasta_file = str(tmp_path / 'genome.fa')
+    write_fasta(twobit_file, fasta_file, line_length=10)
+    assert not is_twobit(fasta_file)
+    assert fm.get_sequence_lengths(fasta_file) == fm.get_sequence_lengths(twobit_file)
+
+
+@pytest.mark.ghactions
+def test_split_twobit(tmp_path):
+    twobit_file = str(tmp_path / 'genome.2bit')
+    write_twobit(twobit_file, SEQUENCES)
+
+    run_information = fm.split(
+        twobit_file, str(tmp_path / 'split'), chunksize=50, overlap=10,
+        partition_sequences=True, minsize=0, max_seq_size=100,
+        write_windows=True)
+    windows = [r['seqinfo']['chr1'] for r in run_information
+               if 'chr1' in r['seqinfo']]
+    assert windows[0] == [1, 50]
+    assert windows[-1][1] == len(SEQUENCES['chr1'])
+
+    run = run_information[1]
+    split_file = tmp_path / 'split' / f'genome.split.{run["fileidx"]}.fa'
+    lines = split_file.read_text().split('\n')
+    assert lines[0].startswith('>chr1')
+    window = run['seqinfo']['chr1']
+    assert ''.join(lines[1:]) == SEQUENCES['chr1'][window[0] - 1:window[1]]
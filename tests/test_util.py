@@ -0,0 +1,299 @@
+import json
+import sys
+import pytest
+import pygustus.util as util
+
+
+@pytest.mark.ghactions
+def test_execute_bin_resources():
+    # keep the memory until it has been sampled
+    result = util.execute_bin(
+        sys.executable, ['-c', 'import time; x = bytearray(100 * 1024 * 1024); time.sleep(1)'])
+    assert result.success
+    assert result.resources.wall_time > 0
+    if result.resources.max_rss is not None:
+        assert result.resources.max_rss >= 100 * 1024
+
+
+@pytest.mark.ghactions
+def test_execute_bin_resources_without_parent():
+    # the memory of this process must not be reported for the child
+    parent_memory = bytearray(300 * 1024 * 1024)
+    result = util.execute_bin(sys.executable, ['-c', 'import time; time.sleep(1)'])
+    del parent_memory
+    assert result.success
+    if result.resources.max_rss is not None and sys.platform.startswith('linux'):
+        assert result.resources.max_rss < 100 * 1024
+
+
+@pytest.mark.ghactions
+def test_execute_bin_timeout():
+    result = util.execute_bin(
+        sys.executable, ['-c', 'import time; time.sleep(10)'], timeout=1)
+    assert result.timed_out
+    assert not result.success
+    assert result.resources.wall_time < 10
+
+
+@pytest.mark.ghactions
+def test_write_run_report(tmp_path):
+    run = util.AugustusRun({'run': 1, 'fileidx': 1, 'seqinfo': {'chr1': [1, 5000]}, 'size': 5000},
+                           'genome.split.1.fa', None, [], 'augustus_1.gff', (5000, 12))
+    result = util.ExecutionResult(
+        'augustus', [], 0, resources=util.ResourceUsage(1.5, 1.2, 0.1, 2048))
+    stats = util.collect_run_stats([run], {1: result}, {1: 3})
+    assert stats[0]['sequences'] == 'chr1:1-5000'
+    assert stats[0]['length'] == 5000
+    assert stats[0]['hints'] == 12
+    assert stats[0]['genes'] == 3
+    assert stats[0]['max_rss'] == 2048
+
+    json_report = tmp_path / 'augustus.gff.runs.json'
+    util.write_run_report(str(json_report), stats, 'json')
+    assert json.loads(json_report.read_text()) == stats
+
+    tsv_report = tmp_path / 'augustus.gff.runs.tsv'
+    util.write_run_report(str(tsv_report), stats, 'tsv')
+    lines = tsv_report.read_text().splitlines()
+    assert len(lines) == 2
+    assert lines[1].split('\t')[:5] == ['1', 'chr1:1-5000', '5000', '12', '3']
+
+    with pytest.raises(ValueError):
+        util.write_run_report(str(tmp_path / 'report.txt'), stats, 'txt')
+
+
+def create_run(number, size, hints=0):
+    info = {'run': number, 'fileidx': number, 'seqinfo': {f'seq{number}': [0, 0]}, 'size': size}
+    return util.AugustusRun(info, f'genome.split.{number}.fa', None, [],
+                            f'augustus_{number}.gff', (size, hints))
+
+
+@pytest.mark.ghactions
+def test_run_dispatcher_memory_budget():
+    # estimated memory: 500, 300, 140 and 108 MB
+    runs = [create_run(1, 1000000), create_run(2, 500000),
+            create_run(3, 100000), create_run(4, 20000)]
+    dispatcher = util.RunDispatcher(runs, jobs=4, max_memory=700)
+
+    # the smaller runs 3 and 4 fill the remaining budget besides run 1
+    started = dispatcher.start_runs()
+    assert [r.number for r in started] == [1, 3]
+    dispatcher.finish_run(started[1])
+    assert [r.number for r in dispatcher.start_runs()] == [4]
+    dispatcher.finish_run(started[0])
+    assert [r.number for r in dispatcher.start_runs()] == [2]
+    assert not dispatcher.has_pending_runs()
+
+
+@pytest.mark.ghactions
+def test_run_dispatcher_large_run_alone():
+    runs = [create_run(1, 5000000), create_run(2, 100000)]
+    dispatcher = util.RunDispatcher(runs, jobs=2, max_memory=1000)
+
+    started = dispatcher.start_runs()
+    assert [r.number for r in started] == [1]
+    assert dispatcher.start_runs() == []
+    dispatcher.finish_run(started[0])
+    assert [r.number for r in dispatcher.start_runs()] == [2]
+
+
+@pytest.mark.ghactions
+def test_memory_estimator_observed_rss():
+    estimator = util.MemoryEstimator()
+    run = create_run(1, 1000000)
+    assert estimator.estimate(run) == 500
+    result = util.ExecutionResult(
+        'augustus', [], 0, resources=util.ResourceUsage(1.0, max_rss=1000 * 1024))
+    estimator.observe(run, result)
+    assert estimator.estimate(run) == pytest.approx(1000)
+    assert estimator.estimate(create_run(2, 500000)) == pytest.approx(600)
+
+
+def create_pred_run(number):
+    info = {'run': number, 'fileidx': number, 'seqinfo': {}, 'size': 0}
+    return util.AugustusRun(info, f'genome.split.{number}.fa', None, [],
+                            f'tests/data/gff/augustus_{number}.gff', (0, 0))
+
+
+@pytest.mark.ghactions
+def test_run_joiner_reorder(tmp_path):
+    runs = [create_pred_run(number) for number in range(1, 4)]
+    out_file = tmp_path / 'joined.gff'
+    success = util.ExecutionResult('augustus', [], 0)
+
+    with util.RunJoiner(str(out_file), runs, runs) as joiner:
+        # run 3 is buffered until runs 1 and 2 are joined
+        joiner.add_result(runs[2], success)
+        assert joiner.gene_counts == {}
+        assert out_file.read_text() == ''
+        joiner.add_result(runs[0], success)
+        assert list(joiner.gene_counts) == [1]
+        assert out_file.read_text() != ''
+        joiner.add_result(runs[1], success)
+        gene_counts = joiner.finish()
+
+    assert list(gene_counts) == [1, 2, 3]
+    assert out_file.read_text() == \
+        open('tests/data/gff/augustus_joined.gff').read()
+
+
+@pytest.mark.ghactions
+@pytest.mark.parametrize('allow_partial', [True, False])
+def test_run_joiner_failed_run(tmp_path, allow_partial):
+    runs = [create_pred_run(number) for number in range(1, 4)]
+    out_file = tmp_path / 'joined.gff'
+    results = {2: util.ExecutionResult('augustus', [], 1),
+               3: util.ExecutionResult('augustus', [], 0)}
+
+    def join():
+        # run 1 was done before a resume
+        with util.RunJoiner(str(out_file), runs, runs[1:], allow_partial=allow_partial) as joiner:
+            for run in runs[1:]:
+                joiner.add_result(run, results[run.number])
+            util.check_run_results(runs, results, allow_partial)
+            return joiner.finish()
+
+    if allow_partial:
+        assert list(join()) == [1, 3]
+        assert out_file.exists()
+    else:
+        with pytest.raises(RuntimeError):
+            join()
+        # no incomplete output is left
+        assert not out_file.exists()
+
+
+@pytest.mark.ghactions
+def test_memory_estimator_outliers():
+    estimator = util.MemoryEstimator()
+    # a short run with a large peak, e.g. of the constant part, is ignored
+    small = create_run(1, 50000)
+    estimator.observe(small, util.ExecutionResult(
+        'augustus', [], 0, resources=util.ResourceUsage(1.0, max_rss=870148)))
+    assert estimator.estimate(small) == pytest.approx(120)
+
+    # a single outlier does not determine the scale
+    run = create_run(2, 1000000)
+    for max_rss in (500, 600, 3500):
+        estimator.observe(run, util.ExecutionResult(
+            'augustus', [], 0, resources=util.ResourceUsage(1.0, max_rss=max_rss * 1024)))
+    assert estimator.estimate(run) == pytest.approx(600)
+
+
+@pytest.mark.ghactions
+def test_run_dispatcher_small_run_large_rss():
+    # estimated memory: 120 MB per run
+    runs = [create_run(number, 50000) for number in range(1, 7)]
+    dispatcher = util.RunDispatcher(runs, jobs=4, max_memory=500)
+
+    started = dispatcher.start_runs()
+    assert len(started) == 4
+    dispatcher.finish_run(started[0], util.ExecutionResult(
+        'augustus', [], 0, resources=util.ResourceUsage(1.0, max_rss=870148)))
+    # the freed slot is used again instead of executing one run at a time
+    assert len(dispatcher.start_runs()) == 1
+
+
+class FixedEstimator:
+    def __init__(self, memory):
+        self.memory = memory
+
+    def estimate(self, run):
+        return self.memory[run.number]
+
+    def observe(self, run, result=None):
+        pass
+
+
+@pytest.mark.ghactions
+def test_run_dispatcher_no_starvation():
+    # run 2 needs 800 MB, the small runs 3 to 9 only 150 MB each
+    runs = [create_run(1, 1000000), create_run(2, 900000)] + \
+        [create_run(number, 20000) for number in range(3, 10)]
+    memory = {1: 300, 2: 800, **{number: 150 for number in range(3, 10)}}
+    dispatcher = util.RunDispatcher(runs, jobs=4, max_memory=1000,
+                                    estimator=FixedEstimator(memory))
+
+    assert [r.number for r in dispatcher.start_runs()] == [1, 3, 4, 5]
+    dispatcher.finish_run(runs[0])
+    # the fourth run started before run 2
+    assert [r.number for r in dispatcher.start_runs()] == [6]
+    # the freed memory is kept for run 2 instead of starting runs 7 to 9
+    for number in (3, 4, 5):
+        assert dispatcher.start_runs() == []
+        dispatcher.finish_run(runs[number - 1])
+    assert [r.number for r in dispatcher.start_runs()] == [2]
+    dispatcher.finish_run(runs[5])
+    assert [r.number for r in dispatcher.start_runs()] == [7]
+
+
+@pytest.mark.ghactions
+def test_open_work_dir_foreign_files(tmp_path):
+    # the input and an unrelated file must not be deleted
+    work_dir = tmp_path / 'work'
+    work_dir.mkdir()
+    (work_dir / 'genome.fa').write_text('>chr1\nACGT\n')
+    (work_dir / 'notes.txt').write_text('notes')
+    with pytest.raises(ValueError):
+        with util.open_work_dir(str(work_dir)):
+            pass
+    assert sorted(p.name for p in work_dir.iterdir()) == ['genome.fa', 'notes.txt']
+
+
+@pytest.mark.ghactions
+def test_open_work_dir_reuse(tmp_path):
+    work_dir = tmp_path / 'work'
+    with util.open_work_dir(str(work_dir)) as opened:
+        assert opened == str(work_dir)
+        (work_dir / 'augustus_1.gff').write_text('')
+    # the work directory of a previous prediction can be used again
+    with util.open_work_dir(str(work_dir)):
+        assert (work_dir / util.WORK_DIR_MARKER).exists()
+
+
+class RecordingRunner:
+    """Performs the steps of a run like util.ThreadRunner, but fails the
+    first attempts instead of executing AUGUSTUS."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.delays = list()
+
+    def call(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    def sleep(self, delay):
+        self.delays.append(delay)
+
+    def execute(self, cmd, options, pipe_output=False, copy_to=None, timeout=None):
+        returncode = 1 if self.failures else 0
+        self.failures = max(self.failures - 1, 0)
+        return util.ExecutionResult(cmd, options, returncode)
+
+
+@pytest.mark.ghactions
+@pytest.mark.parametrize('failures,attempts,success', [(0, 1, True), (2, 3, True), (3, 3, False)])
+def test_execute_run_steps_retries(failures, attempts, success):
+    run = util.AugustusRun({'run': 1, 'seqinfo': {'s1': [0, 0]}}, 'in.fa', None,
+                           ['in.fa'], 'out.gff', (10, 0))
+    options = util.ParallelOptions(retries=2, retry_delay=1)
+    runner = RecordingRunner(failures)
+
+    result = util.run_steps(util.execute_run_steps('augustus', run, options), runner)
+    assert result.success == success
+    assert result.attempts == attempts
+    # the delay is doubled for each retry
+    assert runner.delays == [1, 2][:attempts - 1]
+
+
+@pytest.mark.ghactions
+def test_get_options_keeps_falsy_values():
+    path_to_params = util.get_path_to_parameters_file()
+    options = util.get_options('in.fa', options=None, path_to_params=path_to_params,
+                               program='pygustus', jobRetryDelay=0, jobRetries=0)
+    assert options.get_value_or_none('jobRetryDelay') == 0
+    assert options.get_value_or_none('jobRetries') == 0
+
+    defaults = util.get_options('in.fa', options=None, path_to_params=path_to_params,
+                                program='pygustus')
+    assert defaults.get_value_or_none('jobRetryDelay') == 10